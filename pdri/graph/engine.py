@@ -138,6 +138,13 @@ class GraphEngine:
         self.user = user or settings.neo4j_user
         self.password = password or settings.neo4j_password
         self._driver: Optional[AsyncDriver] = None
+        
+        # Bumped on every node/edge create, update or delete made through
+        # this engine, so callers can cache topology-derived data per version
+        self.topology_version = 0
+        # Bumped on writes that change node data but not the topology
+        # (risk score updates), for caches of per-node values
+        self.data_version = 0
     
     async def connect(self) -> None:
         """
@@ -220,6 +227,7 @@ class GraphEngine:
                 if record is None:
                     raise GraphEngineError(f"Failed to create node: {node.id}")
                 
+                self.topology_version += 1
                 logger.info(f"Created node: {node.id} ({label})")
                 return node
                 
@@ -255,6 +263,59 @@ class GraphEngine:
             logger.error(f"Neo4j error getting node: {e}")
             raise GraphEngineError(f"Failed to get node: {e}") from e
     
+    async def get_nodes_bulk(self, node_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get many nodes by ID in a single query.
+        
+        Args:
+            node_ids: Node identifiers
+            
+        Returns:
+            Node properties keyed by node ID (missing nodes are omitted)
+        """
+        try:
+            async with self._session() as session:
+                result = await session.run(
+                    NodeQueries.GET_NODES_BY_IDS.format(),
+                    ids=list(node_ids)
+                )
+                records = await result.data()
+                return {r["node_id"]: dict(r["n"]) for r in records}
+                
+        except Neo4jError as e:
+            logger.error(f"Neo4j error getting nodes: {e}")
+            raise GraphEngineError(f"Failed to get nodes: {e}") from e
+    
+    async def get_connection_counts_bulk(
+        self,
+        node_ids: List[str]
+    ) -> Dict[str, Dict[str, int]]:
+        """
+        Count each node's connections by kind in a single query.
+        
+        Args:
+            node_ids: Node identifiers
+            
+        Returns:
+            Counts keyed by node ID (missing nodes are omitted): inbound,
+            outbound, ai_tools, external and sensitive (data flows to or
+            from a node with sensitivity >= 0.5)
+        """
+        try:
+            async with self._session() as session:
+                result = await session.run(
+                    EdgeQueries.GET_CONNECTION_COUNTS_BY_IDS.format(),
+                    ids=list(node_ids)
+                )
+                return {
+                    record.pop("node_id"): record
+                    for record in await result.data()
+                }
+                
+        except Neo4jError as e:
+            logger.error(f"Neo4j error counting connections: {e}")
+            raise GraphEngineError(f"Failed to count connections: {e}") from e
+    
     async def get_node_with_relationships(
         self, 
         node_id: str
@@ -315,6 +376,7 @@ class GraphEngine:
                 if record is None:
                     return None
                 
+                self.topology_version += 1
                 logger.info(f"Updated node: {node_id}")
                 return dict(record["n"])
                 
@@ -357,6 +419,8 @@ class GraphEngine:
                 if record is None:
                     return None
                 
+                # Scores are node data only; topology caches stay valid
+                self.data_version += 1
                 logger.debug(f"Updated risk scores for: {node_id}")
                 return dict(record["n"])
                 
@@ -384,6 +448,7 @@ class GraphEngine:
                 
                 deleted = summary.counters.nodes_deleted > 0
                 if deleted:
+                    self.topology_version += 1
                     logger.info(f"Deleted node: {node_id}")
                 return deleted
                 
@@ -456,6 +521,7 @@ class GraphEngine:
                         f"Failed to create edge: {edge.source_id} -> {edge.target_id}"
                     )
                 
+                self.topology_version += 1
                 logger.info(
                     f"Created edge: {edge.source_id} -[{edge.edge_type.value}]-> "
                     f"{edge.target_id}"
@@ -519,7 +585,10 @@ class GraphEngine:
                 )
                 summary = await result.consume()
                 
-                return summary.counters.relationships_deleted > 0
+                deleted = summary.counters.relationships_deleted > 0
+                if deleted:
+                    self.topology_version += 1
+                return deleted
                 
         except Neo4jError as e:
             logger.error(f"Neo4j error deleting edge: {e}")
@@ -561,6 +630,86 @@ class GraphEngine:
             logger.error(f"Neo4j error finding exposure paths: {e}")
             raise GraphEngineError(f"Failed to find paths: {e}") from e
     
+    async def find_exposure_paths_bulk(
+        self,
+        source_ids: List[str],
+        max_depth: int = 5,
+        limit: int = 10
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Find exposure paths for many source nodes in a single query.
+        
+        Args:
+            source_ids: Starting node identifiers
+            max_depth: Maximum path length
+            limit: Maximum number of paths per source node
+            
+        Returns:
+            Path data (as returned by find_exposure_paths) keyed by source ID
+        """
+        query = PathQueries.FIND_EXPOSURE_PATHS_BULK.format(max_depth=max_depth)
+        
+        try:
+            async with self._session() as session:
+                result = await session.run(
+                    query,
+                    source_ids=list(source_ids),
+                    limit=limit
+                )
+                paths: Dict[str, List[Dict[str, Any]]] = {
+                    source_id: [] for source_id in source_ids
+                }
+                for record in await result.data():
+                    source_id = record.pop("source_id")
+                    paths[source_id].append(record)
+                return paths
+                
+        except Neo4jError as e:
+            logger.error(f"Neo4j error finding exposure paths: {e}")
+            raise GraphEngineError(f"Failed to find paths: {e}") from e
+    
+    async def get_exposure_summary_bulk(
+        self,
+        source_ids: List[str],
+        max_depth: int = 5,
+        limit: int = 10
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Summarize exposure paths for many source nodes in a single query.
+        
+        Paths are counted and measured in the database, so no path data
+        is returned to the client.
+        
+        Args:
+            source_ids: Starting node identifiers
+            max_depth: Maximum path length
+            limit: Maximum number of paths counted per source node
+            
+        Returns:
+            {"path_count", "shortest_path_length"} keyed by source ID
+            (shortest_path_length is None when no path exists)
+        """
+        query = PathQueries.EXPOSURE_SUMMARY_BULK.format(max_depth=max_depth)
+        
+        try:
+            async with self._session() as session:
+                result = await session.run(
+                    query,
+                    source_ids=list(source_ids),
+                    limit=limit
+                )
+                return {
+                    record["source_id"]: {
+                        "path_count": record["path_count"],
+                        "shortest_path_length": record["shortest_path_length"],
+                    }
+                    for record in await result.data()
+                }
+                
+        except Neo4jError as e:
+            logger.error(f"Neo4j error summarizing exposure paths: {e}")
+            raise GraphEngineError(f"Failed to summarize paths: {e}") from e
+    
     async def find_ai_exposure_paths(
         self,
         min_sensitivity: float = 0.5,
@@ -46,6 +46,12 @@ class NodeQueries:
     RETURN n
     """
     
+    GET_NODES_BY_IDS = """
+    UNWIND $ids AS node_id
+    MATCH (n {{id: node_id}})
+    RETURN node_id, n
+    """
+    
     GET_NODES_BY_TYPE = """
     MATCH (n:{label})
     RETURN n
@@ -149,6 +155,20 @@ class EdgeQueries:
            CASE WHEN startNode(r) = n THEN 'outgoing' ELSE 'incoming' END as direction
     """
     
+    GET_CONNECTION_COUNTS_BY_IDS = """
+    UNWIND $ids AS node_id
+    MATCH (n {{id: node_id}})
+    OPTIONAL MATCH (n)-[r]-(m)
+    RETURN node_id,
+           count(CASE WHEN startNode(r) <> n THEN 1 END) as inbound,
+           count(CASE WHEN startNode(r) = n THEN 1 END) as outbound,
+           count(CASE WHEN m:AITool THEN 1 END) as ai_tools,
+           count(CASE WHEN m:External OR m.is_public = true THEN 1 END) as external,
+           count(CASE WHEN type(r) = 'MOVES_DATA_TO'
+                       AND (n.sensitivity_likelihood >= 0.5 OR m.sensitivity_likelihood >= 0.5)
+                      THEN 1 END) as sensitive
+    """
+    
     # =========================================================================
     # Update Operations
     # =========================================================================
@@ -196,6 +216,38 @@ class PathQueries:
     LIMIT $limit
     """
     
+    FIND_EXPOSURE_PATHS_BULK = """
+    UNWIND $source_ids AS source_id
+    CALL {{
+        WITH source_id
+        MATCH path = (source {{id: source_id}})-[*1..{max_depth}]->(target)
+        WHERE target:External OR target:AITool OR target.is_public = true
+        RETURN path, length(path) as path_length
+        ORDER BY path_length
+        LIMIT $limit
+    }}
+    RETURN source_id,
+           path,
+           path_length,
+           [n in nodes(path) | n.id] as node_ids,
+           [r in relationships(path) | type(r)] as relationship_types
+    """
+    
+    EXPOSURE_SUMMARY_BULK = """
+    UNWIND $source_ids AS source_id
+    CALL {{
+        WITH source_id
+        OPTIONAL MATCH path = (source {{id: source_id}})-[*1..{max_depth}]->(target)
+        WHERE target:External OR target:AITool OR target.is_public = true
+        WITH length(path) as path_length
+        ORDER BY path_length
+        LIMIT $limit
+        RETURN count(path_length) as path_count,
+               min(path_length) as shortest_path_length
+    }}
+    RETURN source_id, path_count, shortest_path_length
+    """
+    
     FIND_SHORTEST_PATH = """
     MATCH path = shortestPath(
         (source {{id: $source_id}})-[*..{max_depth}]-(target {{id: $target_id}})
@@ -8,6 +8,7 @@ Modules:
     - signatures: Feature engineering and risk pattern detection
     - training: Model training and evaluation
     - inference: Real-time prediction and batch scoring
+    - jit: Optional Numba acceleration for numeric kernels
 
 Author: PDRI Team
 Version: 1.0.0
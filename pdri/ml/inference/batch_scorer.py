@@ -15,13 +15,36 @@ Version: 1.0.0
 """
 
 import asyncio
-from dataclasses import dataclass
+import json
+import logging
+import random
+import weakref
+from collections.abc import Sequence
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 import numpy as np
 
+from .predictor import RiskPrediction
 
-@dataclass
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize one JSON value to bytes, using orjson when available."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj).encode("utf-8")
+
+
+@dataclass(slots=True)
 class BatchJob:
     """A batch scoring job."""
     job_id: str
@@ -34,6 +57,7 @@ class BatchJob:
     failed_items: int = 0
     error_message: Optional[str] = None
     results_path: Optional[str] = None
+    done_event: asyncio.Event = field(default_factory=asyncio.Event, repr=False, compare=False)
     
     @property
     def progress(self) -> float:
@@ -57,25 +81,238 @@ class BatchJob:
         }
 
 
-@dataclass
+# Columnar layout of batch predictions: column name -> dtype. Columns
+# listed in CATEGORICAL_COLUMNS hold codes into BatchResult.categories.
+PREDICTION_COLUMNS = {
+    "node_id": np.str_,
+    "risk_probability": np.float64,
+    "risk_class": np.int64,
+    "risk_label": np.int32,
+    "confidence": np.float64,
+    "timestamp": np.int32,
+    "model_version": np.int32,
+}
+
+# Few distinct values per job (one timestamp per scored chunk)
+CATEGORICAL_COLUMNS = ("risk_label", "timestamp", "model_version")
+
+
+class _FloatDictColumn:
+    """
+    Column of Optional[Dict[str, float]] values stored as a float64 matrix.
+    
+    Rows whose keys match the first row's keys, in order (normally all of
+    them, as one predictor produces them), take one matrix row; rows with
+    other keys are kept aside by position.
+    """
+    
+    __slots__ = ("names", "matrix", "missing", "irregular")
+    
+    def __init__(self, size: int):
+        self.names: Optional[Tuple[str, ...]] = None
+        self.matrix: Optional[np.ndarray] = None
+        self.missing = np.ones(size, dtype=bool)
+        self.irregular: Dict[int, Dict[str, float]] = {}
+    
+    def __len__(self) -> int:
+        return len(self.missing)
+    
+    def set(self, position: int, value: Optional[Dict[str, float]]) -> None:
+        self.irregular.pop(position, None)
+        self.missing[position] = value is None
+        if value is None:
+            return
+        if self.names is None:
+            self.names = tuple(value)
+            self.matrix = np.empty((len(self), len(self.names)), dtype=np.float64)
+        if len(value) == len(self.names) and tuple(value) == self.names:
+            self.matrix[position] = list(value.values())
+        else:
+            self.irregular[position] = dict(value)
+    
+    def get(self, position: int) -> Optional[Dict[str, float]]:
+        if self.missing[position]:
+            return None
+        value = self.irregular.get(position)
+        if value is not None:
+            return dict(value)
+        return dict(zip(self.names, self.matrix[position].tolist()))
+    
+    def take(self, mask: np.ndarray) -> "_FloatDictColumn":
+        """Copy of the rows selected by a boolean mask."""
+        taken = _FloatDictColumn(int(mask.sum()))
+        taken.names = self.names
+        taken.missing = self.missing[mask]
+        if self.matrix is not None:
+            taken.matrix = self.matrix[mask]
+        new_positions = np.cumsum(mask) - 1
+        taken.irregular = {
+            int(new_positions[position]): value
+            for position, value in self.irregular.items()
+            if mask[position]
+        }
+        return taken
+
+
+@dataclass(slots=True)
 class BatchResult:
-    """Results from a batch scoring run."""
+    """
+    Results from a batch scoring run.
+    
+    Predictions are held column-wise, in input order: scalar fields in
+    ``columns`` (see PREDICTION_COLUMNS), features and explanations as
+    float matrices. ``predictions`` builds RiskPrediction objects from
+    the columns on access.
+    """
     job_id: str
-    predictions: List[Dict[str, Any]]
     summary: Dict[str, Any]
     duration_seconds: float
     timestamp: datetime
+    columns: Dict[str, np.ndarray]
+    categories: Dict[str, List[Any]]
+    features_used: _FloatDictColumn = field(repr=False)
+    explanations: _FloatDictColumn = field(repr=False)
+    
+    def __len__(self) -> int:
+        return len(self.columns["node_id"])
+    
+    @property
+    def predictions(self) -> Sequence[RiskPrediction]:
+        """The predictions as RiskPrediction objects, built on access."""
+        return _PredictionView(self)
+    
+    def prediction(self, position: int) -> RiskPrediction:
+        """Build the RiskPrediction at a position."""
+        columns, categories = self.columns, self.categories
+        return RiskPrediction(
+            node_id=str(columns["node_id"][position]),
+            risk_probability=float(columns["risk_probability"][position]),
+            risk_class=int(columns["risk_class"][position]),
+            risk_label=categories["risk_label"][columns["risk_label"][position]],
+            confidence=float(columns["confidence"][position]),
+            timestamp=categories["timestamp"][columns["timestamp"][position]],
+            model_version=categories["model_version"][columns["model_version"][position]],
+            features_used=self.features_used.get(position),
+            explanation=self.explanations.get(position),
+        )
+    
+    def iter_dicts(self) -> Iterator[Dict[str, Any]]:
+        """
+        Rows as RiskPrediction.to_dict() would give them, read straight
+        from the columns.
+        """
+        columns, categories = self.columns, self.categories
+        labels = categories["risk_label"]
+        timestamps = [ts.isoformat() for ts in categories["timestamp"]]
+        versions = categories["model_version"]
+        rows = zip(
+            columns["node_id"].tolist(),
+            columns["risk_probability"].tolist(),
+            columns["risk_class"].tolist(),
+            columns["risk_label"].tolist(),
+            columns["confidence"].tolist(),
+            columns["timestamp"].tolist(),
+            columns["model_version"].tolist(),
+        )
+        for position, (node_id, probability, risk_class, label, confidence, ts, version) in enumerate(rows):
+            yield {
+                "node_id": node_id,
+                "risk_probability": probability,
+                "risk_class": risk_class,
+                "risk_label": labels[label],
+                "confidence": confidence,
+                "timestamp": timestamps[ts],
+                "model_version": versions[version],
+                "features_used": self.features_used.get(position),
+                "explanation": self.explanations.get(position),
+            }
     
     def to_dict(self) -> Dict[str, Any]:
         return {
             "job_id": self.job_id,
-            "prediction_count": len(self.predictions),
+            "prediction_count": len(self),
             "summary": self.summary,
             "duration_seconds": self.duration_seconds,
             "timestamp": self.timestamp.isoformat(),
         }
 
 
+class _PredictionView(Sequence):
+    """Read-only sequence of a BatchResult's predictions."""
+    
+    __slots__ = ("_result",)
+    
+    def __init__(self, result: BatchResult):
+        self._result = result
+    
+    def __len__(self) -> int:
+        return len(self._result)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._result.prediction(i) for i in range(len(self))[index]]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("prediction index out of range")
+        return self._result.prediction(index)
+
+
+class _ColumnWriter:
+    """Fills the columns of a BatchResult by input position."""
+    
+    def __init__(self, node_ids: List[str]):
+        size = len(node_ids)
+        # Scored rows always carry their input node ID, so that column is
+        # complete from the start
+        self.columns = {
+            name: (
+                np.asarray(node_ids, dtype=dtype) if name == "node_id"
+                else np.empty(size, dtype=dtype)
+            )
+            for name, dtype in PREDICTION_COLUMNS.items()
+        }
+        self.codes: Dict[str, Dict[Any, int]] = {name: {} for name in CATEGORICAL_COLUMNS}
+        self.features_used = _FloatDictColumn(size)
+        self.explanations = _FloatDictColumn(size)
+        self.scored = np.zeros(size, dtype=bool)
+    
+    def write(self, position: int, prediction: RiskPrediction) -> None:
+        """Write one prediction at position."""
+        columns = self.columns
+        columns["risk_probability"][position] = prediction.risk_probability
+        columns["risk_class"][position] = prediction.risk_class
+        columns["confidence"][position] = prediction.confidence
+        for name in CATEGORICAL_COLUMNS:
+            codes = self.codes[name]
+            columns[name][position] = codes.setdefault(getattr(prediction, name), len(codes))
+        self.features_used.set(position, prediction.features_used)
+        self.explanations.set(position, prediction.explanation)
+        self.scored[position] = True
+    
+    def finish(
+        self,
+        job_id: str,
+        summary: Callable[[Dict[str, np.ndarray], Dict[str, List[Any]]], Dict[str, Any]],
+        duration_seconds: float,
+        timestamp: datetime
+    ) -> BatchResult:
+        """BatchResult of the scored rows, in input order."""
+        scored = self.scored
+        columns = {name: column[scored] for name, column in self.columns.items()}
+        categories = {name: list(codes) for name, codes in self.codes.items()}
+        return BatchResult(
+            job_id=job_id,
+            summary=summary(columns, categories),
+            duration_seconds=duration_seconds,
+            timestamp=timestamp,
+            columns=columns,
+            categories=categories,
+            features_used=self.features_used.take(scored),
+            explanations=self.explanations.take(scored),
+        )
+
+
 class BatchScorer:
     """
     High-throughput batch risk scoring.
@@ -87,12 +324,23 @@ class BatchScorer:
     - Automatic chunking
     - Error handling and retry
     
+    The predictor needs an async ``predict(node_id)``. If it also has
+    ``predict_batch(node_ids)`` chunks are scored with one call each, and
+    if it has ``create_inference_executor(max_workers)`` inference runs in
+    that process pool, which is then passed as
+    ``predict_batch(node_ids, executor=pool)``. The pool is rebuilt when
+    the predictor's ``model_generation`` changes, and shut down by close(),
+    on leaving ``async with``, or at interpreter exit.
+    
     Example:
-        scorer = BatchScorer(predictor)
-        job = await scorer.submit_job(node_ids)
-        result = await scorer.wait_for_completion(job.job_id)
+        async with BatchScorer(predictor) as scorer:
+            job = await scorer.submit_job(node_ids)
+            result = await scorer.wait_for_completion(job.job_id)
     """
     
+    # Initial retry delay in seconds, doubled on each further attempt
+    RETRY_BASE_DELAY = 0.1
+    
     def __init__(
         self,
         predictor: Any,
@@ -108,7 +356,8 @@ class BatchScorer:
             predictor: RiskPredictor instance
             graph_engine: Optional graph engine for querying nodes
             chunk_size: Number of items per batch
-            max_workers: Number of parallel workers
+            max_workers: Number of chunks scored in parallel (one inference
+                process per worker)
             retry_count: Number of retries for failed items
         """
         self.predictor = predictor
@@ -121,6 +370,20 @@ class BatchScorer:
         self._jobs: Dict[str, BatchJob] = {}
         self._results: Dict[str, BatchResult] = {}
         self._job_counter = 0
+        
+        # Inference process pool shared by all jobs, started by the first
+        # job and rebuilt when the predictor loads another model
+        self._executor: Optional[Executor] = None
+        self._executor_started = False
+        self._executor_generation: Optional[int] = None
+        self._executor_finalizer: Optional[weakref.finalize] = None
+        self._executor_lock = asyncio.Lock()
+    
+    async def __aenter__(self) -> "BatchScorer":
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
     
     async def submit_job(
         self,
@@ -176,22 +439,37 @@ class BatchScorer:
             
             job.total_items = len(node_ids)
             
-            # Process in chunks
-            predictions = []
+            # Process in chunks; predictions are written into the columns
+            # by input position as chunks complete, and compacted once the
+            # job is done
+            writer = _ColumnWriter(node_ids)
             failed = []
+            failed_positions: Dict[str, List[int]] = {}
             
-            for i in range(0, len(node_ids), self.chunk_size):
-                chunk = node_ids[i:i + self.chunk_size]
-                
-                # Process chunk with semaphore for concurrency control
-                chunk_results = await self._process_chunk(chunk)
+            # Model inference holds the GIL, so spread chunks across processes
+            executor = await self._get_executor()
+            semaphore = asyncio.Semaphore(self.max_workers)
+            
+            async def run_chunk(offset: int) -> tuple:
+                async with semaphore:
+                    chunk = node_ids[offset:offset + self.chunk_size]
+                    return offset, await self._process_chunk(chunk, executor)
+            
+            tasks = [
+                run_chunk(offset)
+                for offset in range(0, len(node_ids), self.chunk_size)
+            ]
+            
+            for next_chunk in asyncio.as_completed(tasks):
+                offset, chunk_results = await next_chunk
                 
-                for node_id, result in chunk_results:
+                for position, (node_id, result) in enumerate(chunk_results, start=offset):
                     if result is not None:
-                        predictions.append(result)
+                        writer.write(position, result)
                         job.processed_items += 1
                     else:
                         failed.append(node_id)
+                        failed_positions.setdefault(node_id, []).append(position)
                         job.failed_items += 1
                 
                 # Progress callback
@@ -201,7 +479,8 @@ class BatchScorer:
             # Retry failed items
             if failed and self.retry_count > 0:
                 retried = await self._retry_failed(failed)
-                predictions.extend(retried)
+                for result in retried:
+                    writer.write(failed_positions[result.node_id].pop(), result)
                 job.processed_items += len(retried)
                 job.failed_items -= len(retried)
             
@@ -211,20 +490,64 @@ class BatchScorer:
             
             duration = (job.completed_at - job.started_at).total_seconds()
             
-            summary = self._create_summary(predictions)
-            
-            self._results[job_id] = BatchResult(
-                job_id=job_id,
-                predictions=predictions,
-                summary=summary,
-                duration_seconds=duration,
-                timestamp=job.completed_at,
+            self._results[job_id] = writer.finish(
+                job_id, self._create_summary, duration, job.completed_at,
             )
             
         except Exception as e:
             job.status = "failed"
             job.error_message = str(e)
             job.completed_at = datetime.now(timezone.utc)
+        finally:
+            job.done_event.set()
+    
+    async def _get_executor(self) -> Optional[Executor]:
+        """
+        Process pool for model inference, created on first use and kept
+        for later jobs so the model is shipped to the workers only once.
+        
+        Returns:
+            The shared pool, or None if the predictor has no pool or the
+            model cannot run in one
+        """
+        async with self._executor_lock:
+            stale = self._executor_generation != self._model_generation()
+            if self._executor_started and stale:
+                # Workers hold the model the pool was started with; let
+                # chunks already queued on it finish and start a new one
+                logger.info("Predictor model changed, restarting inference pool")
+                self._shutdown_executor(cancel_futures=False)
+            
+            if not self._executor_started:
+                create = getattr(self.predictor, "create_inference_executor", None)
+                if create is not None:
+                    self._executor = await create(self.max_workers)
+                # Read after creating: creating the pool may load the model
+                self._executor_generation = self._model_generation()
+                self._executor_started = True
+                if self._executor is not None:
+                    self._executor_finalizer = weakref.finalize(
+                        self, self._executor.shutdown, wait=False, cancel_futures=True
+                    )
+        return self._executor
+    
+    def _model_generation(self) -> Optional[int]:
+        """The predictor's model_generation, if it tracks one."""
+        return getattr(self.predictor, "model_generation", None)
+    
+    def _shutdown_executor(self, cancel_futures: bool) -> None:
+        """Shut down the inference pool and forget it."""
+        if self._executor_finalizer is not None:
+            self._executor_finalizer.detach()
+            self._executor_finalizer = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=cancel_futures)
+            self._executor = None
+        self._executor_started = False
+    
+    def close(self) -> None:
+        """Shut down the inference process pool, if it was started."""
+        self._shutdown_executor(cancel_futures=True)
     
     async def _get_all_nodes(
         self,
@@ -238,63 +561,74 @@ class BatchScorer:
     
     async def _process_chunk(
         self,
-        node_ids: List[str]
+        node_ids: List[str],
+        executor: Optional[Executor] = None
     ) -> List[tuple]:
         """Process a chunk of nodes."""
-        semaphore = asyncio.Semaphore(self.max_workers)
-        
-        async def process_one(node_id: str):
-            async with semaphore:
-                try:
-                    prediction = await self.predictor.predict(node_id)
-                    return (node_id, prediction.to_dict())
-                except Exception:
-                    return (node_id, None)
+        predict_batch = getattr(self.predictor, "predict_batch", None)
+        try:
+            if predict_batch is None:
+                results = await asyncio.gather(
+                    *(self.predictor.predict(node_id) for node_id in node_ids),
+                    return_exceptions=True,
+                )
+                predictions = [r for r in results if not isinstance(r, Exception)]
+            elif executor is not None:
+                predictions = await predict_batch(node_ids, executor=executor)
+            else:
+                predictions = await predict_batch(node_ids)
+        except Exception:
+            predictions = []
         
-        tasks = [process_one(node_id) for node_id in node_ids]
-        return await asyncio.gather(*tasks)
+        by_node = {p.node_id: p for p in predictions}
+        return [(node_id, by_node.get(node_id)) for node_id in node_ids]
     
     async def _retry_failed(
         self,
         failed_ids: List[str]
-    ) -> List[Dict[str, Any]]:
-        """Retry failed predictions."""
-        results = []
+    ) -> List[RiskPrediction]:
+        """Retry failed predictions concurrently, backing off per item."""
+        semaphore = asyncio.Semaphore(self.max_workers)
         
-        for _ in range(self.retry_count):
-            still_failed = []
-            
-            for node_id in failed_ids:
+        async def retry_one(node_id: str) -> Optional[RiskPrediction]:
+            for attempt in range(self.retry_count):
+                if attempt:
+                    # Exponential backoff with jitter
+                    await asyncio.sleep(
+                        self.RETRY_BASE_DELAY * 2 ** (attempt - 1) + random.uniform(0, 0.05)
+                    )
                 try:
-                    prediction = await self.predictor.predict(node_id)
-                    results.append(prediction.to_dict())
+                    async with semaphore:
+                        return await self.predictor.predict(node_id)
                 except Exception:
-                    still_failed.append(node_id)
-            
-            failed_ids = still_failed
-            if not failed_ids:
-                break
-            
-            # Exponential backoff
-            await asyncio.sleep(1)
+                    continue
+            return None
         
-        return results
+        results = await asyncio.gather(*(retry_one(node_id) for node_id in failed_ids))
+        return [result for result in results if result is not None]
     
-    def _create_summary(self, predictions: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Create summary statistics from predictions."""
-        if not predictions:
+    def _create_summary(
+        self,
+        columns: Dict[str, np.ndarray],
+        categories: Dict[str, List[Any]]
+    ) -> Dict[str, Any]:
+        """Create summary statistics from columnar predictions."""
+        probabilities = columns["risk_probability"]
+        total = len(probabilities)
+        if not total:
             return {"total": 0}
         
-        probabilities = [p["risk_probability"] for p in predictions]
-        
         # Risk distribution
         distribution = {"low": 0, "medium": 0, "high": 0, "critical": 0}
-        for p in predictions:
-            label = p.get("risk_label", "medium")
-            distribution[label] = distribution.get(label, 0) + 1
+        counts = np.bincount(columns["risk_label"], minlength=len(categories["risk_label"]))
+        distribution.update(sorted(
+            (label, count)
+            for label, count in zip(categories["risk_label"], counts.tolist())
+            if count
+        ))
         
         return {
-            "total": len(predictions),
+            "total": total,
             "risk_distribution": distribution,
             "statistics": {
                 "mean": float(np.mean(probabilities)),
@@ -308,7 +642,7 @@ class BatchScorer:
             "high_risk_count": distribution.get("high", 0) + distribution.get("critical", 0),
             "high_risk_percentage": (
                 (distribution.get("high", 0) + distribution.get("critical", 0)) 
-                / len(predictions) * 100
+                / total * 100
             ),
         }
     
@@ -328,26 +662,22 @@ class BatchScorer:
         Args:
             job_id: Job ID to wait for
             timeout_seconds: Maximum wait time
-            poll_interval: Polling interval
+            poll_interval: Unused; kept for backward compatibility
         
         Returns:
             BatchResult if completed, None if timeout or not found
         """
-        start = datetime.now(timezone.utc)
+        job = self._jobs.get(job_id)
+        if not job:
+            return None
         
-        while True:
-            job = self._jobs.get(job_id)
-            if not job:
-                return None
-            
-            if job.status in ("completed", "failed"):
-                return self._results.get(job_id)
-            
-            elapsed = (datetime.now(timezone.utc) - start).total_seconds()
-            if elapsed >= timeout_seconds:
-                return None
-            
-            await asyncio.sleep(poll_interval)
+        # Woken once by _run_job instead of polling the job status
+        try:
+            await asyncio.wait_for(job.done_event.wait(), timeout=timeout_seconds)
+        except asyncio.TimeoutError:
+            return None
+        
+        return self._results.get(job_id)
     
     async def get_results(self, job_id: str) -> Optional[BatchResult]:
         """Get results of a completed job."""
@@ -397,7 +727,7 @@ class BatchScorer:
         
         Args:
             job_id: Job ID
-            format: Output format ("json", "csv")
+            format: Output format ("json", "ndjson", "csv")
             path: Optional output path
         
         Returns:
@@ -410,21 +740,34 @@ class BatchScorer:
         if path is None:
             path = f"batch_results_{job_id}.{format}"
         
+        # Rows are read from the columns and serialized one at a time so
+        # the output never has to be held in memory as a whole
         if format == "json":
-            import json
-            with open(path, "w") as f:
-                json.dump({
-                    "job_id": result.job_id,
-                    "summary": result.summary,
-                    "predictions": result.predictions,
-                }, f, indent=2)
+            with open(path, "wb") as f:
+                f.write(b'{"job_id":' + _dumps(result.job_id))
+                f.write(b',"summary":' + _dumps(result.summary))
+                f.write(b',"predictions":[')
+                for i, row in enumerate(result.iter_dicts()):
+                    if i:
+                        f.write(b",")
+                    f.write(b"\n" + _dumps(row))
+                f.write(b"\n]}\n")
+        elif format == "ndjson":
+            # Header line followed by one prediction per line
+            with open(path, "wb") as f:
+                f.write(_dumps({"job_id": result.job_id, "summary": result.summary}) + b"\n")
+                for row in result.iter_dicts():
+                    f.write(_dumps(row) + b"\n")
         elif format == "csv":
             import csv
             with open(path, "w", newline="") as f:
-                if result.predictions:
-                    writer = csv.DictWriter(f, fieldnames=result.predictions[0].keys())
+                rows = result.iter_dicts()
+                first = next(rows, None)
+                if first is not None:
+                    writer = csv.DictWriter(f, fieldnames=first.keys())
                     writer.writeheader()
-                    writer.writerows(result.predictions)
+                    writer.writerow(first)
+                    writer.writerows(rows)
         else:
             raise ValueError(f"Unknown format: {format}")
         
@@ -14,13 +14,111 @@ Author: PDRI Team
 Version: 1.0.0
 """
 
+import asyncio
+import logging
+import multiprocessing
+import pickle
+import weakref
+from concurrent.futures import Executor, ProcessPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 import numpy as np
 
+from ..jit import njit
 
-@dataclass
+logger = logging.getLogger(__name__)
+
+
+def _feature_dict(features: Any) -> Dict[str, float]:
+    """Copy of a vector's features, via its to_dict() when it has one."""
+    to_dict = getattr(features, "to_dict", None)
+    return to_dict() if to_dict is not None else dict(features)
+
+
+@njit(cache=True)
+def _basic_explanation_impacts(
+    X: np.ndarray,
+    columns: np.ndarray,
+    risk_score_pos: int
+) -> np.ndarray:
+    """
+    Compute basic explanation impacts for every row of X at once.
+    
+    Works in float64 whatever X's dtype, and without fastmath (which
+    turns the division into a reciprocal multiply), so the impacts match
+    the per-feature float arithmetic exactly.
+    """
+    impacts = X[:, columns].astype(np.float64) - 0.5
+    if risk_score_pos >= 0:
+        risk_scores = X[:, columns[risk_score_pos]].astype(np.float64)
+        impacts[:, risk_score_pos] = (risk_scores - 50.0) / 50.0
+    return impacts
+
+
+ScoreFn = Callable[[Any, np.ndarray], Tuple[np.ndarray, np.ndarray, np.ndarray]]
+ExplainFn = Callable[[np.ndarray, List[str]], List[Dict[str, float]]]
+
+
+def _score_classifier(
+    model: Any,
+    X: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Score a feature matrix with a probabilistic classifier."""
+    proba = model.predict_proba(X)
+    probabilities = proba[:, 1] if proba.shape[1] > 1 else proba[:, 0]
+    classes = model.predict(X)
+    confidences = proba.max(axis=1)
+    return probabilities, classes, confidences
+
+
+def _score_regressor(
+    model: Any,
+    X: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Score a feature matrix with a model that predicts a probability directly."""
+    probabilities = np.asarray(model.predict(X), dtype=np.float64)
+    classes = (probabilities >= 0.5).astype(np.int64)
+    confidences = np.abs(probabilities - 0.5) * 2  # Distance from boundary
+    return probabilities, classes, confidences
+
+
+def _select_score_fn(model: Any) -> ScoreFn:
+    """Pick the scoring path for a model once, at load time."""
+    return _score_classifier if hasattr(model, 'predict_proba') else _score_regressor
+
+
+# Model and scoring path loaded once per inference worker process
+_worker_model = None
+_worker_score_fn: Optional[ScoreFn] = None
+
+
+def _init_inference_worker(model_bytes: bytes) -> None:
+    """Process pool initializer: unpickle the model for this worker."""
+    global _worker_model, _worker_score_fn
+    _worker_model = pickle.loads(model_bytes)
+    _worker_score_fn = _select_score_fn(_worker_model)
+
+
+def _inference_mp_context() -> multiprocessing.context.BaseContext:
+    """
+    Start method for inference workers.
+    
+    Forking a process whose numba parallel kernels have started the TBB
+    thread pool can leave it hanging at exit, so workers are started from
+    a clean forkserver process (spawn where forkserver is unavailable).
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+def _score_in_worker(X: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Score a feature matrix with the worker's model."""
+    return _worker_score_fn(_worker_model, X)
+
+
+@dataclass(slots=True)
 class RiskPrediction:
     """A risk prediction result."""
     node_id: str
@@ -71,6 +169,15 @@ class RiskPredictor:
         "critical": 1.0,
     }
     
+    # High-value features highlighted by the basic explanation
+    EXPLANATION_FEATURES = (
+        "current_risk_score",
+        "exposure_score",
+        "sensitivity_score",
+        "ai_tool_connection_count",
+        "exposure_path_count",
+    )
+    
     def __init__(
         self,
         model_registry: Any,
@@ -97,8 +204,22 @@ class RiskPredictor:
         self._model_version = None
         self._feature_names = None
         
+        # Bumped by every load_model; inference pools are tagged with the
+        # generation whose model they were started with
+        self._model_generation = 0
+        self._executor_generations: "weakref.WeakKeyDictionary[Executor, int]" = (
+            weakref.WeakKeyDictionary()
+        )
+        
+        # Scoring and explanation paths, bound in load_model
+        self._score_fn: Optional[ScoreFn] = None
+        self._explain_fn: Optional[ExplainFn] = None
+        
         # Explainer (SHAP)
         self._explainer = None
+        
+        # Basic explanation columns for the model's feature order
+        self._explanation_columns = None
     
     async def load_model(self) -> None:
         """Load production model from registry."""
@@ -111,18 +232,40 @@ class RiskPredictor:
             raise RuntimeError(f"No production model found for {self.model_type}")
         
         self._model = model
+        self._model_generation += 1
         
         # Get version info
         for registered in self.model_registry.list_models(model_type_enum):
             prod_version = registered.production_version
             if prod_version:
                 self._model_version = prod_version.version_id
-                self._feature_names = prod_version.feature_names
+                # A tuple, so it compares equal to FeatureVector.feature_names
+                self._feature_names = tuple(prod_version.feature_names)
                 break
         
+        if self._feature_names:
+            self._explanation_columns = self._resolve_explanation_columns(
+                self._feature_names
+            )
+        
         # Initialize explainer
         if self.enable_explanations:
             self._init_explainer()
+        
+        # Specialize the per-call paths now that the model is known
+        self._score_fn = _select_score_fn(model)
+        if not self.enable_explanations:
+            self._explain_fn = None
+        elif self._explainer is not None:
+            self._explain_fn = self._explain_prediction_batch
+        else:
+            # Fallback to basic feature importance
+            self._explain_fn = self._basic_explanation_batch
+    
+    @property
+    def model_generation(self) -> int:
+        """Counter that changes whenever load_model loads a model."""
+        return self._model_generation
     
     def _init_explainer(self) -> None:
         """Initialize SHAP explainer for model explanations."""
@@ -159,36 +302,32 @@ class RiskPredictor:
         # Get features
         if features is None:
             feature_vector = await self.feature_engineer.extract_features(node_id)
-            features = feature_vector.features
+            features = _feature_dict(feature_vector.features)
             feature_names = feature_vector.feature_names
         else:
+            feature_vector = None
             feature_names = list(features.keys())
         
         # Prepare input
-        X = self._prepare_features(features, feature_names)
+        if feature_vector is not None and feature_names == (self._feature_names or feature_names):
+            # The vector already holds its values in model column order
+            X = feature_vector.values.reshape(1, -1)
+        else:
+            X = self._prepare_features(features, feature_names)
         
         # Predict
-        if hasattr(self._model, 'predict_proba'):
-            proba = self._model.predict_proba(X)[0]
-            risk_probability = float(proba[1]) if len(proba) > 1 else float(proba[0])
-            risk_class = int(self._model.predict(X)[0])
-            confidence = float(max(proba))
-        else:
-            prediction = self._model.predict(X)[0]
-            risk_probability = float(prediction)
-            risk_class = 1 if prediction >= 0.5 else 0
-            confidence = abs(prediction - 0.5) * 2  # Distance from boundary
+        probabilities, classes, confidences = self._score_matrix(X)
+        risk_probability = float(probabilities[0])
+        risk_class = int(classes[0])
+        confidence = float(confidences[0])
         
         # Determine risk label
         risk_label = self._classify_risk(risk_probability)
         
         # Get explanation
         explanation = None
-        if self.enable_explanations and self._explainer is not None:
-            explanation = self._explain_prediction(X)
-        elif self.enable_explanations:
-            # Fallback to basic feature importance
-            explanation = self._basic_explanation(features)
+        if self._explain_fn is not None:
+            explanation = self._explain_fn(X, self._feature_names or feature_names)[0]
         
         return RiskPrediction(
             node_id=node_id,
@@ -204,27 +343,169 @@ class RiskPredictor:
     
     async def predict_batch(
         self,
-        node_ids: List[str]
+        node_ids: List[str],
+        executor: Optional[Executor] = None
     ) -> List[RiskPrediction]:
         """
         Predict risk for multiple nodes.
         
         Args:
             node_ids: List of node IDs
+            executor: Optional pool from create_inference_executor to run
+                model inference in; ignored if the model has been reloaded
+                since the pool was created
         
         Returns:
-            List of RiskPrediction objects
+            List of RiskPrediction objects (nodes that failed are omitted)
         """
+        if self._model is None:
+            await self.load_model()
+        
+        # Overlap feature extraction I/O across nodes
+        results = await asyncio.gather(
+            *(self.feature_engineer.extract_features(node_id) for node_id in node_ids),
+            return_exceptions=True,
+        )
+        
+        vectors = []
+        for node_id, result in zip(node_ids, results):
+            if isinstance(result, Exception):
+                # Log error and continue
+                logger.warning("Error extracting features for %s: %s", node_id, result)
+            else:
+                vectors.append(result)
+        
+        if not vectors:
+            return []
+        
+        pool_generation = self._executor_generations.get(executor) if executor else None
+        if executor is not None and pool_generation != self._model_generation:
+            # The pool's workers hold an older model, or are not ours
+            logger.debug("Inference pool is stale, scoring in-process")
+            executor = None
+        
+        # Score the whole batch with a single model call
+        feature_names = self._feature_names or vectors[0].feature_names
+        try:
+            X = self._stack_vectors(vectors, feature_names)
+            if executor is None:
+                probabilities, classes, confidences = self._score_matrix(X)
+            else:
+                loop = asyncio.get_running_loop()
+                probabilities, classes, confidences = await loop.run_in_executor(
+                    executor, _score_in_worker, X
+                )
+            return self._build_predictions(
+                vectors, X, feature_names, probabilities, classes, confidences
+            )
+        except Exception as e:
+            logger.warning(
+                "Error predicting batch of %d nodes, scoring them one by one: %s", len(vectors), e
+            )
+        
+        # Fall back to per-node scoring so one bad node only fails itself
         predictions = []
-        for node_id in node_ids:
+        for vector in vectors:
             try:
-                pred = await self.predict(node_id)
-                predictions.append(pred)
+                feature_names = self._feature_names or vector.feature_names
+                X = self._stack_vectors([vector], feature_names)
+                predictions.extend(self._build_predictions(
+                    [vector], X, feature_names, *self._score_matrix(X)
+                ))
             except Exception as e:
-                # Log error and continue
-                print(f"Error predicting {node_id}: {e}")
+                logger.warning("Error predicting %s: %s", vector.node_id, e)
         return predictions
     
+    def _stack_vectors(
+        self,
+        vectors: List[Any],
+        feature_names: Sequence[str]
+    ) -> np.ndarray:
+        """Feature matrix for vectors, one row per vector in model column order."""
+        if all(v.feature_names == feature_names for v in vectors):
+            # Vectors already hold their values in model column order
+            return np.stack([v.values for v in vectors])
+        return np.asarray(
+            [[v.features.get(name, 0.0) for name in feature_names] for v in vectors],
+            dtype=np.float64,
+        )
+    
+    def _build_predictions(
+        self,
+        vectors: List[Any],
+        X: np.ndarray,
+        feature_names: Sequence[str],
+        probabilities: np.ndarray,
+        classes: np.ndarray,
+        confidences: np.ndarray
+    ) -> List[RiskPrediction]:
+        """RiskPredictions for scored vectors, with explanations if enabled."""
+        explanations = [None] * len(vectors)
+        if self._explain_fn is not None:
+            explanations = self._explain_fn(X, feature_names)
+        
+        # One timestamp for the whole batch
+        timestamp = datetime.now(timezone.utc)
+        model_version = self._model_version or "unknown"
+        
+        predictions = []
+        for i, vector in enumerate(vectors):
+            risk_probability = float(probabilities[i])
+            predictions.append(RiskPrediction(
+                node_id=vector.node_id,
+                risk_probability=risk_probability,
+                risk_class=int(classes[i]),
+                risk_label=self._classify_risk(risk_probability),
+                confidence=float(confidences[i]),
+                timestamp=timestamp,
+                model_version=model_version,
+                features_used=_feature_dict(vector.features),
+                explanation=explanations[i],
+            ))
+        return predictions
+    
+    def _score_matrix(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Score a feature matrix, returning (probabilities, classes, confidences)."""
+        return self._score_fn(self._model, X)
+    
+    async def create_inference_executor(
+        self,
+        max_workers: int
+    ) -> Optional[ProcessPoolExecutor]:
+        """
+        Create a process pool for model inference.
+        
+        The model is pickled once and loaded by each worker at startup, so
+        only feature matrices cross the process boundary per call. Workers
+        are not forked, so the model's class must be importable from them.
+        The caller owns the pool and must shut it down, and should replace it
+        once model_generation changes; predict_batch stops using a pool
+        whose model is out of date.
+        
+        Args:
+            max_workers: Number of worker processes
+        
+        Returns:
+            ProcessPoolExecutor, or None if the model cannot be pickled
+        """
+        if self._model is None:
+            await self.load_model()
+        
+        try:
+            model_bytes = pickle.dumps(self._model, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.warning("Model cannot be shipped to worker processes: %s", e)
+            return None
+        
+        executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=_inference_mp_context(),
+            initializer=_init_inference_worker,
+            initargs=(model_bytes,),
+        )
+        self._executor_generations[executor] = self._model_generation
+        return executor
+    
     def _prepare_features(
         self,
         features: Dict[str, float],
@@ -232,12 +513,14 @@ class RiskPredictor:
     ) -> np.ndarray:
         """Prepare features for model input."""
         # Ensure features are in correct order
-        if self._feature_names:
-            ordered = [features.get(name, 0.0) for name in self._feature_names]
-        else:
-            ordered = [features.get(name, 0.0) for name in feature_names]
+        names = self._feature_names or feature_names
         
-        return np.array([ordered])
+        # float64 like the stored feature vectors, so explanations see the
+        # exact feature values
+        ordered = np.fromiter(
+            (features.get(name, 0.0) for name in names), dtype=np.float64, count=len(names)
+        )
+        return ordered.reshape(1, -1)
     
     def _classify_risk(self, probability: float) -> str:
         """Classify probability into risk label."""
@@ -246,55 +529,76 @@ class RiskPredictor:
                 return label
         return "critical"
     
-    def _explain_prediction(self, X: np.ndarray) -> Dict[str, float]:
-        """Get SHAP-based explanation for prediction."""
+    def _explain_prediction_batch(
+        self,
+        X: np.ndarray,
+        feature_names: List[str]
+    ) -> List[Dict[str, float]]:
+        """Get SHAP-based explanations for every row of a feature matrix."""
         try:
-            shap_values = self._explainer.shap_values(X)
+            # One explainer call for the whole batch; the additivity check
+            # would cost an extra full model pass
+            shap_values = self._explainer.shap_values(X, check_additivity=False)
             
             # Handle different SHAP output formats
             if isinstance(shap_values, list):
-                values = shap_values[1][0]  # Class 1 values
+                values = shap_values[1] if len(shap_values) > 1 else shap_values[0]  # Class 1 values
             else:
-                values = shap_values[0]
+                values = np.asarray(shap_values)
+                if values.ndim == 3:
+                    values = values[:, :, 1] if values.shape[2] > 1 else values[:, :, 0]
+            
+            names = feature_names
+            width = min(len(names), values.shape[1])
+            if width == 0:
+                return [{} for _ in range(X.shape[0])]
+            values = values[:, :width]
             
-            explanation = {}
-            for i, name in enumerate(self._feature_names or []):
-                if i < len(values):
-                    explanation[name] = float(values[i])
+            # Top 10 features by absolute impact, selected across the batch
+            top_k = min(10, width)
+            magnitude = np.abs(values)
+            top = np.argpartition(magnitude, width - top_k, axis=1)[:, width - top_k:]
+            order = np.argsort(-np.take_along_axis(magnitude, top, axis=1), axis=1, kind="stable")
+            top = np.take_along_axis(top, order, axis=1)
+            top_values = np.take_along_axis(values, top, axis=1).tolist()
             
-            # Sort by absolute impact
-            return dict(sorted(
-                explanation.items(),
-                key=lambda x: abs(x[1]),
-                reverse=True
-            )[:10])  # Top 10 features
+            return [
+                {names[col]: value for col, value in zip(cols, row)}
+                for cols, row in zip(top.tolist(), top_values)
+            ]
             
         except Exception:
-            return {}
+            return [{} for _ in range(X.shape[0])]
+    
+    def _resolve_explanation_columns(
+        self,
+        feature_names: List[str]
+    ) -> Tuple[List[str], np.ndarray, int]:
+        """Map explanation features to column indices in feature_names."""
+        index = {name: i for i, name in enumerate(feature_names)}
+        names = [name for name in self.EXPLANATION_FEATURES if name in index]
+        columns = np.array([index[name] for name in names], dtype=np.int64)
+        risk_score_pos = (
+            names.index("current_risk_score") if "current_risk_score" in names else -1
+        )
+        return names, columns, risk_score_pos
     
-    def _basic_explanation(self, features: Dict[str, float]) -> Dict[str, float]:
-        """Basic explanation based on feature values."""
-        # Highlight high-value features as contributors
-        important_features = [
-            "current_risk_score",
-            "exposure_score",
-            "sensitivity_score",
-            "ai_tool_connection_count",
-            "exposure_path_count",
-        ]
-        
-        explanation = {}
-        for name in important_features:
-            if name in features:
-                value = features[name]
-                # Normalize to -1 to 1 impact range
-                if name == "current_risk_score":
-                    impact = (value - 50) / 50
-                else:
-                    impact = value - 0.5
-                explanation[name] = float(impact)
-        
-        return explanation
+    def _basic_explanation_batch(
+        self,
+        X: np.ndarray,
+        feature_names: List[str]
+    ) -> List[Dict[str, float]]:
+        """Basic explanations for every row of a feature matrix."""
+        if feature_names is self._feature_names and self._explanation_columns:
+            names, columns, risk_score_pos = self._explanation_columns
+        else:
+            names, columns, risk_score_pos = self._resolve_explanation_columns(feature_names)
+        
+        if not names:
+            return [{} for _ in range(X.shape[0])]
+        
+        impacts = _basic_explanation_impacts(X, columns, risk_score_pos)
+        return [dict(zip(names, row)) for row in impacts.tolist()]
     
     def set_thresholds(self, thresholds: Dict[str, float]) -> None:
         """
@@ -0,0 +1,41 @@
+"""
+JIT Acceleration
+================
+
+Optional Numba acceleration for numeric ML kernels.
+
+Kernels are written against the NumPy subset Numba understands, so the
+same function runs compiled when numba is installed and still runs when
+it is not. Uncompiled, a kernel is an interpreted Python loop over every
+element, far slower than vectorised NumPy. Callers that can see large
+inputs must branch on HAS_NUMBA and use a NumPy path without it.
+
+Author: PDRI Team
+Version: 1.0.0
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    from numba import njit, prange
+
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+    prange = range
+    logger.info("numba not installed — ML kernels run uncompiled")
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+
+        return decorator
+
+
+__all__ = ["HAS_NUMBA", "njit", "prange"]
@@ -14,12 +14,91 @@ Author: PDRI Team
 Version: 1.0.0
 """
 
+import operator
+import warnings
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from enum import Enum
+from itertools import chain
 from typing import Any, Dict, List, Optional, Tuple
 import numpy as np
 
+from ..jit import HAS_NUMBA, njit, prange
+
+
+def _average_path_length(n_samples: np.ndarray) -> np.ndarray:
+    """Average path length c(n) of an unsuccessful BST search over n samples."""
+    n = np.asarray(n_samples, dtype=np.float64)
+    lengths = np.zeros_like(n)
+    lengths[n == 2] = 1.0
+    large = n > 2
+    lengths[large] = (
+        2.0 * (np.log(n[large] - 1.0) + np.euler_gamma)
+        - 2.0 * (n[large] - 1.0) / n[large]
+    )
+    return lengths
+
+
+# fastmath is deliberately off: it assumes no NaN/inf, and both are
+# meaningful here (missing features, unbounded IQR limits)
+@njit(parallel=True, cache=True)
+def _scan_flags(
+    X: np.ndarray,
+    means: np.ndarray,
+    inv_stds: np.ndarray,
+    iqr_lower: np.ndarray,
+    iqr_upper: np.ndarray,
+    z_threshold: np.float32
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Fused z-score and IQR flagging in a single pass over X."""
+    n_rows, n_features = X.shape
+    z_flags = np.zeros((n_rows, n_features), dtype=np.bool_)
+    iqr_flags = np.zeros((n_rows, n_features), dtype=np.bool_)
+    z_counts = np.zeros(n_rows, dtype=np.int64)
+    z_sums = np.zeros(n_rows, dtype=np.float64)
+    iqr_counts = np.zeros(n_rows, dtype=np.int64)
+    for i in prange(n_rows):
+        for j in range(n_features):
+            x = X[i, j]
+            # NaN compares false, so missing values never flag
+            z = abs(x - means[j]) * inv_stds[j]
+            if z >= z_threshold:
+                z_flags[i, j] = True
+                z_counts[i] += 1
+                z_sums[i] += z
+            if x < iqr_lower[j] or x > iqr_upper[j]:
+                iqr_flags[i, j] = True
+                iqr_counts[i] += 1
+    return z_flags, iqr_flags, z_counts, z_sums, iqr_counts
+
+
+@njit(cache=True)
+def _forest_path_lengths(
+    X: np.ndarray,
+    children_left: np.ndarray,
+    children_right: np.ndarray,
+    feature: np.ndarray,
+    threshold: np.ndarray,
+    path_lengths: np.ndarray,
+    roots: np.ndarray
+) -> np.ndarray:
+    """Total isolation path length per row over a forest packed into flat node arrays."""
+    n_rows = X.shape[0]
+    totals = np.zeros(n_rows, dtype=np.float64)
+    # Tree-major order keeps one tree's nodes hot in cache across all rows
+    # and accumulates in the same order as the per-tree apply() path
+    for t in range(roots.shape[0]):
+        root = roots[t]
+        for i in range(n_rows):
+            node = root
+            while children_left[node] != -1:
+                if X[i, feature[node]] <= threshold[node]:
+                    node = children_left[node]
+                else:
+                    node = children_right[node]
+            totals[i] += path_lengths[node]
+    return totals
+
 
 class AnomalyType(Enum):
     """Types of detectable anomalies."""
@@ -43,7 +122,7 @@ class AnomalyScore(Enum):
 @dataclass
 class Anomaly:
     """A detected anomaly."""
-    anomaly_id: str
+    id_prefix: str  # e.g. "ano-z"; combined with sequence into anomaly_id
     anomaly_type: AnomalyType
     score: AnomalyScore
     raw_score: float  # -1 to 1, where higher is more anomalous
@@ -52,6 +131,12 @@ class Anomaly:
     features_flagged: Dict[str, float]
     baseline_values: Dict[str, float]
     description: str
+    sequence: int = 0
+    
+    @property
+    def anomaly_id(self) -> str:
+        """Formatted anomaly ID, e.g. ano-z-000042."""
+        return f"{self.id_prefix}-{self.sequence:06d}"
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
@@ -97,11 +182,30 @@ class AnomalyDetector:
         "anomalous_access_count",
     ]
     
+    # Severity per raw score bucket, split at _SCORE_EDGES
+    _SCORE_BUCKETS = (
+        AnomalyScore.NORMAL,
+        AnomalyScore.MILD,
+        AnomalyScore.MODERATE,
+        AnomalyScore.SEVERE,
+        AnomalyScore.EXTREME,
+    )
+    _SCORE_EDGES = np.array([0.3, 0.5, 0.7, 0.9])
+    
+    # Batch size from which the compiled z-score/IQR scan beats NumPy
+    JIT_SCAN_MIN_ROWS = 1024
+    
+    # Batch size up to which the compiled forest traversal beats one
+    # tree.apply() call per tree; larger batches amortize those calls
+    JIT_FOREST_MAX_ROWS = 512
+    
     def __init__(
         self,
         z_threshold: float = 3.0,
         contamination: float = 0.05,
-        use_isolation_forest: bool = True
+        use_isolation_forest: bool = True,
+        max_samples: int = 256,
+        clip_quantiles: Optional[Tuple[float, float]] = None
     ):
         """
         Initialize anomaly detector.
@@ -110,27 +214,73 @@ class AnomalyDetector:
             z_threshold: Z-score threshold for statistical outliers
             contamination: Expected proportion of outliers (for Isolation Forest)
             use_isolation_forest: Whether to use Isolation Forest
+            max_samples: Samples drawn to build each Isolation Forest tree
+                (capped at the training set size)
+            clip_quantiles: Optional (low, high) quantiles, e.g. (0.1, 0.9), to
+                clip Isolation Forest training data to, confining split ranges
+                to the bulk of the data. Off by default: values beyond the
+                clip range then score like the clip boundary.
         """
         self.z_threshold = z_threshold
         self.contamination = contamination
         self.use_isolation_forest = use_isolation_forest
-        
-        # Baseline statistics (computed during fit)
-        self._means: Dict[str, float] = {}
-        self._stds: Dict[str, float] = {}
-        self._medians: Dict[str, float] = {}
-        self._q1: Dict[str, float] = {}
-        self._q3: Dict[str, float] = {}
+        self.max_samples = max_samples
+        self.clip_quantiles = clip_quantiles
+        
+        # Pulls all monitored features out of a features dict in one call
+        self._feature_getter = operator.itemgetter(*self.MONITORED_FEATURES)
+        
+        # Baseline statistics per monitored feature (computed during fit),
+        # NaN where no historical vector had the feature. Kept in float32,
+        # the precision Isolation Forest works in.
+        n_features = len(self.MONITORED_FEATURES)
+        self._means_arr = np.full(n_features, np.nan, dtype=np.float32)
+        self._stds_arr = np.full(n_features, np.nan, dtype=np.float32)
+        self._medians_arr = np.full(n_features, np.nan, dtype=np.float32)
+        self._q1_arr = np.full(n_features, np.nan, dtype=np.float32)
+        self._q3_arr = np.full(n_features, np.nan, dtype=np.float32)
+        
+        # Detection constants derived from the statistics
+        self._inv_stds_arr = np.full(n_features, np.nan, dtype=np.float32)
+        self._iqr_lower_arr = np.full(n_features, -np.inf, dtype=np.float32)
+        self._iqr_upper_arr = np.full(n_features, np.inf, dtype=np.float32)
+        
+        # Feature matrix buffer reused across detect() calls, grown on demand
+        self._scratch_X: Optional[np.ndarray] = None
         
         # Isolation Forest model
         self._isolation_forest = None
         
-        # Counter for anomaly IDs
+        # Per-tree path length of every node and the score normalizer,
+        # cached at fit time for scoring
+        self._if_path_lengths: Optional[List[np.ndarray]] = None
+        self._if_path_normalizer = 0.0
+        
+        # Whole forest packed into flat node arrays for the compiled traversal
+        self._if_packed: Optional[Tuple[np.ndarray, ...]] = None
+        
+        # Last assigned anomaly ID sequence number
         self._anomaly_counter = 0
         
         # Fitted flag
         self._is_fitted = False
     
+    @property
+    def baseline_statistics(self) -> Dict[str, Dict[str, float]]:
+        """Fitted statistics per monitored feature (features without history are omitted)."""
+        stats = {
+            "mean": self._means_arr,
+            "std": self._stds_arr,
+            "median": self._medians_arr,
+            "q1": self._q1_arr,
+            "q3": self._q3_arr,
+        }
+        return {
+            name: {stat: float(values[i]) for stat, values in stats.items()}
+            for i, name in enumerate(self.MONITORED_FEATURES)
+            if not np.isnan(self._means_arr[i])
+        }
+    
     def fit(self, feature_vectors: List[Any]) -> "AnomalyDetector":
         """
         Fit the detector on historical data.
@@ -144,54 +294,161 @@ class AnomalyDetector:
         if not feature_vectors:
             return self
         
-        # Extract features into arrays
-        feature_data: Dict[str, List[float]] = {name: [] for name in self.MONITORED_FEATURES}
+        X = self._feature_matrix(feature_vectors)
         
-        for vector in feature_vectors:
-            for name in self.MONITORED_FEATURES:
-                if name in vector.features:
-                    feature_data[name].append(vector.features[name])
-        
-        # Compute statistics for each feature
-        for name, values in feature_data.items():
-            if values:
-                arr = np.array(values)
-                self._means[name] = float(np.mean(arr))
-                self._stds[name] = float(np.std(arr))
-                self._medians[name] = float(np.median(arr))
-                self._q1[name] = float(np.percentile(arr, 25))
-                self._q3[name] = float(np.percentile(arr, 75))
+        # Compute statistics for all features at once; quartiles and median
+        # share a single partition per column
+        if not np.isnan(X).any():
+            self._means_arr = X.mean(axis=0)
+            self._stds_arr = X.std(axis=0)
+            self._q1_arr, self._medians_arr, self._q3_arr = np.quantile(
+                X, [0.25, 0.5, 0.75], axis=0, method="linear"
+            ).astype(np.float32)
+        else:
+            with warnings.catch_warnings():
+                # Features missing from every vector reduce to NaN
+                warnings.simplefilter("ignore", category=RuntimeWarning)
+                self._means_arr = np.nanmean(X, axis=0)
+                self._stds_arr = np.nanstd(X, axis=0)
+                self._q1_arr, self._medians_arr, self._q3_arr = np.nanquantile(
+                    X, [0.25, 0.5, 0.75], axis=0, method="linear"
+                ).astype(np.float32)
+        
+        self._precompute_detection_constants()
         
         # Fit Isolation Forest if enabled
         if self.use_isolation_forest and len(feature_vectors) >= 10:
-            self._fit_isolation_forest(feature_vectors)
+            self._fit_isolation_forest(self._isolation_forest_input(X))
         
         self._is_fitted = True
         return self
     
-    def _fit_isolation_forest(self, feature_vectors: List[Any]) -> None:
-        """Fit Isolation Forest model."""
+    def _precompute_detection_constants(self) -> None:
+        """Derive reciprocal stds and extreme IQR bounds from the statistics."""
+        # NaN reciprocal for zero/missing stds, so their z-scores never flag
+        valid_std = self._stds_arr > 0
+        self._inv_stds_arr = np.full_like(self._stds_arr, np.nan)
+        np.reciprocal(self._stds_arr, out=self._inv_stds_arr, where=valid_std)
+        
+        # Unbounded for zero/missing IQRs, so they never flag
+        iqr = self._q3_arr - self._q1_arr
+        valid_iqr = iqr != 0
+        self._iqr_lower_arr = np.where(valid_iqr, self._q1_arr - 3 * iqr, -np.inf).astype(np.float32)
+        self._iqr_upper_arr = np.where(valid_iqr, self._q3_arr + 3 * iqr, np.inf).astype(np.float32)
+    
+    @staticmethod
+    def _isolation_forest_input(X: np.ndarray) -> np.ndarray:
+        """Isolation Forest input from a feature matrix: missing features become 0."""
+        return np.ascontiguousarray(np.where(np.isnan(X), 0.0, X), dtype=np.float32)
+    
+    def _fit_isolation_forest(self, X: np.ndarray) -> None:
+        """Fit Isolation Forest model on the prepared feature matrix."""
+        if self.clip_quantiles is not None:
+            # Every split threshold then falls inside the clip range, so
+            # detection-time inputs need no clipping: values beyond it take
+            # the same branches as the boundary itself
+            bounds = np.quantile(X, self.clip_quantiles, axis=0).astype(np.float32)
+            X = np.clip(X, bounds[0], bounds[1])
+        
         try:
             from sklearn.ensemble import IsolationForest
             
-            # Prepare feature matrix
-            X = []
-            for vector in feature_vectors:
-                row = [vector.features.get(name, 0.0) for name in self.MONITORED_FEATURES]
-                X.append(row)
-            
-            X = np.array(X)
-            
+            # A fixed subsample per tree bounds tree construction cost
+            # regardless of how much history the detector is fitted on
             self._isolation_forest = IsolationForest(
                 contamination=self.contamination,
                 random_state=42,
                 n_estimators=100,
+                max_samples=min(self.max_samples, X.shape[0]),
+                max_features=1.0,
+                bootstrap=False,
+                n_jobs=-1,
             )
             self._isolation_forest.fit(X)
+            self._cache_isolation_path_lengths()
         except ImportError:
             # sklearn not available
             self._isolation_forest = None
     
+    def _cache_isolation_path_lengths(self) -> None:
+        """Precompute each tree's isolation path length per node."""
+        forest = self._isolation_forest
+        try:
+            self._if_path_lengths = [
+                tree.tree_.compute_node_depths()
+                + _average_path_length(tree.tree_.n_node_samples)
+                - 1.0
+                for tree in forest.estimators_
+            ]
+        except AttributeError:
+            # Older sklearn trees cannot report node depths
+            self._if_path_lengths = None
+        
+        self._if_path_normalizer = float(
+            len(forest.estimators_) * _average_path_length([forest.max_samples_])[0]
+        )
+        
+        self._if_packed = None
+        if HAS_NUMBA and self._if_path_lengths is not None:
+            self._if_packed = self._pack_isolation_forest()
+    
+    def _pack_isolation_forest(self) -> Tuple[np.ndarray, ...]:
+        """
+        Concatenate all trees into flat node arrays for _forest_path_lengths.
+        
+        Child indices are offset to address the concatenated arrays and split
+        features are mapped back to input columns, so traversal needs no
+        per-tree bookkeeping (the FIL-style layout used by compiled forests).
+        """
+        forest = self._isolation_forest
+        children_left, children_right, feature, threshold, roots = [], [], [], [], []
+        offset = 0
+        for tree, features in zip(forest.estimators_, forest.estimators_features_):
+            tree_ = tree.tree_
+            is_split = tree_.children_left != -1
+            roots.append(offset)
+            children_left.append(np.where(is_split, tree_.children_left + offset, -1))
+            children_right.append(np.where(is_split, tree_.children_right + offset, -1))
+            feature.append(np.where(is_split, np.asarray(features)[np.maximum(tree_.feature, 0)], 0))
+            threshold.append(tree_.threshold)
+            offset += tree_.node_count
+        
+        return (
+            np.concatenate(children_left).astype(np.int64),
+            np.concatenate(children_right).astype(np.int64),
+            np.concatenate(feature).astype(np.int64),
+            np.concatenate(threshold).astype(np.float64),
+            np.concatenate(self._if_path_lengths).astype(np.float64),
+            np.asarray(roots, dtype=np.int64),
+        )
+    
+    def _isolation_forest_score_samples(self, X: np.ndarray) -> np.ndarray:
+        """Equivalent of IsolationForest.score_samples using the cached path lengths."""
+        forest = self._isolation_forest
+        if self._if_path_lengths is None:
+            return forest.score_samples(X)
+        
+        if self._if_packed is not None and len(X) <= self.JIT_FOREST_MAX_ROWS:
+            depths = _forest_path_lengths(X, *self._if_packed)
+            return self._isolation_scores_from_depths(depths)
+        
+        subsample_features = forest.bootstrap_features
+        depths = np.zeros(X.shape[0])
+        for tree, features, path_lengths in zip(
+            forest.estimators_, forest.estimators_features_, self._if_path_lengths
+        ):
+            X_tree = X[:, features] if subsample_features or len(features) != X.shape[1] else X
+            depths += path_lengths[tree.apply(X_tree, check_input=False)]
+        
+        return self._isolation_scores_from_depths(depths)
+    
+    def _isolation_scores_from_depths(self, depths: np.ndarray) -> np.ndarray:
+        """Convert total path lengths over the forest into score_samples scores."""
+        if self._if_path_normalizer == 0:
+            # Single training sample: every point is maximally anomalous
+            return -np.ones(depths.shape[0])
+        return -(2 ** (-depths / self._if_path_normalizer))
+    
     def detect(self, feature_vectors: List[Any]) -> List[Anomaly]:
         """
         Detect anomalies in feature vectors.
@@ -206,161 +463,251 @@ class AnomalyDetector:
             # Use default detection without baseline
             return self._detect_without_baseline(feature_vectors)
         
+        if not feature_vectors:
+            return []
+        
         anomalies = []
         
-        for vector in feature_vectors:
+        X = self._feature_matrix(feature_vectors, out=self._scratch_rows(len(feature_vectors)))
+        
+        # Flag features across the whole batch at once
+        if HAS_NUMBA and len(X) >= self.JIT_SCAN_MIN_ROWS:
+            z_flags, iqr_flags, z_rows, z_sums, iqr_rows = _scan_flags(
+                X,
+                self._means_arr,
+                self._inv_stds_arr,
+                self._iqr_lower_arr,
+                self._iqr_upper_arr,
+                np.float32(self.z_threshold),
+            )
+        else:
+            z_flags, z_sums = self._zscore_flags(X)
+            iqr_flags = self._iqr_flags(X)
+            z_rows = z_flags.sum(axis=1)
+            iqr_rows = iqr_flags.sum(axis=1)
+        
+        # Aggregate z-score anomaly score: mean flagged z-score, normalized to 0-1
+        z_raw_scores = np.minimum(1.0, z_sums / np.maximum(z_rows, 1) / 10)
+        iqr_raw_scores = np.minimum(1.0, iqr_rows / 3)
+        z_levels = self._scores_from_raw_vec(z_raw_scores)
+        iqr_levels = self._scores_from_raw_vec(iqr_raw_scores)
+        
+        # Isolation Forest scores for the whole batch in one call
+        if_flags = if_raw_scores = if_levels = None
+        if self._isolation_forest is not None:
+            if_flags, if_raw_scores = self._score_isolation_forest(X)
+            if_levels = self._scores_from_raw_vec(if_raw_scores)
+        
+        # Each vector yields at most one anomaly per type, so duplicates are
+        # only possible when a node appears more than once in the batch
+        positions: Optional[Dict[Tuple[str, AnomalyType], int]] = None
+        if len({vector.node_id for vector in feature_vectors}) < len(feature_vectors):
+            positions = {}
+        
+        # Only build Anomaly objects for rows that were flagged
+        for i, vector in enumerate(feature_vectors):
             # Z-score detection
-            z_anomalies = self._detect_zscore_anomalies(vector)
-            anomalies.extend(z_anomalies)
+            if z_rows[i]:
+                self._add_anomaly(
+                    anomalies,
+                    positions,
+                    self._create_zscore_anomaly(
+                        vector, z_flags[i], float(z_raw_scores[i]), z_levels[i]
+                    ),
+                )
             
             # IQR detection
-            iqr_anomalies = self._detect_iqr_anomalies(vector)
-            anomalies.extend(iqr_anomalies)
+            if iqr_rows[i]:
+                self._add_anomaly(
+                    anomalies,
+                    positions,
+                    self._create_iqr_anomaly(
+                        vector, iqr_flags[i], float(iqr_raw_scores[i]), iqr_levels[i]
+                    ),
+                )
             
             # Isolation Forest detection
-            if self._isolation_forest is not None:
-                if_anomalies = self._detect_isolation_forest_anomalies(vector)
-                anomalies.extend(if_anomalies)
-        
-        # Deduplicate (keep highest severity)
-        anomalies = self._deduplicate_anomalies(anomalies)
-        
+            if if_flags is not None and if_flags[i]:
+                self._add_anomaly(
+                    anomalies,
+                    positions,
+                    self._create_isolation_forest_anomaly(
+                        vector, float(if_raw_scores[i]), if_levels[i]
+                    ),
+                )
+        
+        self._assign_ids(anomalies)
         return anomalies
     
     def detect_for_node(self, feature_vector: Any) -> List[Anomaly]:
         """Detect anomalies for a single node."""
         return self.detect([feature_vector])
     
-    def _detect_zscore_anomalies(self, vector: Any) -> List[Anomaly]:
-        """Detect anomalies using z-score method."""
-        anomalies = []
+    def _scratch_rows(self, n_rows: int) -> np.ndarray:
+        """First n_rows of the reusable feature matrix buffer, growing it if needed."""
+        if self._scratch_X is None or self._scratch_X.shape[0] < n_rows:
+            self._scratch_X = np.empty(
+                (max(64, 2 * n_rows), len(self.MONITORED_FEATURES)), dtype=np.float32
+            )
+        return self._scratch_X[:n_rows]
+    
+    def _feature_matrix(
+        self,
+        feature_vectors: List[Any],
+        out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Stack monitored features into an (n_vectors, n_features) matrix, NaN where missing.
+        
+        Args:
+            feature_vectors: FeatureVector objects
+            out: Optional float32 buffer of matching shape to fill instead of allocating
+        """
+        n_rows, n_features = len(feature_vectors), len(self.MONITORED_FEATURES)
+        getter = self._feature_getter
+        
+        if out is None:
+            # Large fit histories: stream every value straight into one array,
+            # which beats row-by-row assignment (threads would not help, the
+            # dict lookups hold the GIL)
+            try:
+                values = chain.from_iterable(
+                    map(getter, map(operator.attrgetter("features"), feature_vectors))
+                )
+                return np.fromiter(values, dtype=np.float32, count=n_rows * n_features).reshape(
+                    n_rows, n_features
+                )
+            except KeyError:
+                # Some vector lacks a monitored feature; fill rows individually
+                out = np.empty((n_rows, n_features), dtype=np.float32)
+        
+        for i, vector in enumerate(feature_vectors):
+            try:
+                out[i] = getter(vector.features)
+            except KeyError:
+                out[i] = [vector.features.get(name, np.nan) for name in self.MONITORED_FEATURES]
+        return out
+    
+    def _zscore_flags(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Flag features whose z-score reaches the threshold.
+        
+        Returns:
+            (flags, per-row sum of flagged z-scores)
+        """
+        # Missing values, missing baselines and zero stds give NaN, which never flags
+        Z = np.abs(X - self._means_arr) * self._inv_stds_arr
+        with np.errstate(invalid="ignore"):
+            flags = Z >= self.z_threshold
+        return flags, np.where(flags, Z, 0.0).sum(axis=1)
+    
+    def _iqr_flags(self, X: np.ndarray) -> np.ndarray:
+        """Flag features that are extreme outliers (beyond 3 * IQR)."""
+        with np.errstate(invalid="ignore"):
+            return (X < self._iqr_lower_arr) | (X > self._iqr_upper_arr)
+    
+    def _create_zscore_anomaly(
+        self,
+        vector: Any,
+        flagged: np.ndarray,
+        raw_score: float,
+        score: AnomalyScore
+    ) -> Anomaly:
+        """Create a statistical outlier anomaly from a row of z-score flags."""
         features_flagged = {}
         baseline_values = {}
         
-        for name in self.MONITORED_FEATURES:
-            if name not in vector.features or name not in self._means:
-                continue
-            
-            value = vector.features[name]
-            mean = self._means[name]
-            std = self._stds[name]
-            
-            if std == 0:
-                continue
-            
-            z_score = abs(value - mean) / std
-            
-            if z_score >= self.z_threshold:
-                features_flagged[name] = value
-                baseline_values[name] = mean
-        
-        if features_flagged:
-            # Calculate aggregate anomaly score
-            raw_score = sum(
-                abs(v - baseline_values[k]) / (self._stds.get(k, 1) + 1e-8)
-                for k, v in features_flagged.items()
-            ) / len(features_flagged)
-            
-            # Normalize to 0-1
-            raw_score = min(1.0, raw_score / 10)
-            
-            self._anomaly_counter += 1
-            anomalies.append(Anomaly(
-                anomaly_id=f"ano-z-{self._anomaly_counter:06d}",
-                anomaly_type=AnomalyType.STATISTICAL_OUTLIER,
-                score=self._score_from_raw(raw_score),
-                raw_score=raw_score,
-                node_id=vector.node_id,
-                timestamp=vector.timestamp,
-                features_flagged=features_flagged,
-                baseline_values=baseline_values,
-                description=f"Statistical outlier: {len(features_flagged)} features exceed {self.z_threshold}σ threshold",
-            ))
-        
-        return anomalies
+        for j in np.flatnonzero(flagged):
+            name = self.MONITORED_FEATURES[j]
+            features_flagged[name] = vector.features[name]
+            baseline_values[name] = float(self._means_arr[j])
+        
+        return Anomaly(
+            id_prefix="ano-z",
+            anomaly_type=AnomalyType.STATISTICAL_OUTLIER,
+            score=score,
+            raw_score=raw_score,
+            node_id=vector.node_id,
+            timestamp=vector.timestamp,
+            features_flagged=features_flagged,
+            baseline_values=baseline_values,
+            description=f"Statistical outlier: {len(features_flagged)} features exceed {self.z_threshold}σ threshold",
+        )
     
-    def _detect_iqr_anomalies(self, vector: Any) -> List[Anomaly]:
-        """Detect anomalies using IQR method."""
-        anomalies = []
+    def _create_iqr_anomaly(
+        self,
+        vector: Any,
+        flagged: np.ndarray,
+        raw_score: float,
+        score: AnomalyScore
+    ) -> Anomaly:
+        """Create a behavioral change anomaly from a row of IQR flags."""
         features_flagged = {}
         baseline_values = {}
         
-        for name in self.MONITORED_FEATURES:
-            if name not in vector.features or name not in self._q1:
-                continue
-            
-            value = vector.features[name]
-            q1 = self._q1[name]
-            q3 = self._q3[name]
-            iqr = q3 - q1
-            
-            if iqr == 0:
-                continue
-            
-            lower_bound = q1 - 1.5 * iqr
-            upper_bound = q3 + 1.5 * iqr
-            
-            if value < lower_bound or value > upper_bound:
-                # Check if extreme (3 * IQR)
-                extreme_lower = q1 - 3 * iqr
-                extreme_upper = q3 + 3 * iqr
-                
-                if value < extreme_lower or value > extreme_upper:
-                    # Extreme outlier
-                    features_flagged[name] = value
-                    baseline_values[name] = self._medians[name]
+        for j in np.flatnonzero(flagged):
+            name = self.MONITORED_FEATURES[j]
+            features_flagged[name] = vector.features[name]
+            baseline_values[name] = float(self._medians_arr[j])
+        
+        return Anomaly(
+            id_prefix="ano-iqr",
+            anomaly_type=AnomalyType.BEHAVIORAL_CHANGE,
+            score=score,
+            raw_score=raw_score,
+            node_id=vector.node_id,
+            timestamp=vector.timestamp,
+            features_flagged=features_flagged,
+            baseline_values=baseline_values,
+            description=f"Behavioral deviation: {len(features_flagged)} features outside IQR bounds",
+        )
+    
+    def _score_isolation_forest(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score a batch with Isolation Forest.
         
-        if features_flagged:
-            raw_score = min(1.0, len(features_flagged) / 3)
-            
-            self._anomaly_counter += 1
-            anomalies.append(Anomaly(
-                anomaly_id=f"ano-iqr-{self._anomaly_counter:06d}",
-                anomaly_type=AnomalyType.BEHAVIORAL_CHANGE,
-                score=self._score_from_raw(raw_score),
-                raw_score=raw_score,
-                node_id=vector.node_id,
-                timestamp=vector.timestamp,
-                features_flagged=features_flagged,
-                baseline_values=baseline_values,
-                description=f"Behavioral deviation: {len(features_flagged)} features outside IQR bounds",
-            ))
+        Args:
+            X: Feature matrix from _feature_matrix (missing features are scored as 0)
         
-        return anomalies
-    
-    def _detect_isolation_forest_anomalies(self, vector: Any) -> List[Anomaly]:
-        """Detect anomalies using Isolation Forest."""
-        anomalies = []
+        Returns:
+            (anomaly flags, raw scores normalized to 0-1) per vector
+        """
+        X = self._isolation_forest_input(X)
         
-        # Prepare feature row
-        X = [[vector.features.get(name, 0.0) for name in self.MONITORED_FEATURES]]
-        X = np.array(X)
+        # Anomaly score (more negative = more anomalous); predict() flags the
+        # same rows, so one traversal of the forest serves both
+        scores = self._isolation_forest_score_samples(X)
+        flags = scores < self._isolation_forest.offset_
         
-        # Get prediction (-1 = anomaly, 1 = normal)
-        prediction = self._isolation_forest.predict(X)[0]
+        # Convert to positive and normalize to 0-1 (typical scores range from -0.5 to 0.5)
+        raw_scores = np.clip(0.5 - scores, 0.0, 1.0)
         
-        if prediction == -1:
-            # Get anomaly score (more negative = more anomalous)
-            score = self._isolation_forest.score_samples(X)[0]
-            raw_score = -score  # Convert to positive (higher = more anomalous)
-            
-            # Normalize to 0-1 (typical scores range from -0.5 to 0.5)
-            raw_score = min(1.0, max(0.0, (raw_score + 0.5)))
-            
-            self._anomaly_counter += 1
-            anomalies.append(Anomaly(
-                anomaly_id=f"ano-if-{self._anomaly_counter:06d}",
-                anomaly_type=AnomalyType.ISOLATION_FOREST,
-                score=self._score_from_raw(raw_score),
-                raw_score=raw_score,
-                node_id=vector.node_id,
-                timestamp=vector.timestamp,
-                features_flagged=vector.features,
-                baseline_values={},
-                description="Multi-dimensional anomaly detected by Isolation Forest",
-            ))
+        return flags, raw_scores
+    
+    def _create_isolation_forest_anomaly(
+        self,
+        vector: Any,
+        raw_score: float,
+        score: AnomalyScore
+    ) -> Anomaly:
+        """Create an anomaly for a vector flagged by Isolation Forest."""
+        # Copy just the monitored features, rather than keeping a reference
+        # that pins the caller's whole features dict in memory
+        features = vector.features
+        features_flagged = {
+            name: features[name] for name in self.MONITORED_FEATURES if name in features
+        }
         
-        return anomalies
+        return Anomaly(
+            id_prefix="ano-if",
+            anomaly_type=AnomalyType.ISOLATION_FOREST,
+            score=score,
+            raw_score=raw_score,
+            node_id=vector.node_id,
+            timestamp=vector.timestamp,
+            features_flagged=features_flagged,
+            baseline_values={},
+            description="Multi-dimensional anomaly detected by Isolation Forest",
+        )
     
     def _detect_without_baseline(self, feature_vectors: List[Any]) -> List[Anomaly]:
         """Detect obvious anomalies without historical baseline."""
@@ -384,9 +731,8 @@ class AnomalyDetector:
             if features_flagged:
                 raw_score = 0.7  # Default high score for threshold violations
                 
-                self._anomaly_counter += 1
                 anomalies.append(Anomaly(
-                    anomaly_id=f"ano-th-{self._anomaly_counter:06d}",
+                    id_prefix="ano-th",
                     anomaly_type=AnomalyType.RISK_SPIKE,
                     score=AnomalyScore.SEVERE,
                     raw_score=raw_score,
@@ -397,32 +743,43 @@ class AnomalyDetector:
                     description=f"Threshold violation: {len(features_flagged)} features exceed critical thresholds",
                 ))
         
+        self._assign_ids(anomalies)
         return anomalies
     
     def _score_from_raw(self, raw_score: float) -> AnomalyScore:
         """Convert raw score to categorical score."""
-        if raw_score >= 0.9:
-            return AnomalyScore.EXTREME
-        elif raw_score >= 0.7:
-            return AnomalyScore.SEVERE
-        elif raw_score >= 0.5:
-            return AnomalyScore.MODERATE
-        elif raw_score >= 0.3:
-            return AnomalyScore.MILD
-        else:
-            return AnomalyScore.NORMAL
+        return self._scores_from_raw_vec(np.array([raw_score]))[0]
     
-    def _deduplicate_anomalies(self, anomalies: List[Anomaly]) -> List[Anomaly]:
-        """Remove duplicate anomalies, keeping highest severity."""
-        unique = {}
-        
-        for anomaly in anomalies:
-            key = (anomaly.node_id, anomaly.anomaly_type)
-            
-            if key not in unique or anomaly.raw_score > unique[key].raw_score:
-                unique[key] = anomaly
-        
-        return list(unique.values())
+    def _scores_from_raw_vec(self, raw_scores: np.ndarray) -> List[AnomalyScore]:
+        """Convert an array of raw scores to categorical scores in one pass."""
+        buckets = self._SCORE_BUCKETS
+        return [buckets[i] for i in np.digitize(raw_scores, self._SCORE_EDGES)]
+    
+    def _add_anomaly(
+        self,
+        anomalies: List[Anomaly],
+        positions: Optional[Dict[Tuple[str, AnomalyType], int]],
+        anomaly: Anomaly
+    ) -> None:
+        """Append an anomaly, keeping only the highest score per (node, type) when deduplicating."""
+        if positions is None:
+            anomalies.append(anomaly)
+            return
+        
+        key = (anomaly.node_id, anomaly.anomaly_type)
+        position = positions.get(key)
+        if position is None:
+            positions[key] = len(anomalies)
+            anomalies.append(anomaly)
+        elif anomaly.raw_score > anomalies[position].raw_score:
+            anomalies[position] = anomaly
+    
+    def _assign_ids(self, anomalies: List[Anomaly]) -> None:
+        """Number a batch of anomalies with one contiguous block of IDs."""
+        start = self._anomaly_counter
+        for sequence, anomaly in enumerate(anomalies, start + 1):
+            anomaly.sequence = sequence
+        self._anomaly_counter = start + len(anomalies)
     
     def detect_risk_spike(
         self,
@@ -446,9 +803,9 @@ class AnomalyDetector:
         if len(historical_scores) < 2:
             return None
         
-        # Get recent average
-        recent_scores = [s for _, s in historical_scores[-7:]]  # Last 7 data points
-        avg_score = np.mean(recent_scores)
+        # Get recent average; at most 7 values, so plain Python beats np.mean
+        recent = historical_scores[-7:]  # Last 7 data points
+        avg_score = sum(score for _, score in recent) / len(recent)
         
         spike = current_score - avg_score
         
@@ -457,15 +814,16 @@ class AnomalyDetector:
             
             self._anomaly_counter += 1
             return Anomaly(
-                anomaly_id=f"ano-spike-{self._anomaly_counter:06d}",
+                id_prefix="ano-spike",
                 anomaly_type=AnomalyType.RISK_SPIKE,
                 score=self._score_from_raw(raw_score),
                 raw_score=raw_score,
                 node_id=node_id,
                 timestamp=datetime.now(timezone.utc),
                 features_flagged={"current_risk_score": current_score},
-                baseline_values={"avg_score": float(avg_score)},
+                baseline_values={"avg_score": avg_score},
                 description=f"Risk score spike: +{spike:.1f} points above 7-day average",
+                sequence=self._anomaly_counter,
             )
         
         return None
@@ -14,12 +14,128 @@ Author: PDRI Team
 Version: 1.0.0
 """
 
+import asyncio
+import logging
+import math
+import sys
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
 from enum import Enum
-from typing import Any, Dict, List, Optional, Tuple
+from types import MappingProxyType
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
 import numpy as np
 
+from ..jit import HAS_NUMBA, njit, prange
+
+logger = logging.getLogger(__name__)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_US = timedelta(microseconds=1)
+_WEEK_NS = 7 * 86_400 * 1_000_000_000
+_MISSING = object()
+
+# Node properties read by the static node features
+_STATIC_NODE_KEYS = ("sensitivity_level", "volatility", "exposure", "risk_score", "node_type", "is_external")
+
+# Node type flag bits: a type is an AI tool if its lowercased name contains
+# "ai", and a data store if it contains "data" or "store"
+_TYPE_AI_TOOL = 0b01
+_TYPE_DATA_STORE = 0b10
+_TYPE_FLAGS_MAX_SIZE = 1024
+_TYPE_FLAGS: Dict[str, int] = {
+    "": 0,
+    "AITool": _TYPE_AI_TOOL,
+    "DataStore": _TYPE_DATA_STORE,
+    "Service": 0,
+    "Identity": 0,
+    "API": 0,
+    "ai_tool": _TYPE_AI_TOOL,
+    "database": _TYPE_DATA_STORE,
+    "data_store": _TYPE_DATA_STORE,
+    "file_store": _TYPE_DATA_STORE,
+    "service": 0,
+}
+
+
+def _node_type_flags(node_type: str) -> int:
+    """Flag bits for a node type, classifying (and remembering) unseen types."""
+    flags = _TYPE_FLAGS.get(node_type)
+    if flags is None:
+        lowered = node_type.lower()
+        flags = (
+            (_TYPE_AI_TOOL if "ai" in lowered else 0)
+            | (_TYPE_DATA_STORE if "data" in lowered or "store" in lowered else 0)
+        )
+        if len(_TYPE_FLAGS) < _TYPE_FLAGS_MAX_SIZE:
+            _TYPE_FLAGS[node_type] = flags
+    return flags
+
+
+def _epoch_ns(ts: datetime) -> int:
+    """Nanoseconds since the Unix epoch; naive datetimes are taken as UTC."""
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return (ts - _EPOCH) // _US * 1000
+
+
+def _score_series(history: List[Tuple[datetime, float]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Convert a [(timestamp, score), ...] history to time-sorted (epoch-ns, score) arrays."""
+    timestamps = np.fromiter((_epoch_ns(ts) for ts, _ in history), dtype=np.int64, count=len(history))
+    scores = np.fromiter((score for _, score in history), dtype=np.float64, count=len(history))
+    order = np.argsort(timestamps, kind="stable")
+    return timestamps[order], scores[order]
+
+
+# fastmath is deliberately off: results must match the NumPy path exactly
+@njit(parallel=True, cache=True)
+def _temporal_stats_batch(
+    timestamps: np.ndarray,
+    scores: np.ndarray,
+    offsets: np.ndarray,
+    rows: np.ndarray,
+    week_ago: np.int64,
+    out: np.ndarray
+) -> None:
+    """
+    (7-day average, 7-day std, trend) per node into out, one row per node.
+    
+    Histories are stored back to back in timestamps/scores; history r spans
+    offsets[r]:offsets[r + 1], and rows[i] is node i's history (-1 for none).
+    Nodes are independent (each writes only its own row of out), so they
+    are spread across threads.
+    """
+    for i in prange(rows.shape[0]):
+        avg, std, trend = 50.0, 0.0, 0.0
+        r = rows[i]
+        if r >= 0:
+            end = offsets[r + 1]
+            start = offsets[r] + np.searchsorted(timestamps[offsets[r]:end], week_ago)
+            n = end - start
+            if n > 0:
+                total = 0.0
+                for j in range(start, end):
+                    total += scores[j]
+                avg = total / n
+                
+                center = (n - 1) / 2
+                sum_sq = 0.0
+                sum_xy = 0.0
+                for j in range(start, end):
+                    deviation = scores[j] - avg
+                    sum_sq += deviation * deviation
+                    sum_xy += (j - start - center) * deviation
+                std = math.sqrt(sum_sq / n)
+                
+                if n >= 2:
+                    slope = sum_xy / (n * (n * n - 1.0) / 12)
+                    trend = min(1.0, max(-1.0, slope / 10))
+        out[i, 0] = avg
+        out[i, 1] = std
+        out[i, 2] = trend
+
 
 class FeatureCategory(Enum):
     """Categories of ML features."""
@@ -31,30 +147,108 @@ class FeatureCategory(Enum):
     BEHAVIORAL = "behavioral"          # Usage pattern features
 
 
-@dataclass
+class FeatureValues(Mapping):
+    """Read-only name -> value view over a FeatureVector's values array."""
+    
+    __slots__ = ("_values", "_index")
+    
+    def __init__(self, values: np.ndarray, index: Dict[str, int]):
+        self._values = values
+        self._index = index
+    
+    def __getitem__(self, name: str) -> float:
+        return float(self._values[self._index[name]])
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+    
+    def __len__(self) -> int:
+        return len(self._index)
+    
+    def to_dict(self) -> Dict[str, float]:
+        """Plain dict of the values, for serialization."""
+        slots = np.fromiter(self._index.values(), dtype=np.intp, count=len(self._index))
+        return dict(zip(self._index, self._values[slots].tolist()))
+
+
+@dataclass(slots=True)
 class FeatureVector:
-    """A vector of features for ML models."""
+    """
+    A vector of features for ML models.
+    
+    Feature values live in a single float64 array ordered like
+    feature_names; ``features`` and item access read them by name. The
+    values are kept in float64 so every accessor, and serialization,
+    returns exactly the value that was extracted.
+    """
     node_id: str
     timestamp: datetime
-    features: Dict[str, float]
-    feature_names: List[str]
-    category_breakdown: Dict[FeatureCategory, List[str]] = field(default_factory=dict)
+    values: np.ndarray
+    feature_names: Sequence[str]
+    category_breakdown: Mapping[FeatureCategory, Sequence[str]] = field(default_factory=dict)
+    feature_index: Optional[Dict[str, int]] = None
+    
+    def __post_init__(self):
+        if self.feature_index is None:
+            self.feature_index = {name: i for i, name in enumerate(self.feature_names)}
+    
+    @property
+    def features(self) -> FeatureValues:
+        """Feature values by name."""
+        return FeatureValues(self.values, self.feature_index)
     
-    def to_numpy(self) -> np.ndarray:
-        """Convert to numpy array."""
-        return np.array([self.features[name] for name in self.feature_names])
+    def __getitem__(self, name: str) -> float:
+        return float(self.values[self.feature_index[name]])
+    
+    def to_numpy(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Feature values as a numpy array (the stored array, not a copy).
+        
+        Args:
+            out: Optional array (e.g. a row of a batch matrix) to copy the
+                values into instead; it is returned
+        """
+        if out is None:
+            return self.values
+        np.copyto(out, self.values)
+        return out
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
         return {
             "node_id": self.node_id,
             "timestamp": self.timestamp.isoformat(),
-            "features": self.features,
-            "feature_names": self.feature_names,
+            "features": self.features.to_dict(),
+            "feature_names": list(self.feature_names),
         }
 
 
-@dataclass
+@dataclass(slots=True)
+class BatchFeatureResult:
+    """
+    Features for a batch of nodes.
+    
+    ``matrix`` holds every node's values, one row per node in ``node_ids``
+    order, and each vector's values are a view of its row, so the matrix
+    can be fed to a model without stacking the vectors again. Iterating,
+    indexing and len() act on the vectors.
+    """
+    matrix: np.ndarray
+    vectors: List[FeatureVector]
+    node_ids: List[str]
+    timestamp: Optional[datetime] = None
+    
+    def __len__(self) -> int:
+        return len(self.vectors)
+    
+    def __iter__(self) -> Iterator[FeatureVector]:
+        return iter(self.vectors)
+    
+    def __getitem__(self, index: int) -> FeatureVector:
+        return self.vectors[index]
+
+
+@dataclass(frozen=True, slots=True)
 class FeatureSchema:
     """Schema defining expected features."""
     name: str
@@ -66,6 +260,29 @@ class FeatureSchema:
     default_value: float = 0.0
 
 
+@dataclass(slots=True)
+class _GraphData:
+    """
+    Graph data prefetched for a batch of nodes, one mapping per subsystem.
+    
+    A subsystem is None when the graph engine does not support it.
+    """
+    nodes: Optional[Dict[str, Any]]
+    connections: Optional[Dict[str, Any]]
+    metrics: Optional[Dict[str, Any]]
+    exposure: Optional[Dict[str, Any]]
+    
+    def get(self, subsystem: str, node_id: str) -> Any:
+        """A node's entry for a subsystem, raising it if the per-node fetch failed."""
+        data = getattr(self, subsystem)
+        if not data:
+            return None
+        value = data.get(node_id)
+        if isinstance(value, BaseException):
+            raise value
+        return value
+
+
 class FeatureEngineer:
     """
     Extract and engineer features from the risk graph.
@@ -146,29 +363,124 @@ class FeatureEngineer:
                      "Anomalous access events detected", 0.0, 100.0),
     ]
     
-    def __init__(self, graph_engine: Any, score_history: Optional[Dict[str, List[Tuple[datetime, float]]]] = None):
+    def __init__(
+        self,
+        graph_engine: Any,
+        score_history: Optional[Dict[str, List[Tuple[datetime, float]]]] = None,
+        vector_cache_size: int = 10_000,
+        vector_cache_ttl: float = 60.0
+    ):
         """
         Initialize feature engineer.
         
         Args:
             graph_engine: Neo4j graph engine instance
-            score_history: Optional historical score data (node_id -> [(timestamp, score), ...])
+            score_history: Optional historical score data (node_id -> [(timestamp, score), ...]);
+                packed into time-sorted arrays (see the score_history property)
+            vector_cache_size: Max feature vectors cached by extract_features, and max
+                nodes per subsystem in the topology cache (0 disables both)
+            vector_cache_ttl: Seconds a cached feature vector or topology entry stays valid
         """
         self.graph_engine = graph_engine
-        self.score_history = score_history or {}
-        self._feature_names = [schema.name for schema in self.FEATURE_SCHEMAS]
+        self._pack_score_history(score_history or {})
+        # One immutable tuple, shared by every FeatureVector
+        self._feature_names: Tuple[str, ...] = tuple(
+            sys.intern(schema.name) for schema in self.FEATURE_SCHEMAS
+        )
         self._schema_map = {schema.name: schema for schema in self.FEATURE_SCHEMAS}
+        
+        # Slot of each feature in FeatureVector.values, and the default values
+        self._feature_index = {name: i for i, name in enumerate(self._feature_names)}
+        self._defaults = np.array(
+            [schema.default_value for schema in self.FEATURE_SCHEMAS], dtype=np.float64
+        )
+        # The built-in extractors write every built-in feature, so only
+        # features added by subclasses need filling with their defaults
+        extracted = {schema.name for schema in FeatureEngineer.FEATURE_SCHEMAS}
+        self._default_columns = np.array(
+            [i for i, name in enumerate(self._feature_names) if name not in extracted], dtype=np.intp
+        )
+        # Schema bounds for min-max normalization
+        self._has_bounds = np.array(
+            [s.min_value is not None and s.max_value is not None for s in self.FEATURE_SCHEMAS]
+        )
+        self._min = np.array(
+            [s.min_value if s.min_value is not None else 0.0 for s in self.FEATURE_SCHEMAS]
+        )
+        self._max = np.array(
+            [s.max_value if s.max_value is not None else 0.0 for s in self.FEATURE_SCHEMAS]
+        )
+        self._range = self._max - self._min
+        
+        # Normalization applied by normalize_features when no stats are given
+        self._norm_offset, self._norm_divisor = self._normalization_constants(None, None)
+        
+        # {subsystem: LRU of node_id -> (expires_at, data)} for data that only
+        # changes with the graph topology, valid for one topology version
+        self._topology_cache: Dict[str, OrderedDict[str, Tuple[float, Any]]] = {}
+        self._topology_cache_version: Any = None
+        
+        # LRU of (node_id, minute) -> (expires_at, (topology, data) version, vector)
+        self.vector_cache_size = vector_cache_size
+        self.vector_cache_ttl = vector_cache_ttl
+        self._vector_cache: OrderedDict[Tuple[str, datetime], Tuple[float, Any, FeatureVector]] = OrderedDict()
+        self._inflight: Dict[Tuple[str, datetime], "asyncio.Future[FeatureVector]"] = {}
+        
+        # Shared, read-only by every FeatureVector this engineer builds
+        self._category_breakdown: Mapping[FeatureCategory, Tuple[str, ...]] = MappingProxyType({
+            category: tuple(name for name, schema in zip(self._feature_names, self.FEATURE_SCHEMAS)
+                            if schema.category == category)
+            for category in FeatureCategory
+        })
     
     @property
-    def feature_names(self) -> List[str]:
-        """Get ordered list of feature names."""
-        return self._feature_names.copy()
+    def feature_names(self) -> Tuple[str, ...]:
+        """Get ordered tuple of feature names."""
+        return self._feature_names
     
     @property
     def feature_count(self) -> int:
         """Get total number of features."""
         return len(self._feature_names)
     
+    @property
+    def score_history(self) -> Mapping[str, Tuple[Tuple[datetime, float], ...]]:
+        """
+        Historical score data (node_id -> ((timestamp, score), ...)), read-only.
+        
+        Histories are packed into arrays when given, so to change them
+        assign a new history; that also drops cached feature vectors.
+        """
+        return MappingProxyType(self._score_history)
+    
+    @score_history.setter
+    def score_history(self, score_history: Optional[Dict[str, List[Tuple[datetime, float]]]]) -> None:
+        self._pack_score_history(score_history or {})
+        self.invalidate()
+    
+    def _pack_score_history(self, score_history: Dict[str, List[Tuple[datetime, float]]]) -> None:
+        """Store score histories, and pack them back to back as time-sorted arrays."""
+        self._score_history = {
+            node_id: tuple(history) for node_id, history in score_history.items()
+        }
+        
+        # History r spans _history_offsets[r]:_history_offsets[r + 1] of the
+        # (epoch-ns timestamps, scores) arrays; both temporal paths read these
+        self._history_rows = {node_id: row for row, node_id in enumerate(self._score_history)}
+        series = [_score_series(history) for history in self._score_history.values()]
+        self._history_offsets = np.zeros(len(series) + 1, dtype=np.int64)
+        np.cumsum([ts.size for ts, _ in series], out=self._history_offsets[1:])
+        self._history_timestamps = np.concatenate([ts for ts, _ in series] or [np.empty(0, np.int64)])
+        self._history_scores = np.concatenate([sc for _, sc in series] or [np.empty(0)])
+    
+    def _history_series(self, node_id: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """A node's time-sorted (epoch-ns timestamps, scores), as views of the packed arrays."""
+        row = self._history_rows.get(node_id)
+        if row is None:
+            return None
+        start, end = self._history_offsets[row], self._history_offsets[row + 1]
+        return self._history_timestamps[start:end], self._history_scores[start:end]
+    
     async def extract_features(
         self,
         node_id: str,
@@ -177,6 +489,11 @@ class FeatureEngineer:
         """
         Extract all features for a node.
         
+        Graph subsystems are queried concurrently. Results are cached per
+        (node_id, minute of timestamp) for ``vector_cache_ttl`` seconds, or
+        until the graph's topology or data version changes; cached vectors are
+        read-only, and concurrent calls for the same key share one fetch.
+        
         Args:
             node_id: ID of the node to extract features for
             timestamp: Point in time for feature extraction (defaults to now)
@@ -186,213 +503,549 @@ class FeatureEngineer:
         """
         timestamp = timestamp or datetime.now(timezone.utc)
         
-        # Get node data from graph
-        node_data = await self._get_node_data(node_id)
-        
-        # Extract features by category
-        features = {}
-        category_breakdown = {}
-        
-        # Node static features
-        static_features = await self._extract_node_static_features(node_id, node_data)
-        features.update(static_features)
-        category_breakdown[FeatureCategory.NODE_STATIC] = list(static_features.keys())
+        key = (node_id, timestamp.replace(second=0, microsecond=0))
+        version = (
+            getattr(self.graph_engine, "topology_version", None),
+            getattr(self.graph_engine, "data_version", None),
+        )
+        cached = self._vector_cache.get(key)
+        if cached is not None:
+            expires_at, cached_version, vector = cached
+            if expires_at > time.monotonic() and cached_version == version:
+                self._vector_cache.move_to_end(key)
+                return vector
+            del self._vector_cache[key]
         
-        # Node temporal features
-        temporal_features = await self._extract_node_temporal_features(node_id, timestamp)
-        features.update(temporal_features)
-        category_breakdown[FeatureCategory.NODE_TEMPORAL] = list(temporal_features.keys())
+        if self.vector_cache_size <= 0:
+            return await self._extract_uncached(node_id, timestamp)
         
-        # Edge features
-        edge_features = await self._extract_edge_features(node_id)
-        features.update(edge_features)
-        category_breakdown[FeatureCategory.EDGE_STATIC] = list(edge_features.keys())
+        # Join an extraction of the same key that is already in flight
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._extract_uncached(node_id, timestamp))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._extraction_done(key, done))
         
-        # Topology features
-        topology_features = await self._extract_topology_features(node_id)
-        features.update(topology_features)
-        category_breakdown[FeatureCategory.GRAPH_TOPOLOGY] = list(topology_features.keys())
+        # Shielded, so one caller's cancellation does not fail the others
+        vector = await asyncio.shield(task)
         
-        # Behavioral features
-        behavioral_features = await self._extract_behavioral_features(node_id, timestamp)
-        features.update(behavioral_features)
-        category_breakdown[FeatureCategory.BEHAVIORAL] = list(behavioral_features.keys())
+        if key not in self._vector_cache:
+            vector.values.flags.writeable = False
+            self._vector_cache[key] = (time.monotonic() + self.vector_cache_ttl, version, vector)
+            if len(self._vector_cache) > self.vector_cache_size:
+                self._vector_cache.popitem(last=False)
         
-        # Ensure all features are present with defaults
-        for schema in self.FEATURE_SCHEMAS:
-            if schema.name not in features:
-                features[schema.name] = schema.default_value
-        
-        return FeatureVector(
-            node_id=node_id,
-            timestamp=timestamp,
-            features=features,
-            feature_names=self._feature_names,
-            category_breakdown=category_breakdown,
-        )
+        return vector
+    
+    def _extraction_done(self, key: Tuple[str, datetime], task: "asyncio.Future[FeatureVector]") -> None:
+        """Forget a finished in-flight extraction."""
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            # Mark the error retrieved even if every caller was cancelled
+            task.exception()
+    
+    async def _extract_uncached(self, node_id: str, timestamp: datetime) -> FeatureVector:
+        """Fetch a node's graph data (subsystems concurrently) and build its vector."""
+        graph_data = await self._fetch_graph_data([node_id])
+        return self._build_feature_vectors([node_id], timestamp, graph_data, skip_failures=False).vectors[0]
     
     async def extract_batch_features(
         self,
         node_ids: List[str],
         timestamp: Optional[datetime] = None
-    ) -> List[FeatureVector]:
+    ) -> BatchFeatureResult:
         """
         Extract features for multiple nodes.
         
+        Graph data is fetched with one query per subsystem for the whole
+        batch; features are then computed column by column into one
+        (n_nodes, n_features) matrix, and each vector's values are a row
+        view of it.
+        
         Args:
             node_ids: List of node IDs
             timestamp: Point in time for extraction
         
         Returns:
-            List of FeatureVectors
+            BatchFeatureResult with the feature matrix and its vectors
+            (nodes that failed are omitted)
         """
-        # In production, this would be optimized for batch queries
-        results = []
+        timestamp = timestamp or datetime.now(timezone.utc)
+        
+        if not node_ids:
+            return self._empty_batch(timestamp)
+        
+        try:
+            graph_data = await self._fetch_graph_data(node_ids)
+        except Exception as e:
+            logger.error(f"Error fetching graph data for {len(node_ids)} nodes: {e}")
+            return self._empty_batch(timestamp)
+        
+        return self._build_feature_vectors(node_ids, timestamp, graph_data)
+    
+    def _empty_batch(self, timestamp: datetime) -> BatchFeatureResult:
+        """A batch result with no nodes."""
+        return BatchFeatureResult(
+            matrix=np.empty((0, len(self._feature_names)), dtype=np.float64),
+            vectors=[],
+            node_ids=[],
+            timestamp=timestamp,
+        )
+    
+    async def _fetch_graph_data(self, node_ids: List[str]) -> "_GraphData":
+        """
+        Fetch all graph data needed for feature extraction, subsystems concurrently.
+        
+        Raises:
+            Exception: The first subsystem query that failed outright
+        """
+        results = await asyncio.gather(
+            self._fetch_bulk("get_nodes_bulk", "get_node", node_ids),
+            self._fetch_topology(
+                "connections",
+                lambda ids: self._fetch_bulk("get_connection_counts_bulk", "get_node_connections", ids),
+                node_ids,
+            ),
+            self._fetch_topology(
+                "metrics",
+                lambda ids: self._fetch_bulk("get_topology_metrics_bulk", "get_topology_metrics", ids),
+                node_ids,
+            ),
+            self._fetch_topology("exposure", self._fetch_exposure, node_ids),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        
+        nodes, connections, metrics, exposure = results
+        return _GraphData(
+            nodes=nodes,
+            connections=connections,
+            metrics=metrics,
+            exposure=exposure,
+        )
+    
+    async def _fetch_topology(
+        self,
+        subsystem: str,
+        fetch: Callable[[List[str]], Awaitable[Optional[Dict[str, Any]]]],
+        node_ids: List[str]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Fetch topology-derived graph data, cached per graph topology version.
+        
+        Only engines that expose a ``topology_version`` are cached. The
+        cache is dropped whenever that version changes; entries also expire
+        after ``vector_cache_ttl`` seconds, since writes by other processes
+        do not bump this engine's version, and each subsystem keeps at most
+        ``vector_cache_size`` nodes, least recently used evicted first.
+        """
+        version = getattr(self.graph_engine, "topology_version", None)
+        if version is None or self.vector_cache_size <= 0:
+            return await fetch(node_ids)
+        
+        if self._topology_cache_version != version:
+            self._topology_cache = {}
+            self._topology_cache_version = version
+        cache = self._topology_cache.setdefault(subsystem, OrderedDict())
+        
+        now = time.monotonic()
+        found = {}
+        for node_id in node_ids:
+            entry = cache.get(node_id)
+            if entry is None:
+                continue
+            if entry[0] > now:
+                cache.move_to_end(node_id)
+                found[node_id] = entry[1]
+            else:
+                del cache[node_id]
+        
+        missing = [node_id for node_id in node_ids if node_id not in found]
+        failures = {}
+        if missing:
+            fetched = await fetch(missing)
+            if fetched is None:
+                return None
+            expires_at = time.monotonic() + self.vector_cache_ttl
+            for node_id in missing:
+                value = fetched.get(node_id)
+                if isinstance(value, BaseException):
+                    # Failed fetches are reported, not cached
+                    failures[node_id] = value
+                else:
+                    found[node_id] = value
+                    cache[node_id] = (expires_at, value)
+                    cache.move_to_end(node_id)
+            while len(cache) > self.vector_cache_size:
+                cache.popitem(last=False)
+        
+        return {node_id: failures.get(node_id, found.get(node_id)) for node_id in node_ids}
+    
+    async def _fetch_exposure(self, node_ids: List[str]) -> Optional[Dict[str, Any]]:
+        """
+        Fetch each node's exposure summary ({"path_count", "shortest_path_length"}).
+        
+        Engines with a summary query compute it in the database; otherwise
+        the exposure paths are fetched and summarized here.
+        """
+        summary = getattr(self.graph_engine, "get_exposure_summary_bulk", None)
+        if summary is not None:
+            return await summary(node_ids)
+        
+        paths = await self._fetch_bulk("find_exposure_paths_bulk", "find_exposure_paths", node_ids)
+        if paths is None:
+            return None
+        return {
+            node_id: value if isinstance(value, BaseException) else self._summarize_exposure_paths(value)
+            for node_id, value in paths.items()
+        }
+    
+    @staticmethod
+    def _summarize_exposure_paths(paths: Optional[List[Any]]) -> Dict[str, Any]:
+        """Reduce exposure path records to their count and shortest length."""
+        if not paths:
+            return {"path_count": 0, "shortest_path_length": None}
+        return {
+            "path_count": len(paths),
+            "shortest_path_length": min(
+                p["path_length"] if isinstance(p, Mapping) and "path_length" in p else len(p)
+                for p in paths
+            ),
+        }
+    
+    def invalidate_topology_cache(self) -> None:
+        """Drop cached connection counts, topology metrics and exposure summaries (e.g. after a graph mutation)."""
+        self._topology_cache = {}
+    
+    def invalidate(self, node_id: Optional[str] = None) -> None:
+        """
+        Drop cached feature vectors.
+        
+        Args:
+            node_id: Node whose vectors to drop (all nodes if None)
+        """
+        if node_id is None:
+            self._vector_cache.clear()
+            return
+        for key in [key for key in self._vector_cache if key[0] == node_id]:
+            del self._vector_cache[key]
+    
+    async def _fetch_bulk(
+        self,
+        bulk_method: str,
+        single_method: str,
+        node_ids: List[str]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Fetch one graph subsystem for many nodes.
+        
+        Uses the engine's bulk query when it has one, otherwise fans out
+        concurrent per-node calls (per-node failures are kept as exception
+        values). Returns None if the engine supports neither.
+        """
+        bulk = getattr(self.graph_engine, bulk_method, None)
+        if bulk is not None:
+            return await bulk(node_ids)
+        
+        single = getattr(self.graph_engine, single_method, None)
+        if single is None:
+            return None
+        
+        results = await asyncio.gather(
+            *(single(node_id) for node_id in node_ids),
+            return_exceptions=True,
+        )
+        return dict(zip(node_ids, results))
+    
+    def _build_feature_vectors(
+        self,
+        node_ids: List[str],
+        timestamp: datetime,
+        graph_data: "_GraphData",
+        skip_failures: bool = True
+    ) -> BatchFeatureResult:
+        """
+        Assemble feature vectors for a batch from prefetched graph data.
+        
+        Args:
+            node_ids: Node IDs, in output order
+            timestamp: Point in time for extraction
+            graph_data: Prefetched graph data for the nodes
+            skip_failures: Log and drop nodes whose graph data failed to
+                load, rather than raising
+        """
+        # Resolve each node's graph data, dropping nodes whose fetch failed
+        kept_ids, nodes, connections, metrics, exposure = [], [], [], [], []
         for node_id in node_ids:
             try:
-                vector = await self.extract_features(node_id, timestamp)
-                results.append(vector)
+                entries = (
+                    graph_data.get("nodes", node_id),
+                    graph_data.get("connections", node_id),
+                    graph_data.get("metrics", node_id),
+                    graph_data.get("exposure", node_id),
+                )
             except Exception as e:
+                if not skip_failures:
+                    raise
                 # Log error and continue with other nodes
-                print(f"Error extracting features for {node_id}: {e}")
-        return results
-    
-    async def _get_node_data(self, node_id: str) -> Dict[str, Any]:
-        """Get node data from graph."""
-        # Query graph for node
-        if hasattr(self.graph_engine, 'get_node'):
-            node = await self.graph_engine.get_node(node_id)
-            if node:
-                return node.__dict__ if hasattr(node, '__dict__') else dict(node)
-        return {}
-    
-    async def _extract_node_static_features(
+                logger.error(f"Error extracting features for {node_id}: {e}")
+                continue
+            kept_ids.append(node_id)
+            nodes.append(self._node_data(entries[0]))
+            connections.append(entries[1] or {})
+            metrics.append(entries[2])
+            exposure.append(entries[3])
+        
+        # One matrix for the batch; extractors fill whole columns, and
+        # columns no extractor writes hold their schema default
+        matrix = np.empty((len(kept_ids), len(self._feature_names)), dtype=np.float64)
+        if self._default_columns.size:
+            matrix[:, self._default_columns] = self._defaults[self._default_columns]
+        
+        self._extract_node_static_features(matrix, nodes)
+        self._extract_node_temporal_features(matrix, kept_ids, timestamp)
+        self._extract_edge_features(matrix, connections)
+        self._extract_topology_features(
+            matrix, metrics, exposure, has_exposure=graph_data.exposure is not None
+        )
+        self._extract_behavioral_features(matrix, kept_ids, timestamp)
+        
+        vectors = [
+            FeatureVector(
+                node_id=node_id,
+                timestamp=timestamp,
+                values=matrix[i],
+                feature_names=self._feature_names,
+                category_breakdown=self._category_breakdown,
+                feature_index=self._feature_index,
+            )
+            for i, node_id in enumerate(kept_ids)
+        ]
+        return BatchFeatureResult(
+            matrix=matrix,
+            vectors=vectors,
+            node_ids=kept_ids,
+            timestamp=timestamp,
+        )
+    
+    @staticmethod
+    def _node_data(node: Any) -> Dict[str, Any]:
+        """
+        The node properties used by the static features, as a dict.
+        
+        Works whether the engine returned an object or a mapping; only
+        _STATIC_NODE_KEYS are read, and absent properties are left out so
+        extractors fall back to their defaults.
+        """
+        if not node:
+            return {}
+        lookup = node.get if hasattr(node, "get") else lambda key, default: getattr(node, key, default)
+        data = {}
+        for key in _STATIC_NODE_KEYS:
+            value = lookup(key, _MISSING)
+            if value is not _MISSING:
+                data[key] = value
+        return data
+    
+    def _extract_node_static_features(
         self,
-        node_id: str,
-        node_data: Dict[str, Any]
-    ) -> Dict[str, float]:
-        """Extract static node features."""
-        features = {}
+        matrix: np.ndarray,
+        nodes: List[Dict[str, Any]]
+    ) -> None:
+        """Extract static node features into their columns of matrix."""
+        col = self._feature_index
         
         # Direct attribute mappings
-        features["sensitivity_score"] = float(node_data.get("sensitivity_level", 0.5))
-        features["volatility_score"] = float(node_data.get("volatility", 0.3))
-        features["exposure_score"] = float(node_data.get("exposure", 0.3))
-        features["current_risk_score"] = float(node_data.get("risk_score", 50.0))
+        matrix[:, col["sensitivity_score"]] = [float(d.get("sensitivity_level", 0.5)) for d in nodes]
+        matrix[:, col["volatility_score"]] = [float(d.get("volatility", 0.3)) for d in nodes]
+        matrix[:, col["exposure_score"]] = [float(d.get("exposure", 0.3)) for d in nodes]
+        matrix[:, col["current_risk_score"]] = [float(d.get("risk_score", 50.0)) for d in nodes]
         
         # Node type flags
-        node_type = node_data.get("node_type", "").lower()
-        features["is_ai_tool"] = 1.0 if "ai" in node_type else 0.0
-        features["is_external_service"] = 1.0 if node_data.get("is_external", False) else 0.0
-        features["is_data_store"] = 1.0 if "data" in node_type or "store" in node_type else 0.0
-        
-        return features
+        type_flags = np.fromiter(
+            (_node_type_flags(d.get("node_type", "")) for d in nodes), dtype=np.int64, count=len(nodes)
+        )
+        matrix[:, col["is_ai_tool"]] = type_flags & _TYPE_AI_TOOL
+        matrix[:, col["is_external_service"]] = [bool(d.get("is_external", False)) for d in nodes]
+        matrix[:, col["is_data_store"]] = (type_flags & _TYPE_DATA_STORE) >> 1
     
-    async def _extract_node_temporal_features(
+    def _extract_node_temporal_features(
         self,
-        node_id: str,
+        matrix: np.ndarray,
+        node_ids: List[str],
         timestamp: datetime
-    ) -> Dict[str, float]:
-        """Extract temporal features from score history."""
-        features = {}
-        
-        # Get score history for this node
-        history = self.score_history.get(node_id, [])
-        
-        if history:
-            # Filter to last 7 days
-            week_ago = timestamp - timedelta(days=7)
-            recent_scores = [score for ts, score in history if ts >= week_ago]
-            
-            if recent_scores:
-                features["risk_score_7d_avg"] = float(np.mean(recent_scores))
-                features["risk_score_7d_std"] = float(np.std(recent_scores))
-                
-                # Calculate trend (linear regression slope)
-                if len(recent_scores) >= 2:
-                    x = np.arange(len(recent_scores))
-                    slope = np.polyfit(x, recent_scores, 1)[0]
-                    # Normalize to -1 to 1
-                    features["risk_score_trend"] = float(np.clip(slope / 10, -1, 1))
-                else:
-                    features["risk_score_trend"] = 0.0
-            else:
-                features["risk_score_7d_avg"] = 50.0
-                features["risk_score_7d_std"] = 0.0
-                features["risk_score_trend"] = 0.0
+    ) -> None:
+        """Extract temporal features from score history into their columns of matrix."""
+        col = self._feature_index
+        week_ago = _epoch_ns(timestamp) - _WEEK_NS
+        
+        columns = [col["risk_score_7d_avg"], col["risk_score_7d_std"], col["risk_score_trend"]]
+        if HAS_NUMBA:
+            stats = np.empty((len(node_ids), 3))
+            rows = np.fromiter(
+                (self._history_rows.get(node_id, -1) for node_id in node_ids),
+                dtype=np.int64, count=len(node_ids)
+            )
+            _temporal_stats_batch(
+                self._history_timestamps, self._history_scores, self._history_offsets,
+                rows, week_ago, stats
+            )
+            matrix[:, columns] = stats
         else:
-            features["risk_score_7d_avg"] = 50.0
-            features["risk_score_7d_std"] = 0.0
-            features["risk_score_trend"] = 0.0
+            stats = [self._temporal_stats(self._history_series(node_id), week_ago) for node_id in node_ids]
+            if stats:
+                matrix[:, columns] = stats
         
         # Default temporal features (would be computed from audit logs in production)
-        features["days_since_last_change"] = 7.0
-        features["changes_last_30d"] = 5.0
-        
-        return features
-    
-    async def _extract_edge_features(self, node_id: str) -> Dict[str, float]:
-        """Extract edge-based features."""
-        features = {
-            "inbound_connection_count": 0.0,
-            "outbound_connection_count": 0.0,
-            "ai_tool_connection_count": 0.0,
-            "external_connection_count": 0.0,
-            "sensitive_data_flow_count": 0.0,
-        }
+        matrix[:, col["days_since_last_change"]] = 7.0
+        matrix[:, col["changes_last_30d"]] = 5.0
+    
+    @staticmethod
+    def _temporal_stats(
+        history: Optional[Tuple[np.ndarray, np.ndarray]],
+        week_ago: int
+    ) -> Tuple[float, float, float]:
+        """
+        (7-day average, 7-day std, trend) of a node's score history.
         
-        # Query graph for connections
-        if hasattr(self.graph_engine, 'get_node_connections'):
-            connections = await self.graph_engine.get_node_connections(node_id)
-            if connections:
-                features["inbound_connection_count"] = float(connections.get("inbound", 0))
-                features["outbound_connection_count"] = float(connections.get("outbound", 0))
-                features["ai_tool_connection_count"] = float(connections.get("ai_tools", 0))
-                features["external_connection_count"] = float(connections.get("external", 0))
-                features["sensitive_data_flow_count"] = float(connections.get("sensitive", 0))
-        
-        return features
-    
-    async def _extract_topology_features(self, node_id: str) -> Dict[str, float]:
-        """Extract graph topology features."""
-        features = {
-            "degree_centrality": 0.5,
-            "betweenness_centrality": 0.1,
-            "clustering_coefficient": 0.3,
-            "shortest_path_to_external": 3.0,
-            "exposure_path_count": 0.0,
-        }
+        Args:
+            history: Time-sorted (epoch-ns timestamps, scores) arrays
+            week_ago: Start of the 7-day window, in epoch nanoseconds
+        """
+        if history is None:
+            return 50.0, 0.0, 0.0
+        
+        # Filter to last 7 days: timestamps are sorted, so the window is a suffix
+        timestamps, scores = history
+        y = scores[np.searchsorted(timestamps, week_ago):]
+        n = y.size
+        if n == 0:
+            return 50.0, 0.0, 0.0
         
-        # Query graph for topology metrics
-        if hasattr(self.graph_engine, 'get_topology_metrics'):
-            metrics = await self.graph_engine.get_topology_metrics(node_id)
-            if metrics:
-                features.update(metrics)
+        # The deviations serve both the std and the trend
+        avg = float(y.sum()) / n
+        deviations = y - avg
+        std = math.sqrt(float(deviations @ deviations) / n)
         
-        # Get exposure paths
-        if hasattr(self.graph_engine, 'find_exposure_paths'):
-            paths = await self.graph_engine.find_exposure_paths(node_id)
-            features["exposure_path_count"] = float(len(paths) if paths else 0)
-            if paths:
-                # Shortest path length
-                features["shortest_path_to_external"] = float(min(len(p) for p in paths))
+        # Calculate trend (least-squares slope over evenly spaced samples,
+        # in closed form: x is 0..n-1, so its mean and variance are known)
+        trend = 0.0
+        if n >= 2:
+            x_centered = np.arange(n) - (n - 1) / 2
+            slope = float(x_centered @ deviations) / (n * (n * n - 1) / 12)
+            # Normalize to -1 to 1
+            trend = min(1.0, max(-1.0, slope / 10))
         
-        return features
+        return avg, std, trend
     
-    async def _extract_behavioral_features(
+    def _extract_edge_features(
         self,
-        node_id: str,
+        matrix: np.ndarray,
+        connections: List[Dict[str, Any]]
+    ) -> None:
+        """Extract edge-based features from connection counts into their columns of matrix."""
+        col = self._feature_index
+        
+        matrix[:, col["inbound_connection_count"]] = [float(c.get("inbound", 0)) for c in connections]
+        matrix[:, col["outbound_connection_count"]] = [float(c.get("outbound", 0)) for c in connections]
+        matrix[:, col["ai_tool_connection_count"]] = [float(c.get("ai_tools", 0)) for c in connections]
+        matrix[:, col["external_connection_count"]] = [float(c.get("external", 0)) for c in connections]
+        matrix[:, col["sensitive_data_flow_count"]] = [float(c.get("sensitive", 0)) for c in connections]
+    
+    def _extract_topology_features(
+        self,
+        matrix: np.ndarray,
+        metrics: List[Optional[Dict[str, float]]],
+        exposure: List[Optional[Dict[str, Any]]],
+        has_exposure: bool = True
+    ) -> None:
+        """
+        Extract graph topology features into their columns of matrix.
+        
+        Args:
+            matrix: Feature matrix to fill
+            metrics: Each node's topology metrics, if available
+            exposure: Each node's exposure summary (path count, shortest length)
+            has_exposure: Whether exposure was queried at all
+        """
+        col = self._feature_index
+        matrix[:, col["degree_centrality"]] = 0.5
+        matrix[:, col["betweenness_centrality"]] = 0.1
+        matrix[:, col["clustering_coefficient"]] = 0.3
+        matrix[:, col["shortest_path_to_external"]] = 3.0
+        matrix[:, col["exposure_path_count"]] = 0.0
+        
+        for row, node_metrics in enumerate(metrics):
+            if node_metrics:
+                # Metrics outside the schema have no column and are ignored
+                for name, value in node_metrics.items():
+                    position = col.get(name)
+                    if position is not None:
+                        matrix[row, position] = value
+        
+        # Exposure paths
+        if has_exposure:
+            matrix[:, col["exposure_path_count"]] = [
+                float(summary["path_count"]) if summary else 0.0 for summary in exposure
+            ]
+            shortest = col["shortest_path_to_external"]
+            for row, summary in enumerate(exposure):
+                if summary and summary["shortest_path_length"] is not None:
+                    matrix[row, shortest] = float(summary["shortest_path_length"])
+    
+    def _extract_behavioral_features(
+        self,
+        matrix: np.ndarray,
+        node_ids: List[str],
         timestamp: datetime
-    ) -> Dict[str, float]:
-        """Extract behavioral/usage pattern features."""
+    ) -> None:
+        """Extract behavioral/usage pattern features into their columns of matrix."""
+        col = self._feature_index
+        
         # In production, these would come from access logs and audit trails
-        features = {
-            "access_frequency_24h": 100.0,
-            "unique_accessor_count": 10.0,
-            "anomalous_access_count": 0.0,
-        }
+        matrix[:, col["access_frequency_24h"]] = 100.0
+        matrix[:, col["unique_accessor_count"]] = 10.0
+        matrix[:, col["anomalous_access_count"]] = 0.0
+    
+    def set_normalization_stats(
+        self,
+        means: Optional[Dict[str, float]] = None,
+        stds: Optional[Dict[str, float]] = None
+    ) -> None:
+        """
+        Precompute the normalization used by normalize_features.
+        
+        Features with both a mean and a std are z-score normalized; the
+        rest fall back to min-max normalization over their schema bounds,
+        or are left unchanged when the schema has no bounds.
+        
+        Args:
+            means: Precomputed means per feature
+            stds: Precomputed standard deviations per feature
+        """
+        self._norm_offset, self._norm_divisor = self._normalization_constants(means, stds)
+    
+    def _normalization_constants(
+        self,
+        means: Optional[Dict[str, float]],
+        stds: Optional[Dict[str, float]]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-feature (offset, divisor) so that normalized = (value - offset) / divisor."""
+        # Min-max normalization as fallback, identity where there are no bounds
+        offset = np.where(self._has_bounds, self._min, 0.0)
+        divisor = np.where(self._has_bounds, self._range + 1e-8, 1.0)
+        
+        # Use precomputed stats where available
+        if means and stds:
+            for name in means.keys() & stds.keys():
+                position = self._feature_index.get(name)
+                if position is not None:
+                    offset[position] = means[name]
+                    divisor[position] = stds[name] + 1e-8
         
-        return features
+        return offset, divisor
     
     def normalize_features(
         self,
@@ -405,33 +1058,32 @@ class FeatureEngineer:
         
         Args:
             feature_vector: Input feature vector
-            means: Optional precomputed means for each feature
+            means: Optional precomputed means for each feature (defaults to
+                the stats given to set_normalization_stats)
             stds: Optional precomputed standard deviations
         
         Returns:
             Normalized FeatureVector
         """
-        normalized = {}
-        
-        for name, value in feature_vector.features.items():
-            schema = self._schema_map.get(name)
-            
-            if means and stds and name in means and name in stds:
-                # Use precomputed stats
-                mean = means[name]
-                std = stds[name]
-                normalized[name] = (value - mean) / (std + 1e-8)
-            elif schema and schema.min_value is not None and schema.max_value is not None:
-                # Min-max normalization as fallback
-                range_val = schema.max_value - schema.min_value
-                normalized[name] = (value - schema.min_value) / (range_val + 1e-8)
-            else:
-                normalized[name] = value
+        if means is None and stds is None:
+            offset, divisor = self._norm_offset, self._norm_divisor
+        else:
+            offset, divisor = self._normalization_constants(means, stds)
+        
+        values = feature_vector.values
+        if feature_vector.feature_names != self._feature_names:
+            # Foreign feature layout: map this engineer's constants onto it
+            positions = [self._feature_index.get(name) for name in feature_vector.feature_names]
+            offset = np.array([0.0 if p is None else offset[p] for p in positions])
+            divisor = np.array([1.0 if p is None else divisor[p] for p in positions])
+        
+        normalized = ((values - offset) / divisor).astype(values.dtype)
         
         return FeatureVector(
             node_id=feature_vector.node_id,
             timestamp=feature_vector.timestamp,
-            features=normalized,
+            values=normalized,
             feature_names=feature_vector.feature_names,
             category_breakdown=feature_vector.category_breakdown,
+            feature_index=feature_vector.feature_index,
         )
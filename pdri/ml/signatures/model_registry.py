@@ -14,14 +14,85 @@ Author: PDRI Team
 Version: 1.0.0
 """
 
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
+import asyncio
+import bisect
 import json
+import logging
+import mmap
+import os
 import pickle
 import hashlib
+import itertools
+import sys
+import threading
+
+import numpy as np
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import msgpack
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+
+try:
+    import cloudpickle
+    HAS_CLOUDPICKLE = True
+except ImportError:
+    HAS_CLOUDPICKLE = False
+
+logger = logging.getLogger(__name__)
+
+# Model file suffix per storage format
+_FORMAT_SUFFIXES = {"json": ".json", "msgpack": ".msgpack"}
+
+
+def _dumps(obj: Any, indent: bool = True) -> bytes:
+    """Serialize registry data to JSON bytes, using orjson when available."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None).encode("utf-8")
+
+
+def _loads(data: bytes) -> Any:
+    """Parse registry JSON bytes, using orjson when available."""
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write a file via a temp sibling and rename, so readers never see it half-written."""
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _quarantine(path: Path) -> None:
+    """Move an unreadable registry file aside so it is kept but not reloaded."""
+    backup = path.with_name(path.name + ".corrupt")
+    os.replace(path, backup)
+    logger.error(f"Corrupt registry file {path}, moved to {backup}")
+
+
+@lru_cache(maxsize=256)
+def _slugify(name: str) -> str:
+    """Model name as used in model IDs."""
+    return name.lower().replace(" ", "-")
 
 
 class ModelStatus(Enum):
@@ -42,7 +113,16 @@ class ModelType(Enum):
     EMBEDDING_MODEL = "embedding_model"
 
 
-@dataclass
+# Enum <-> string lookups, built once instead of per (de)serialized version
+_MODEL_TYPE_STR = {t: t.value for t in ModelType}
+_MODEL_STATUS_STR = {s: s.value for s in ModelStatus}
+_STR_TO_MODEL_TYPE = {t.value: t for t in ModelType}
+_STR_TO_MODEL_STATUS = {s.value: s for s in ModelStatus}
+
+_METRIC_FIELDS = ("accuracy", "precision", "recall", "f1_score", "auc_roc", "mse", "mae")
+
+
+@dataclass(slots=True)
 class ModelMetrics:
     """Performance metrics for a model."""
     accuracy: Optional[float] = None
@@ -56,16 +136,44 @@ class ModelMetrics:
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
-        result = {}
-        for key in ["accuracy", "precision", "recall", "f1_score", "auc_roc", "mse", "mae"]:
-            value = getattr(self, key)
-            if value is not None:
-                result[key] = value
+        candidates = (
+            ("accuracy", self.accuracy),
+            ("precision", self.precision),
+            ("recall", self.recall),
+            ("f1_score", self.f1_score),
+            ("auc_roc", self.auc_roc),
+            ("mse", self.mse),
+            ("mae", self.mae),
+        )
+        result = {key: value for key, value in candidates if value is not None}
         result.update(self.custom_metrics)
         return result
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ModelMetrics":
+        """Create from a to_dict() mapping; unknown keys are custom metrics."""
+        return cls(
+            accuracy=data.get("accuracy"),
+            precision=data.get("precision"),
+            recall=data.get("recall"),
+            f1_score=data.get("f1_score"),
+            auc_roc=data.get("auc_roc"),
+            mse=data.get("mse"),
+            mae=data.get("mae"),
+            custom_metrics={k: v for k, v in data.items() if k not in _METRIC_FIELDS},
+        )
+
+
+# Column order of versions in compact model dicts; model_id and
+# model_type are the owning model's and are not repeated per version
+_VERSION_COLUMNS = (
+    "version_id", "version_number", "created_at", "status", "metrics",
+    "hyperparameters", "feature_names", "description", "artifact_path",
+    "training_data_hash",
+)
 
 
-@dataclass
+@dataclass(slots=True)
 class ModelVersion:
     """A specific version of a model."""
     version_id: str
@@ -88,8 +196,8 @@ class ModelVersion:
             "model_id": self.model_id,
             "version_number": self.version_number,
             "created_at": self.created_at.isoformat(),
-            "model_type": self.model_type.value,
-            "status": self.status.value,
+            "model_type": _MODEL_TYPE_STR[self.model_type],
+            "status": _MODEL_STATUS_STR[self.status],
             "metrics": self.metrics.to_dict(),
             "hyperparameters": self.hyperparameters,
             "feature_names": self.feature_names,
@@ -97,11 +205,93 @@ class ModelVersion:
             "artifact_path": self.artifact_path,
             "training_data_hash": self.training_data_hash,
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ModelVersion":
+        """Create from a to_dict() mapping."""
+        return cls(
+            version_id=data["version_id"],
+            model_id=data["model_id"],
+            version_number=data["version_number"],
+            created_at=datetime.fromisoformat(data["created_at"]),
+            model_type=_STR_TO_MODEL_TYPE[data["model_type"]],
+            status=_STR_TO_MODEL_STATUS[data["status"]],
+            metrics=ModelMetrics.from_dict(data.get("metrics", {})),
+            hyperparameters=data.get("hyperparameters", {}),
+            feature_names=data.get("feature_names", []),
+            description=data.get("description", ""),
+            artifact_path=data.get("artifact_path"),
+            training_data_hash=data.get("training_data_hash"),
+        )
+    
+    def to_row(self) -> List[Any]:
+        """Values in _VERSION_COLUMNS order, with empty fields as None."""
+        return [
+            self.version_id,
+            self.version_number,
+            self.created_at.isoformat(),
+            _MODEL_STATUS_STR[self.status],
+            self.metrics.to_dict() or None,
+            self.hyperparameters or None,
+            self.feature_names or None,
+            self.description or None,
+            self.artifact_path,
+            self.training_data_hash,
+        ]
+    
+    @classmethod
+    def from_row(
+        cls,
+        row: List[Any],
+        columns: List[str],
+        model_id: str,
+        model_type: ModelType
+    ) -> "ModelVersion":
+        """Create from a to_row() list under its column header."""
+        data = dict(zip(columns, row))
+        return cls(
+            version_id=data["version_id"],
+            model_id=model_id,
+            version_number=data["version_number"],
+            created_at=datetime.fromisoformat(data["created_at"]),
+            model_type=model_type,
+            status=_STR_TO_MODEL_STATUS[data["status"]],
+            metrics=ModelMetrics.from_dict(data.get("metrics") or {}),
+            hyperparameters=data.get("hyperparameters") or {},
+            feature_names=data.get("feature_names") or [],
+            description=data.get("description") or "",
+            artifact_path=data.get("artifact_path"),
+            training_data_hash=data.get("training_data_hash"),
+        )
+
+
+def _created_at(version: ModelVersion) -> datetime:
+    """Sort key for versions."""
+    return version.created_at
+
+
+def _share_feature_names(versions: List[ModelVersion]) -> None:
+    """
+    Point versions with the same feature set at one shared list.
+    
+    Successive versions of a model almost always use identical features,
+    so this keeps one interned list per distinct set instead of one per
+    version.
+    """
+    seen: Dict[Tuple[str, ...], List[str]] = {}
+    for version in versions:
+        if version.feature_names:
+            names = tuple(sys.intern(name) for name in version.feature_names)
+            version.feature_names = seen.setdefault(names, list(names))
 
 
-@dataclass
+@dataclass(slots=True)
 class RegisteredModel:
-    """A registered model with all its versions."""
+    """
+    A registered model with all its versions.
+    
+    ``versions`` is kept ordered by ``created_at``.
+    """
     model_id: str
     name: str
     model_type: ModelType
@@ -110,34 +300,92 @@ class RegisteredModel:
     updated_at: datetime
     versions: List[ModelVersion] = field(default_factory=list)
     tags: Dict[str, str] = field(default_factory=dict)
+    production_version_id: Optional[str] = None
+    _production_version: Optional[ModelVersion] = field(
+        default=None, init=False, repr=False, compare=False
+    )
     
     @property
     def latest_version(self) -> Optional[ModelVersion]:
         """Get the latest version."""
-        if not self.versions:
-            return None
-        return max(self.versions, key=lambda v: v.created_at)
+        return self.versions[-1] if self.versions else None
     
     @property
     def production_version(self) -> Optional[ModelVersion]:
         """Get the production version."""
+        cached = self._production_version
+        if (
+            cached is not None
+            and cached.version_id == self.production_version_id
+            and cached.status == ModelStatus.PRODUCTION
+        ):
+            return cached
+        
+        # Not cached yet, or a status was changed outside the registry
         for v in self.versions:
             if v.status == ModelStatus.PRODUCTION:
+                self.set_production_version(v)
                 return v
+        self.set_production_version(None)
         return None
     
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary."""
+    def set_production_version(self, version: Optional[ModelVersion]) -> None:
+        """Record which version is in production."""
+        self._production_version = version
+        self.production_version_id = version.version_id if version else None
+    
+    def to_dict(self, compact: bool = False) -> Dict[str, Any]:
+        """
+        Convert to dictionary.
+        
+        Args:
+            compact: Store versions as a column header plus one value row
+                per version, instead of one dict per version
+        """
+        if compact:
+            versions: Any = {
+                "__schema": list(_VERSION_COLUMNS),
+                "rows": [v.to_row() for v in self.versions],
+            }
+        else:
+            versions = [v.to_dict() for v in self.versions]
         return {
             "model_id": self.model_id,
             "name": self.name,
-            "model_type": self.model_type.value,
+            "model_type": _MODEL_TYPE_STR[self.model_type],
             "description": self.description,
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat(),
-            "versions": [v.to_dict() for v in self.versions],
+            "versions": versions,
             "tags": self.tags,
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RegisteredModel":
+        """Create from a to_dict() mapping, compact or not."""
+        model_type = _STR_TO_MODEL_TYPE[data["model_type"]]
+        versions = data.get("versions", [])
+        if isinstance(versions, dict):
+            columns = versions["__schema"]
+            versions = [
+                ModelVersion.from_row(row, columns, data["model_id"], model_type)
+                for row in versions["rows"]
+            ]
+        else:
+            versions = [ModelVersion.from_dict(v) for v in versions]
+        # Already in order when written by the registry; this is a linear check then
+        versions.sort(key=_created_at)
+        _share_feature_names(versions)
+        return cls(
+            model_id=data["model_id"],
+            name=data["name"],
+            model_type=model_type,
+            description=data.get("description", ""),
+            created_at=datetime.fromisoformat(data["created_at"]),
+            updated_at=datetime.fromisoformat(data["updated_at"]),
+            versions=versions,
+            tags=data.get("tags", {}),
+        )
 
 
 class ModelRegistry:
@@ -150,6 +398,11 @@ class ModelRegistry:
     - Status management (staging → production)
     - Performance tracking
     
+    Each model is stored in its own ``models/<model_id>.json`` (or
+    ``.msgpack``) file, rewritten only when that model changes; status
+    changes are appended to the ``registry.log`` journal and replayed on
+    load.
+    
     Example:
         registry = ModelRegistry("/models")
         model_id = registry.register_model("risk_classifier", ModelType.RISK_CLASSIFIER)
@@ -157,75 +410,221 @@ class ModelRegistry:
         registry.promote_to_production(version_id)
     """
     
-    def __init__(self, storage_path: str):
+    # Journal length at which loading folds it back into the model files
+    JOURNAL_COMPACT_EVENTS = 1000
+    
+    def __init__(
+        self,
+        storage_path: str,
+        artifact_cache_size: int = 8,
+        storage_format: str = "json",
+        io_workers: int = 4
+    ):
         """
         Initialize model registry.
         
         Args:
             storage_path: Path to store model artifacts
+            artifact_cache_size: Max loaded artifacts kept in memory (LRU)
+            storage_format: Model file format, "json" or "msgpack" (binary,
+                requires msgpack); files in the other format are converted
+                on load
+            io_workers: Threads used by the async artifact loaders
         """
+        if storage_format not in _FORMAT_SUFFIXES:
+            raise ValueError(f"Unknown storage format: {storage_format}")
+        if storage_format == "msgpack" and not HAS_MSGPACK:
+            raise ImportError("msgpack required for the msgpack storage format")
+        self.storage_format = storage_format
+        
         self.storage_path = Path(storage_path)
         self.storage_path.mkdir(parents=True, exist_ok=True)
+        self._models_dir = self.storage_path / "models"
+        self._models_dir.mkdir(exist_ok=True)
+        self._journal_file = self.storage_path / "registry.log"
+        
+        # Models changed inside batch() and not yet written
+        self._dirty: Set[str] = set()
+        self._batch_depth = 0
         
         # In-memory registry (would be database in production)
         self._models: Dict[str, RegisteredModel] = {}
-        self._artifacts: Dict[str, Any] = {}
+        self._version_index: Dict[str, ModelVersion] = {}
+        # Production version per model, grouped by type, in registration order
+        self._prod_by_type: Dict[ModelType, Dict[str, str]] = {}
+        self.artifact_cache_size = artifact_cache_size
+        self._artifacts: OrderedDict[str, Any] = OrderedDict()
+        self._artifacts_lock = threading.Lock()
+        self.io_workers = io_workers
+        self._io_pool: Optional[ThreadPoolExecutor] = None
+        self._id_counter = itertools.count()
         
         # Load existing registry
         self._load_registry()
     
     def _load_registry(self) -> None:
-        """Load registry from disk."""
-        registry_file = self.storage_path / "registry.json"
-        if registry_file.exists():
+        """Load model files from disk and replay the status journal."""
+        self._migrate_legacy_registry()
+        
+        suffix = _FORMAT_SUFFIXES[self.storage_format]
+        loaded = []
+        for model_file in sorted(self._models_dir.iterdir()):
+            if model_file.suffix not in _FORMAT_SUFFIXES.values():
+                continue
+            if model_file.suffix != suffix and model_file.with_suffix(suffix).exists():
+                # Superseded by the file in the current format
+                model_file.unlink()
+                continue
             try:
-                with open(registry_file, "r") as f:
-                    data = json.load(f)
-                    for model_data in data.get("models", []):
-                        model = self._dict_to_model(model_data)
-                        self._models[model.model_id] = model
-            except Exception:
-                pass  # Start fresh if corrupted
-    
-    def _save_registry(self) -> None:
-        """Save registry to disk."""
+                loaded.append((RegisteredModel.from_dict(self._decode(model_file)), model_file))
+            except FileNotFoundError:
+                continue  # Removed since the directory listing
+            except ImportError as e:
+                logger.warning(f"Skipping model file {model_file}: {e}")
+                continue
+            except (ValueError, KeyError, TypeError):
+                _quarantine(model_file)
+                continue
+        
+        # Files are listed by name; add models in registration order so
+        # the production model chosen per type is the same after a restart
+        loaded.sort(key=lambda item: (item[0].created_at, item[0].model_id))
+        for model, model_file in loaded:
+            self._add_model(model)
+            if model_file.suffix != suffix:
+                # Convert to the current format
+                self._save_model(model_file.stem)
+                model_file.unlink()
+        
+        events = 0
+        if self._journal_file.exists():
+            with open(self._journal_file, "rb") as f:
+                for line in f:
+                    try:
+                        event = _loads(line)
+                        version = self._find_version(event["version_id"])
+                        if version:
+                            self._apply_status(version, _STR_TO_MODEL_STATUS[event["status"]])
+                            events += 1
+                    except Exception:
+                        pass  # Skip a torn or unknown journal entry
+        
+        if events >= self.JOURNAL_COMPACT_EVENTS:
+            self.compact()
+    
+    def _migrate_legacy_registry(self) -> None:
+        """Split a single-file registry.json into per-model files."""
         registry_file = self.storage_path / "registry.json"
+        try:
+            data = _loads(registry_file.read_bytes())
+            models = [RegisteredModel.from_dict(m) for m in data.get("models", [])]
+        except FileNotFoundError:
+            return  # Nothing to migrate
+        except (ValueError, KeyError, TypeError, AttributeError):
+            _quarantine(registry_file)
+            return
+        for model in models:
+            self._add_model(model)
+            self._save_model(model.model_id)
+        registry_file.unlink()
+    
+    def _add_model(self, model: RegisteredModel) -> None:
+        """Add a model to the in-memory registry and index its versions."""
+        self._models[model.model_id] = model
+        for version in model.versions:
+            self._version_index[version.version_id] = version
+        self._index_production(model)
+    
+    def _index_production(self, model: RegisteredModel) -> None:
+        """Update the type -> production version index for one model."""
+        prod_version = model.production_version
+        by_model = self._prod_by_type.setdefault(model.model_type, {})
+        if prod_version is None:
+            by_model.pop(model.model_id, None)
+        elif by_model.get(model.model_id) != prod_version.version_id:
+            by_model[model.model_id] = prod_version.version_id
+            # Keep registration order so the same model wins as before
+            self._prod_by_type[model.model_type] = {
+                mid: by_model[mid] for mid in self._models if mid in by_model
+            }
+    
+    def _mark_dirty(self, model_id: str) -> None:
+        """Persist a changed model now, or at the end of the enclosing batch()."""
+        if self._batch_depth:
+            self._dirty.add(model_id)
+        else:
+            self._save_model(model_id)
+    
+    @contextmanager
+    def batch(self) -> Iterator["ModelRegistry"]:
+        """
+        Defer model file writes until the block exits.
+        
+        Each changed model is written once on exit instead of once per
+        call, which keeps loops of log_version (e.g. hyperparameter
+        sweeps) linear. Batches may be nested; the outermost one flushes.
+        
+        Example:
+            with registry.batch():
+                for params in grid:
+                    registry.log_version(model_id, train(params), ...)
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self.flush()
+    
+    def flush(self) -> None:
+        """Write every model changed since the last flush."""
+        while self._dirty:
+            self._save_model(self._dirty.pop())
+    
+    def _save_model(self, model_id: str) -> None:
+        """Write one model, with all its versions, to its model file."""
+        model_file = self._models_dir / f"{model_id}{_FORMAT_SUFFIXES[self.storage_format]}"
+        data = self._models[model_id].to_dict(compact=True)
+        if self.storage_format == "msgpack":
+            _write_atomic(model_file, msgpack.packb(data))
+        else:
+            _write_atomic(model_file, _dumps(data))
+    
+    @staticmethod
+    def _decode(model_file: Path) -> Dict[str, Any]:
+        """Read a model file in whichever format its suffix names."""
+        if model_file.suffix == _FORMAT_SUFFIXES["msgpack"]:
+            if not HAS_MSGPACK:
+                raise ImportError("msgpack required to read msgpack model files")
+            return msgpack.unpackb(model_file.read_bytes())
+        return _loads(model_file.read_bytes())
+    
+    def export_json(self, path: str) -> None:
+        """Write the whole registry to one readable JSON file (e.g. for debugging)."""
         data = {
             "models": [m.to_dict() for m in self._models.values()],
-            "updated_at": datetime.now(timezone.utc).isoformat(),
+            "exported_at": datetime.now(timezone.utc).isoformat(),
         }
-        with open(registry_file, "w") as f:
-            json.dump(data, f, indent=2)
-    
-    def _dict_to_model(self, data: Dict[str, Any]) -> RegisteredModel:
-        """Convert dictionary to RegisteredModel."""
-        versions = []
-        for v_data in data.get("versions", []):
-            versions.append(ModelVersion(
-                version_id=v_data["version_id"],
-                model_id=v_data["model_id"],
-                version_number=v_data["version_number"],
-                created_at=datetime.fromisoformat(v_data["created_at"]),
-                model_type=ModelType(v_data["model_type"]),
-                status=ModelStatus(v_data["status"]),
-                metrics=ModelMetrics(**v_data.get("metrics", {})),
-                hyperparameters=v_data.get("hyperparameters", {}),
-                feature_names=v_data.get("feature_names", []),
-                description=v_data.get("description", ""),
-                artifact_path=v_data.get("artifact_path"),
-                training_data_hash=v_data.get("training_data_hash"),
-            ))
-        
-        return RegisteredModel(
-            model_id=data["model_id"],
-            name=data["name"],
-            model_type=ModelType(data["model_type"]),
-            description=data.get("description", ""),
-            created_at=datetime.fromisoformat(data["created_at"]),
-            updated_at=datetime.fromisoformat(data["updated_at"]),
-            versions=versions,
-            tags=data.get("tags", {}),
-        )
+        _write_atomic(Path(path), _dumps(data))
+    
+    def _append_event(self, version: "ModelVersion") -> None:
+        """Record a version's status change in the journal."""
+        event = {
+            "op": "status",
+            "version_id": version.version_id,
+            "status": _MODEL_STATUS_STR[version.status],
+            "ts": datetime.now(timezone.utc).isoformat(),
+        }
+        with open(self._journal_file, "ab") as f:
+            f.write(_dumps(event, indent=False) + b"\n")
+    
+    def compact(self) -> None:
+        """Fold the status journal into the model files and truncate it."""
+        self._dirty.clear()
+        for model_id in self._models:
+            self._save_model(model_id)
+        _write_atomic(self._journal_file, b"")
     
     def register_model(
         self,
@@ -260,7 +659,7 @@ class ModelRegistry:
         )
         
         self._models[model_id] = model
-        self._save_registry()
+        self._mark_dirty(model_id)
         
         return model_id
     
@@ -272,7 +671,8 @@ class ModelRegistry:
         hyperparameters: Optional[Dict[str, Any]] = None,
         feature_names: Optional[List[str]] = None,
         description: str = "",
-        training_data: Optional[bytes] = None
+        training_data: Optional[Union[bytes, str, os.PathLike, Iterable[bytes]]] = None,
+        warm: bool = False
     ) -> str:
         """
         Log a new model version.
@@ -284,7 +684,10 @@ class ModelRegistry:
             hyperparameters: Training hyperparameters
             feature_names: List of input feature names
             description: Version description
-            training_data: Optional training data for hash computation
+            training_data: Optional training data for hash computation: the
+                bytes themselves, a path to a file, or an iterable of chunks
+            warm: Also keep the artifact in the in-memory cache; by default
+                it is only written to disk and loaded on first use
         
         Returns:
             Version ID
@@ -293,76 +696,144 @@ class ModelRegistry:
             raise ValueError(f"Model {model_id} not found")
         
         model = self._models[model_id]
+        now = datetime.now(timezone.utc)
         version_num = len(model.versions) + 1
+        
+        feature_names = feature_names or []
+        latest = model.latest_version
+        if latest and latest.feature_names == feature_names:
+            feature_names = latest.feature_names  # Share the unchanged list
         version_id = f"{model_id}-v{version_num}"
         
         # Save artifact
-        artifact_path = self._save_artifact(version_id, model_artifact)
+        artifact_path = self._save_artifact(version_id, model_artifact, warm=warm)
         
         # Compute training data hash
         data_hash = None
         if training_data:
-            data_hash = hashlib.sha256(training_data).hexdigest()[:16]
+            data_hash = self._hash_training_data(training_data)
         
         version = ModelVersion(
             version_id=version_id,
             model_id=model_id,
             version_number=f"v{version_num}",
-            created_at=datetime.now(timezone.utc),
+            created_at=now,
             model_type=model.model_type,
             status=ModelStatus.DRAFT,
             metrics=metrics,
             hyperparameters=hyperparameters or {},
-            feature_names=feature_names or [],
+            feature_names=feature_names,
             description=description,
             artifact_path=str(artifact_path),
             training_data_hash=data_hash,
         )
         
-        model.versions.append(version)
-        model.updated_at = datetime.now(timezone.utc)
+        # Keep versions ordered by creation time even if the clock steps back
+        bisect.insort(model.versions, version, key=_created_at)
+        self._version_index[version_id] = version
+        model.updated_at = now
         
-        self._save_registry()
+        self._mark_dirty(model_id)
         
         return version_id
     
-    def _save_artifact(self, version_id: str, artifact: Any) -> Path:
-        """Save model artifact to disk."""
+    @staticmethod
+    def _hash_training_data(
+        training_data: Union[bytes, str, os.PathLike, Iterable[bytes]]
+    ) -> str:
+        """Fingerprint training data without holding more than a chunk of a file in memory."""
+        if isinstance(training_data, (bytes, bytearray, memoryview)):
+            digest = hashlib.sha256(training_data)
+        elif isinstance(training_data, (str, os.PathLike)):
+            with open(training_data, "rb") as f:
+                digest = hashlib.file_digest(f, "sha256")
+        else:
+            digest = hashlib.sha256()
+            for chunk in training_data:
+                digest.update(chunk)
+        return digest.digest()[:8].hex()
+    
+    def _save_artifact(self, version_id: str, artifact: Any, warm: bool = False) -> Path:
+        """Save model artifact to disk, caching it only when ``warm`` is set."""
         artifact_dir = self.storage_path / "artifacts"
         artifact_dir.mkdir(exist_ok=True)
         
         artifact_path = artifact_dir / f"{version_id}.pkl"
         
         with open(artifact_path, "wb") as f:
-            pickle.dump(artifact, f)
-        
-        self._artifacts[version_id] = artifact
+            try:
+                pickle.dump(artifact, f, protocol=pickle.HIGHEST_PROTOCOL)
+            except (pickle.PicklingError, AttributeError, TypeError):
+                # Closures and lambdas (e.g. custom transformers) need cloudpickle
+                if not HAS_CLOUDPICKLE:
+                    raise
+                f.seek(0)
+                f.truncate()
+                cloudpickle.dump(artifact, f, protocol=pickle.HIGHEST_PROTOCOL)
+        
+        if warm:
+            self._cache_artifact(version_id, artifact)
         
         return artifact_path
     
     def load_artifact(self, version_id: str) -> Any:
         """Load model artifact from disk or cache."""
-        if version_id in self._artifacts:
-            return self._artifacts[version_id]
+        with self._artifacts_lock:
+            if version_id in self._artifacts:
+                self._artifacts.move_to_end(version_id)
+                return self._artifacts[version_id]
         
         # Find version
         version = self._find_version(version_id)
         if not version or not version.artifact_path:
             raise ValueError(f"Artifact not found for {version_id}")
         
+        # Unpickle straight from the page cache rather than through
+        # buffered reads into an intermediate copy
         with open(version.artifact_path, "rb") as f:
-            artifact = pickle.load(f)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                artifact = pickle.loads(mapped)
         
-        self._artifacts[version_id] = artifact
+        self._cache_artifact(version_id, artifact)
         return artifact
     
+    async def aload_artifact(self, version_id: str) -> Any:
+        """Load a model artifact on the I/O thread pool, off the event loop."""
+        if self._io_pool is None:
+            self._io_pool = ThreadPoolExecutor(
+                max_workers=self.io_workers, thread_name_prefix="registry-io"
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._io_pool, self.load_artifact, version_id)
+    
+    async def aload_artifacts(self, version_ids: Iterable[str]) -> List[Any]:
+        """
+        Load several artifacts concurrently (e.g. to warm a worker).
+        
+        Reads overlap on the I/O pool, so preloading takes roughly as long
+        as the slowest artifact rather than the sum of all of them.
+        """
+        return await asyncio.gather(*(self.aload_artifact(v) for v in version_ids))
+    
+    def close(self) -> None:
+        """Shut down the I/O thread pool, if it was started."""
+        if self._io_pool is not None:
+            self._io_pool.shutdown(wait=True)
+            self._io_pool = None
+    
+    def _cache_artifact(self, version_id: str, artifact: Any) -> None:
+        """Keep a loaded artifact, evicting the least recently used beyond the cache size."""
+        if self.artifact_cache_size <= 0:
+            return
+        with self._artifacts_lock:
+            self._artifacts[version_id] = artifact
+            self._artifacts.move_to_end(version_id)
+            while len(self._artifacts) > self.artifact_cache_size:
+                self._artifacts.popitem(last=False)
+    
     def _find_version(self, version_id: str) -> Optional[ModelVersion]:
         """Find a version by ID."""
-        for model in self._models.values():
-            for version in model.versions:
-                if version.version_id == version_id:
-                    return version
-        return None
+        return self._version_index.get(version_id)
     
     def promote_to_staging(self, version_id: str) -> None:
         """Promote a version to staging."""
@@ -370,8 +841,8 @@ class ModelRegistry:
         if not version:
             raise ValueError(f"Version {version_id} not found")
         
-        version.status = ModelStatus.STAGING
-        self._save_registry()
+        self._apply_status(version, ModelStatus.STAGING)
+        self._append_event(version)
     
     def promote_to_production(self, version_id: str) -> None:
         """
@@ -383,15 +854,26 @@ class ModelRegistry:
         if not version:
             raise ValueError(f"Version {version_id} not found")
         
+        self._apply_status(version, ModelStatus.PRODUCTION)
+        self._append_event(version)
+    
+    def _apply_status(self, version: ModelVersion, status: ModelStatus) -> None:
+        """Set a version's status; promoting to production demotes the current one."""
         model = self._models.get(version.model_id)
-        if model:
+        if model and status == ModelStatus.PRODUCTION:
             # Demote current production
             for v in model.versions:
                 if v.status == ModelStatus.PRODUCTION:
                     v.status = ModelStatus.DEPRECATED
         
-        version.status = ModelStatus.PRODUCTION
-        self._save_registry()
+        version.status = status
+        
+        if model:
+            if status == ModelStatus.PRODUCTION:
+                model.set_production_version(version)
+            elif model.production_version_id == version.version_id:
+                model.set_production_version(None)
+            self._index_production(model)
     
     def get_model(self, model_id: str) -> Optional[RegisteredModel]:
         """Get a registered model by ID."""
@@ -399,12 +881,10 @@ class ModelRegistry:
     
     def get_production_model(self, model_type: ModelType) -> Optional[Any]:
         """Get the production model artifact for a type."""
-        for model in self._models.values():
-            if model.model_type == model_type:
-                prod_version = model.production_version
-                if prod_version:
-                    return self.load_artifact(prod_version.version_id)
-        return None
+        by_model = self._prod_by_type.get(model_type)
+        if not by_model:
+            return None
+        return self.load_artifact(next(iter(by_model.values())))
     
     def list_models(
         self,
@@ -422,37 +902,83 @@ class ModelRegistry:
         version_id_b: str
     ) -> Dict[str, Any]:
         """Compare two model versions."""
-        version_a = self._find_version(version_id_a)
-        version_b = self._find_version(version_id_b)
-        
-        if not version_a or not version_b:
-            raise ValueError("One or both versions not found")
-        
-        metrics_a = version_a.metrics.to_dict()
-        metrics_b = version_b.metrics.to_dict()
-        
-        comparison = {
-            "version_a": version_id_a,
-            "version_b": version_id_b,
-            "metrics_diff": {},
-        }
+        return self.compare_versions_batch([(version_id_a, version_id_b)])[0]
+    
+    def compare_versions_batch(
+        self,
+        pairs: Sequence[Tuple[str, str]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Compare many version pairs at once (e.g. for a leaderboard).
         
-        all_metrics = set(metrics_a.keys()) | set(metrics_b.keys())
-        for metric in all_metrics:
-            val_a = metrics_a.get(metric)
-            val_b = metrics_b.get(metric)
-            if val_a is not None and val_b is not None:
-                comparison["metrics_diff"][metric] = {
-                    "a": val_a,
-                    "b": val_b,
-                    "diff": val_b - val_a,
-                    "improvement": val_b > val_a,
-                }
+        Metrics of all pairs are laid out in two aligned matrices, one row
+        per pair and one column per metric name (NaN where a version lacks
+        the metric), so every diff is computed in a single vector op.
         
-        return comparison
+        Args:
+            pairs: (version_id_a, version_id_b) tuples
+            
+        Returns:
+            One comparison per pair, in the same format as compare_versions
+        """
+        metrics = []
+        for version_id_a, version_id_b in pairs:
+            version_a = self._find_version(version_id_a)
+            version_b = self._find_version(version_id_b)
+            if not version_a or not version_b:
+                raise ValueError("One or both versions not found")
+            metrics.append((version_a.metrics.to_dict(), version_b.metrics.to_dict()))
+        
+        columns: Dict[str, int] = {}
+        for metrics_a, metrics_b in metrics:
+            for name in metrics_a:
+                columns.setdefault(name, len(columns))
+            for name in metrics_b:
+                columns.setdefault(name, len(columns))
+        
+        a = np.full((len(metrics), len(columns)), np.nan)
+        b = np.full((len(metrics), len(columns)), np.nan)
+        for row, (metrics_a, metrics_b) in enumerate(metrics):
+            for name, value in metrics_a.items():
+                if value is not None:
+                    a[row, columns[name]] = value
+            for name, value in metrics_b.items():
+                if value is not None:
+                    b[row, columns[name]] = value
+        
+        diff = b - a
+        improved = (diff > 0).tolist()
+        present = (~np.isnan(diff)).tolist()
+        diff = diff.tolist()
+        names = list(columns)
+        
+        comparisons = []
+        for row, ((version_id_a, version_id_b), (metrics_a, metrics_b)) in enumerate(zip(pairs, metrics)):
+            row_present, row_diff, row_improved = present[row], diff[row], improved[row]
+            comparisons.append({
+                "version_a": version_id_a,
+                "version_b": version_id_b,
+                "metrics_diff": {
+                    name: {
+                        "a": metrics_a[name],
+                        "b": metrics_b[name],
+                        "diff": row_diff[col],
+                        "improvement": row_improved[col],
+                    }
+                    for col, name in enumerate(names)
+                    if row_present[col]
+                },
+            })
+        
+        return comparisons
     
     def _generate_id(self, name: str) -> str:
         """Generate unique model ID."""
-        slug = name.lower().replace(" ", "-")
+        slug = _slugify(name)
         timestamp = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
-        return f"{slug}-{timestamp}"
+        model_id = f"{slug}-{timestamp}-{next(self._id_counter):04x}"
+        while model_id in self._models:
+            # Registered by an earlier process in the same second
+            model_id = f"{slug}-{timestamp}-{next(self._id_counter):04x}"
+        return model_id
+
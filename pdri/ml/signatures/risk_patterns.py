@@ -15,10 +15,13 @@ Version: 1.0.0
 
 from dataclasses import dataclass
 from datetime import datetime
+import bisect
 from enum import Enum
 from typing import Any, Dict, List, Optional, Tuple
 import numpy as np
 
+from ..jit import HAS_NUMBA, njit, prange
+
 
 class PatternType(Enum):
     """Types of risk patterns."""
@@ -40,6 +43,17 @@ class PatternSeverity(Enum):
     CRITICAL = "critical"
 
 
+# Confidence cut-offs between consecutive severities, lowest first
+_SEVERITY_THRESHOLDS = (0.5, 0.7, 0.9)
+_SEVERITY_LEVELS = (
+    PatternSeverity.LOW,
+    PatternSeverity.MEDIUM,
+    PatternSeverity.HIGH,
+    PatternSeverity.CRITICAL,
+)
+_SEVERITY_ARRAY = np.array(_SEVERITY_LEVELS, dtype=object)
+
+
 @dataclass
 class RiskPattern:
     """A detected risk pattern."""
@@ -53,6 +67,10 @@ class RiskPattern:
     features_matched: Dict[str, float]
     recommended_actions: List[str]
     
+    def __post_init__(self):
+        # Identity for deduplication, hashed once rather than per comparison
+        self._dedup_key = (self.pattern_type, frozenset(self.affected_nodes))
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
         return {
@@ -81,6 +99,153 @@ class PatternSignature:
     recommended_actions: List[str]
 
 
+@dataclass(slots=True)
+class _CompiledSignature:
+    """
+    A PatternSignature's thresholds packed into arrays.
+    
+    Bounds are float64 arrays ordered like feature_names, with -inf/+inf
+    standing in for a missing bound; has_min/has_max record which bounds
+    were set, since only those count towards the confidence score.
+    columns and required_columns index the detector's feature matrix.
+    """
+    feature_names: Tuple[str, ...]
+    mins: np.ndarray
+    maxs: np.ndarray
+    has_min: np.ndarray
+    has_max: np.ndarray
+    required_features: Tuple[str, ...]
+    columns: np.ndarray
+    required_columns: np.ndarray
+
+
+def _pack(arrays: List[np.ndarray], dtype: Any) -> Tuple[np.ndarray, np.ndarray]:
+    """Concatenate per-signature arrays into (offsets, values); signature s spans offsets[s]:offsets[s + 1]."""
+    offsets = np.zeros(len(arrays) + 1, dtype=np.intp)
+    np.cumsum([len(a) for a in arrays], out=offsets[1:])
+    values = np.concatenate(arrays).astype(dtype) if arrays else np.empty(0, dtype=dtype)
+    return offsets, values
+
+
+# fastmath is deliberately off: NaN marks a missing feature and must
+# compare false, exactly as in the Python path
+@njit(cache=True)
+def _check_and_score(
+    values: np.ndarray,
+    present: np.ndarray,
+    mins: np.ndarray,
+    maxs: np.ndarray,
+    has_min: np.ndarray,
+    has_max: np.ndarray
+) -> Tuple[bool, float]:
+    """
+    Whether values satisfy a signature's bounds, and the match confidence.
+    
+    A value outside a bound fails the match (NaN never does). Each set
+    bound on a present feature scores 0.5 plus half the margin it is
+    cleared by, capped at 1, or 0 if not met; confidence is the mean
+    score, or 0.5 when nothing was scored.
+    """
+    matched = True
+    total = 0.0
+    count = 0
+    for i in range(values.shape[0]):
+        value = values[i]
+        if value < mins[i] or value > maxs[i]:
+            matched = False
+        if not present[i]:
+            continue
+        if has_min[i]:
+            total += min(1.0, 0.5 + (value - mins[i]) * 0.5) if value >= mins[i] else 0.0
+            count += 1
+        if has_max[i]:
+            total += min(1.0, 0.5 + (maxs[i] - value) * 0.5) if value <= maxs[i] else 0.0
+            count += 1
+    return matched, total / count if count else 0.5
+
+
+def _score_rows(
+    values: np.ndarray,
+    present: np.ndarray,
+    mins: np.ndarray,
+    maxs: np.ndarray,
+    has_min: np.ndarray,
+    has_max: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    NumPy counterpart of _check_and_score for a block of rows.
+    
+    Loops over the signature's few features and vectorises over rows.
+    Scores are added feature by feature in the kernel's order, so both
+    paths produce identical confidences.
+    """
+    n_rows = values.shape[0]
+    matched = np.ones(n_rows, dtype=bool)
+    total = np.zeros(n_rows)
+    count = np.zeros(n_rows, dtype=np.intp)
+    with np.errstate(invalid="ignore"):
+        for i in range(values.shape[1]):
+            value = values[:, i]
+            matched &= ~((value < mins[i]) | (value > maxs[i]))
+            if has_min[i]:
+                score = np.minimum(1.0, 0.5 + (value - mins[i]) * 0.5)
+                total += np.where(present[:, i] & (value >= mins[i]), score, 0.0)
+                count += present[:, i]
+            if has_max[i]:
+                score = np.minimum(1.0, 0.5 + (maxs[i] - value) * 0.5)
+                total += np.where(present[:, i] & (value <= maxs[i]), score, 0.0)
+                count += present[:, i]
+    confidence = np.divide(total, count, out=np.full(n_rows, 0.5), where=count > 0)
+    return matched, confidence
+
+
+@njit(parallel=True, cache=True)
+def _sweep_all(
+    X: np.ndarray,
+    present: np.ndarray,
+    offsets: np.ndarray,
+    columns: np.ndarray,
+    mins: np.ndarray,
+    maxs: np.ndarray,
+    has_min: np.ndarray,
+    has_max: np.ndarray,
+    required_offsets: np.ndarray,
+    required_columns: np.ndarray,
+    matched: np.ndarray,
+    confidence: np.ndarray
+) -> None:
+    """
+    Check every signature against every row of the feature matrix.
+    
+    Signatures are stored back to back: signature s's bounds span
+    offsets[s]:offsets[s + 1] of columns/mins/maxs/has_min/has_max, and its
+    required features required_offsets[s]:required_offsets[s + 1] of
+    required_columns. Rows are independent, so they are split across
+    threads, each writing only its own row of matched/confidence.
+    """
+    n_signatures = offsets.shape[0] - 1
+    for row in prange(X.shape[0]):
+        values = np.empty(columns.shape[0])
+        row_present = np.empty(columns.shape[0], dtype=np.bool_)
+        for i in range(columns.shape[0]):
+            values[i] = X[row, columns[i]]
+            row_present[i] = present[row, columns[i]]
+        
+        for s in range(n_signatures):
+            ok = True
+            for k in range(required_offsets[s], required_offsets[s + 1]):
+                if not present[row, required_columns[k]]:
+                    ok = False
+                    break
+            if not ok:
+                continue
+            start, end = offsets[s], offsets[s + 1]
+            matched[row, s], confidence[row, s] = _check_and_score(
+                values[start:end], row_present[start:end],
+                mins[start:end], maxs[start:end], has_min[start:end], has_max[start:end],
+            )
+
+
 class RiskPatternDetector:
     """
     Detect risk patterns using rule-based and ML techniques.
@@ -224,6 +389,110 @@ class RiskPatternDetector:
             self.signatures.extend(signatures)
         self.ml_model = ml_model
         self._pattern_counter = 0
+        self._index_signatures()
+    
+    def _index_signatures(self) -> None:
+        """
+        Compile all signatures for matching in bulk.
+        
+        Every feature named by any signature gets a column in the matrix
+        built by _build_feature_matrix.
+        """
+        self._signature_columns: Dict[str, int] = {}
+        for signature in self.signatures:
+            for name in (*signature.feature_thresholds, *signature.required_features):
+                self._signature_columns.setdefault(name, len(self._signature_columns))
+        
+        self._compiled: List[_CompiledSignature] = [
+            self._compile(signature) for signature in self.signatures
+        ]
+        # id -> (signature, compiled); the signature is held so its id stays unique
+        self._compiled_by_id = {
+            id(signature): (signature, compiled)
+            for signature, compiled in zip(self.signatures, self._compiled)
+        }
+        
+        # All signatures back to back for _sweep_all
+        compiled = self._compiled
+        offsets, columns = _pack([c.columns for c in compiled], np.intp)
+        required_offsets, required_columns = _pack([c.required_columns for c in compiled], np.intp)
+        self._sweep_arrays = (
+            offsets,
+            columns,
+            _pack([c.mins for c in compiled], np.float64)[1],
+            _pack([c.maxs for c in compiled], np.float64)[1],
+            _pack([c.has_min for c in compiled], bool)[1],
+            _pack([c.has_max for c in compiled], bool)[1],
+            required_offsets,
+            required_columns,
+        )
+    
+    def _compile(self, signature: PatternSignature) -> _CompiledSignature:
+        """Pack a signature's thresholds into arrays."""
+        thresholds = signature.feature_thresholds
+        bounds = list(thresholds.values())
+        columns = self._signature_columns
+        return _CompiledSignature(
+            feature_names=tuple(thresholds),
+            mins=np.array([-np.inf if lo is None else lo for lo, _ in bounds], dtype=np.float64),
+            maxs=np.array([np.inf if hi is None else hi for _, hi in bounds], dtype=np.float64),
+            has_min=np.array([lo is not None for lo, _ in bounds], dtype=bool),
+            has_max=np.array([hi is not None for _, hi in bounds], dtype=bool),
+            required_features=tuple(signature.required_features),
+            columns=np.array([columns.get(n, -1) for n in thresholds], dtype=np.intp),
+            required_columns=np.array(
+                [columns.get(n, -1) for n in signature.required_features], dtype=np.intp
+            ),
+        )
+    
+    def _compiled_for(self, signature: PatternSignature) -> _CompiledSignature:
+        """Compiled form of a signature, compiling it if it is not registered."""
+        entry = self._compiled_by_id.get(id(signature))
+        if entry is not None and entry[0] is signature:
+            return entry[1]
+        return self._compile(signature)
+    
+    def _build_feature_matrix(
+        self,
+        feature_vectors: List[Any]  # List[FeatureVector]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Gather the signature features of all vectors into one matrix.
+        
+        Returns:
+            (X, present): float64 values with one row per vector and one
+            column per signature feature (NaN where missing), and a mask
+            of which features each vector actually has
+        """
+        columns = self._signature_columns
+        X = np.full((len(feature_vectors), len(columns)), np.nan)
+        present = np.zeros(X.shape, dtype=bool)
+        
+        # Vectors from one FeatureEngineer share a feature index, so the
+        # column mapping is worked out once per distinct index
+        plans: Dict[int, Tuple[Dict[str, int], np.ndarray, np.ndarray]] = {}
+        for row, vector in enumerate(feature_vectors):
+            index = getattr(vector, "feature_index", None)
+            if index is None:
+                features = vector.features
+                for name, col in columns.items():
+                    if name in features:
+                        X[row, col] = features[name]
+                        present[row, col] = True
+                continue
+            
+            plan = plans.get(id(index))
+            if plan is None:
+                dst = [col for name, col in columns.items() if name in index]
+                src = [index[name] for name in columns if name in index]
+                plan = plans[id(index)] = (
+                    index, np.array(dst, dtype=np.intp), np.array(src, dtype=np.intp)
+                )
+            _, dst, src = plan
+            X[row, dst] = vector.values[src]
+            present[row, dst] = True
+        
+        return X, present
     
     async def detect_patterns(
         self,
@@ -242,12 +511,26 @@ class RiskPatternDetector:
         """
         patterns = []
         
-        # Signature-based detection
-        for vector in feature_vectors:
-            for signature in self.signatures:
-                if self._matches_signature(vector, signature):
-                    pattern = self._create_pattern_from_signature(vector, signature)
-                    patterns.append(pattern)
+        if len(self._compiled) != len(self.signatures):
+            self._index_signatures()  # Signatures list was changed directly
+        
+        # Signature-based detection: all vectors against all signatures in
+        # one sweep; matching and confidence come out of the same pass
+        X, present = self._build_feature_matrix(feature_vectors)
+        matched = np.zeros((len(feature_vectors), len(self.signatures)), dtype=bool)
+        confidence = np.zeros(matched.shape)
+        if HAS_NUMBA:
+            _sweep_all(X, present, *self._sweep_arrays, matched, confidence)
+        else:
+            self._sweep_signatures(X, present, matched, confidence)
+        
+        # Row-major, so patterns are numbered per vector as before
+        for row, sig_idx in zip(*np.nonzero(matched)):
+            pattern = self._create_pattern_from_signature(
+                feature_vectors[row], self.signatures[sig_idx],
+                confidence=float(confidence[row, sig_idx]),
+            )
+            patterns.append(pattern)
         
         # ML-based detection (if model available)
         if use_ml and self.ml_model is not None:
@@ -259,6 +542,29 @@ class RiskPatternDetector:
         
         return patterns
     
+    def _sweep_signatures(
+        self,
+        X: np.ndarray,
+        present: np.ndarray,
+        matched: np.ndarray,
+        confidence: np.ndarray
+    ) -> None:
+        """
+        NumPy fallback for _sweep_all when numba is not installed.
+        
+        Vectorised over rows, one signature at a time; the uncompiled
+        kernel would loop over every row and feature in Python.
+        """
+        for s, compiled in enumerate(self._compiled):
+            rows = np.flatnonzero(present[:, compiled.required_columns].all(axis=1))
+            if not len(rows):
+                continue
+            block = np.ix_(rows, compiled.columns)
+            matched[rows, s], confidence[rows, s] = _score_rows(
+                X[block], present[block],
+                compiled.mins, compiled.maxs, compiled.has_min, compiled.has_max,
+            )
+    
     async def detect_for_node(
         self,
         feature_vector: Any  # FeatureVector
@@ -280,43 +586,49 @@ class RiskPatternDetector:
         signature: PatternSignature
     ) -> bool:
         """Check if a feature vector matches a signature."""
+        compiled = self._compiled_for(signature)
         features = vector.features
         
         # Check required features exist
-        for required in signature.required_features:
+        for required in compiled.required_features:
             if required not in features:
                 return False
         
-        # Check thresholds
-        for feature_name, (min_val, max_val) in signature.feature_thresholds.items():
-            if feature_name not in features:
-                continue
-            
-            value = features[feature_name]
-            
-            if min_val is not None and value < min_val:
-                return False
-            if max_val is not None and value > max_val:
-                return False
-        
-        return True
+        return self._check_and_score(features, compiled)[0]
+    
+    @staticmethod
+    def _check_and_score(
+        features: Any,
+        compiled: _CompiledSignature
+    ) -> Tuple[bool, float]:
+        """Bounds check and confidence for one vector's features (NaN where missing)."""
+        present = np.fromiter(
+            (name in features for name in compiled.feature_names),
+            dtype=bool,
+            count=len(compiled.feature_names),
+        )
+        values = np.fromiter(
+            (features[name] if name in features else np.nan for name in compiled.feature_names),
+            dtype=np.float64,
+            count=len(compiled.feature_names),
+        )
+        bounds = (compiled.mins, compiled.maxs, compiled.has_min, compiled.has_max)
+        if HAS_NUMBA:
+            matched, confidence = _check_and_score(values, present, *bounds)
+            return bool(matched), float(confidence)
+        matched, confidence = _score_rows(values[None], present[None], *bounds)
+        return bool(matched[0]), float(confidence[0])
     
     def _create_pattern_from_signature(
         self,
         vector: Any,  # FeatureVector
-        signature: PatternSignature
+        signature: PatternSignature,
+        confidence: Optional[float] = None
     ) -> RiskPattern:
         """Create a RiskPattern from matched signature."""
         self._pattern_counter += 1
         
-        # Calculate confidence based on how strongly features match
-        confidence = self._calculate_signature_confidence(vector, signature)
-        
-        # Extract matched features
-        features_matched = {}
-        for feature_name in signature.feature_thresholds:
-            if feature_name in vector.features:
-                features_matched[feature_name] = vector.features[feature_name]
+        confidence, features_matched = self._score_and_extract(vector, signature, confidence)
         
         return RiskPattern(
             pattern_id=f"pat-{self._pattern_counter:06d}",
@@ -330,96 +642,134 @@ class RiskPatternDetector:
             recommended_actions=signature.recommended_actions,
         )
     
-    def _calculate_signature_confidence(
+    def _score_and_extract(
         self,
         vector: Any,  # FeatureVector
-        signature: PatternSignature
-    ) -> float:
-        """Calculate confidence score for signature match."""
-        scores = []
+        signature: PatternSignature,
+        confidence: Optional[float] = None
+    ) -> Tuple[float, Dict[str, float]]:
+        """
+        Confidence score for a signature match and the features it matched on.
         
-        for feature_name, (min_val, max_val) in signature.feature_thresholds.items():
-            if feature_name not in vector.features:
-                continue
-            
-            value = vector.features[feature_name]
-            
-            # Calculate how far above threshold
-            if min_val is not None:
-                if value >= min_val:
-                    # Score based on how much above threshold
-                    excess = value - min_val
-                    scores.append(min(1.0, 0.5 + excess * 0.5))
-                else:
-                    scores.append(0.0)
-            
-            if max_val is not None:
-                if value <= max_val:
-                    excess = max_val - value
-                    scores.append(min(1.0, 0.5 + excess * 0.5))
-                else:
-                    scores.append(0.0)
-        
-        return float(np.mean(scores)) if scores else 0.5
+        Each signature feature is looked up once; the confidence is scored
+        from those values unless it is already known (e.g. from the bulk
+        matcher in detect_patterns).
+        """
+        compiled = self._compiled_for(signature)
+        features = vector.features
+        
+        features_matched = {}
+        for feature_name in compiled.feature_names:
+            if feature_name in features:
+                features_matched[feature_name] = features[feature_name]
+        
+        if confidence is None:
+            confidence = self._check_and_score(features_matched, compiled)[1]
+        
+        return confidence, features_matched
     
     async def _detect_with_ml(
         self,
         feature_vectors: List[Any]
     ) -> List[RiskPattern]:
         """Detect patterns using ML model."""
-        if not self.ml_model:
+        if not self.ml_model or not len(feature_vectors):
             return []
         
-        # Prepare features for ML
-        X = np.array([v.to_numpy() for v in feature_vectors])
+        # Prepare features for ML: a batch from FeatureEngineer already has
+        # its matrix, otherwise fill one preallocated matrix row by row
+        X = getattr(feature_vectors, "matrix", None)
+        if X is None:
+            first = feature_vectors[0].to_numpy()
+            X = np.empty((len(feature_vectors), first.shape[0]), dtype=first.dtype)
+            for i, vector in enumerate(feature_vectors):
+                X[i] = vector.to_numpy()
         
         # Get predictions
         predictions = self.ml_model.predict(X)
-        probabilities = self.ml_model.predict_proba(X)
+        probabilities = np.asarray(self.ml_model.predict_proba(X))
+        
+        # Confidence and severity for every row at once
+        confidences = probabilities.max(axis=1)
+        severities = self._infer_severity_batch(confidences).tolist()
+        confidences = confidences.tolist()
+        
+        pattern_types = self._pattern_types_for(predictions)
         
         patterns = []
-        for i, (vector, pred, prob) in enumerate(zip(feature_vectors, predictions, probabilities)):
-            if pred != 0:  # 0 = no pattern
-                pattern_type = PatternType(pred) if isinstance(pred, str) else PatternType.ATTACK_CHAIN
-                confidence = float(max(prob))
+        for i, (vector, pattern_type) in enumerate(zip(feature_vectors, pattern_types)):
+            if pattern_type is not None:
+                confidence = confidences[i]
                 
                 self._pattern_counter += 1
                 patterns.append(RiskPattern(
                     pattern_id=f"pat-ml-{self._pattern_counter:06d}",
                     pattern_type=pattern_type,
-                    severity=self._infer_severity(confidence),
+                    severity=severities[i],
                     confidence=confidence,
                     affected_nodes=[vector.node_id],
                     description=f"ML-detected {pattern_type.value} pattern",
                     timestamp=vector.timestamp,
-                    features_matched=vector.features,
+                    features_matched=dict(vector.features),
                     recommended_actions=["Review ML detection", "Validate findings"],
                 ))
         
         return patterns
     
+    @staticmethod
+    def _pattern_types_for(predictions: Any) -> List[Optional[PatternType]]:
+        """
+        Pattern type per model prediction, None where it is 0 (no pattern).
+        
+        String predictions name the pattern type; any other non-zero
+        prediction is an attack chain. Homogeneous arrays are resolved
+        once by dtype; only object arrays and lists are checked per row.
+        """
+        if isinstance(predictions, np.ndarray) and predictions.ndim == 1:
+            kind = predictions.dtype.kind
+            if kind == "U":
+                names, inverse = np.unique(predictions, return_inverse=True)
+                table = np.empty(len(names), dtype=object)
+                table[:] = [PatternType(name) for name in names.tolist()]
+                return table[inverse].tolist()
+            if kind in "biufc":
+                table = np.array([None, PatternType.ATTACK_CHAIN], dtype=object)
+                return table[(predictions != 0).view(np.int8)].tolist()
+        
+        return [
+            (PatternType(pred) if isinstance(pred, str) else PatternType.ATTACK_CHAIN)
+            if pred != 0 else None  # 0 = no pattern
+            for pred in predictions
+        ]
+    
     def _infer_severity(self, confidence: float) -> PatternSeverity:
         """Infer severity from confidence score."""
-        if confidence >= 0.9:
-            return PatternSeverity.CRITICAL
-        elif confidence >= 0.7:
-            return PatternSeverity.HIGH
-        elif confidence >= 0.5:
-            return PatternSeverity.MEDIUM
-        else:
+        if confidence != confidence:  # NaN
             return PatternSeverity.LOW
+        return _SEVERITY_LEVELS[bisect.bisect_right(_SEVERITY_THRESHOLDS, confidence)]
+    
+    @staticmethod
+    def _infer_severity_batch(confidences: np.ndarray) -> np.ndarray:
+        """Infer severities for an array of confidence scores at once."""
+        confidences = np.asarray(confidences, dtype=np.float64)
+        levels = np.searchsorted(_SEVERITY_THRESHOLDS, confidences, side="right")
+        levels[np.isnan(confidences)] = 0
+        return _SEVERITY_ARRAY[levels]
     
     def _deduplicate_patterns(
         self,
         patterns: List[RiskPattern]
     ) -> List[RiskPattern]:
         """Remove duplicate patterns, keeping highest confidence."""
+        if len(patterns) < 2:
+            return list(patterns)
+        
         unique = {}
         
         for pattern in patterns:
-            key = (pattern.pattern_type, tuple(sorted(pattern.affected_nodes)))
-            
-            if key not in unique or pattern.confidence > unique[key].confidence:
+            key = pattern._dedup_key
+            kept = unique.get(key)
+            if kept is None or pattern.confidence > kept.confidence:
                 unique[key] = pattern
         
         return list(unique.values())
@@ -427,6 +777,7 @@ class RiskPatternDetector:
     def add_signature(self, signature: PatternSignature) -> None:
         """Add a new pattern signature."""
         self.signatures.append(signature)
+        self._index_signatures()
     
     def get_signatures_by_type(
         self,
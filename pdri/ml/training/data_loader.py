@@ -15,11 +15,112 @@ Version: 1.0.0
 """
 
 from dataclasses import dataclass
-from datetime import datetime, timedelta
-from typing import Any, Dict, Iterator, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone, tzinfo
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+import asyncio
+import logging
 import numpy as np
 import random
 
+logger = logging.getLogger(__name__)
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_EPOCH_NAIVE = datetime(1970, 1, 1)
+_US = timedelta(microseconds=1)
+
+
+def _to_datetime64(timestamps: Iterable[datetime]) -> np.ndarray:
+    """UTC datetime64[us] array from datetimes; naive datetimes are taken as UTC."""
+    return np.fromiter(
+        (
+            ((ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)) - _EPOCH) // _US
+            for ts in timestamps
+        ),
+        dtype=np.int64,
+    ).view("datetime64[us]")
+
+
+def _from_datetime64(values: np.ndarray, tz: Optional[tzinfo] = timezone.utc) -> List[datetime]:
+    """Datetimes from a UTC datetime64[us] array, in zone tz (naive if tz is None)."""
+    micros = values.astype(np.int64).tolist()
+    if tz is None:
+        return [_EPOCH_NAIVE + timedelta(microseconds=us) for us in micros]
+    timestamps = [_EPOCH + timedelta(microseconds=us) for us in micros]
+    if tz is not timezone.utc:
+        timestamps = [ts.astimezone(tz) for ts in timestamps]
+    return timestamps
+
+
+def _common_tzinfo(timestamps: Sequence[datetime]) -> Optional[tzinfo]:
+    """The tzinfo all timestamps share (None if all are naive); UTC if they differ."""
+    zones = {ts.tzinfo for ts in timestamps}
+    return zones.pop() if len(zones) == 1 else timezone.utc
+
+
+def _label_codes(labels: np.ndarray) -> np.ndarray:
+    """Integer code per label, equal labels getting equal codes."""
+    if labels.dtype != object:
+        # axis=0 compares whole rows for one-hot / multi-column labels
+        axis = 0 if labels.ndim > 1 else None
+        return np.unique(labels, axis=axis, return_inverse=True)[1].reshape(-1)
+    # Objects (None, mixed types) may not be orderable, so hash them instead
+    codes: Dict[Any, int] = {}
+    return np.fromiter(
+        (codes.setdefault(label, len(codes)) for label in labels.tolist()),
+        dtype=np.intp,
+        count=len(labels),
+    )
+
+
+def _group_by_label(labels: np.ndarray, rows: np.ndarray) -> List[np.ndarray]:
+    """
+    Split rows into one index array per label.
+    
+    A stable sort on label codes puts each label's rows next to each
+    other; groups are cut where the code changes.
+    """
+    codes = _label_codes(labels)[rows]
+    by_code = np.argsort(codes, kind="stable")
+    boundaries = np.flatnonzero(np.diff(codes[by_code])) + 1
+    return np.split(rows[by_code], boundaries)
+
+
+def _earliest_masks(timestamps: np.ndarray, counts: Sequence[int]) -> List[np.ndarray]:
+    """
+    One mask per count k selecting the k earliest rows.
+    
+    Rows tied on the cut-off timestamp are taken in row order, so each
+    mask holds the same rows as the first k of a stable sort. A single
+    np.partition finds every cut-off without sorting the whole array.
+    """
+    n = len(timestamps)
+    counts = [min(max(k, 0), n) for k in counts]
+    kth = sorted({k - 1 for k in counts if k > 0})
+    cutoffs = np.partition(timestamps, kth) if kth else timestamps
+    
+    masks = []
+    for k in counts:
+        if k == n:
+            masks.append(np.ones(n, dtype=bool))
+            continue
+        if k == 0:
+            masks.append(np.zeros(n, dtype=bool))
+            continue
+        cutoff = cutoffs[k - 1]
+        mask = timestamps < cutoff
+        ties = np.flatnonzero(timestamps == cutoff)
+        mask[ties[:k - np.count_nonzero(mask)]] = True
+        masks.append(mask)
+    return masks
+
+
+def _label_array(labels: List[Any]) -> np.ndarray:
+    """Labels as an array; mixed types (e.g. str and int) stay objects instead of being coerced."""
+    mixed = len({type(label) for label in labels}) > 1
+    return np.array(labels, dtype=object if mixed else None)
+
 
 @dataclass
 class TrainingExample:
@@ -43,6 +144,86 @@ class TrainingBatch:
         return len(self.node_ids)
 
 
+@dataclass
+class TrainingDataset:
+    """
+    Training examples as parallel arrays, one row per example.
+    
+    Features live in one (num_examples, num_features) matrix, so splits
+    and batches are index arrays into it rather than copies of example
+    objects. Timestamps are stored as UTC datetime64[us]; tz is the zone
+    they are converted back to (None for naive datetimes, which are taken
+    as UTC).
+    """
+    features: np.ndarray  # Shape: (num_examples, num_features)
+    labels: np.ndarray  # Shape: (num_examples,)
+    node_ids: List[str]
+    timestamps: np.ndarray  # Shape: (num_examples,), datetime64[us]
+    metadata: List[Dict[str, Any]]
+    tz: Optional[tzinfo] = timezone.utc
+    
+    def __len__(self) -> int:
+        return len(self.node_ids)
+    
+    @classmethod
+    def from_examples(cls, examples: Sequence[TrainingExample]) -> "TrainingDataset":
+        """Build a dataset from a list of TrainingExample."""
+        return cls(
+            features=np.stack([ex.features for ex in examples]) if examples else np.empty((0, 0)),
+            labels=_label_array([ex.label for ex in examples]),
+            node_ids=[ex.node_id for ex in examples],
+            timestamps=_to_datetime64(ex.timestamp for ex in examples),
+            metadata=[ex.metadata for ex in examples],
+            tz=_common_tzinfo([ex.timestamp for ex in examples]),
+        )
+    
+    def subset(self, indices: np.ndarray) -> "TrainingDataset":
+        """The examples at the given row indices, as a new dataset."""
+        return TrainingDataset(
+            features=self.features[indices],
+            labels=self.labels[indices],
+            node_ids=[self.node_ids[i] for i in indices.tolist()],
+            timestamps=self.timestamps[indices],
+            metadata=[self.metadata[i] for i in indices.tolist()],
+            tz=self.tz,
+        )
+    
+    def to_examples(self, indices: Optional[np.ndarray] = None) -> List[TrainingExample]:
+        """Convert rows (all, or the given indices) to TrainingExample objects."""
+        rows = range(len(self)) if indices is None else indices.tolist()
+        timestamps = _from_datetime64(
+            self.timestamps if indices is None else self.timestamps[indices], self.tz
+        )
+        labels = self.labels.tolist()
+        return [
+            TrainingExample(
+                features=self.features[i],
+                label=labels[i],
+                node_id=self.node_ids[i],
+                timestamp=timestamp,
+                metadata=self.metadata[i],
+            )
+            for i, timestamp in zip(rows, timestamps)
+        ]
+
+
+@dataclass
+class DatasetSplit:
+    """Train/validation/test split of a TrainingDataset, as row indices."""
+    dataset: TrainingDataset
+    train: np.ndarray
+    validation: np.ndarray
+    test: np.ndarray
+    
+    @property
+    def sizes(self) -> Dict[str, int]:
+        return {
+            "train": len(self.train),
+            "validation": len(self.validation),
+            "test": len(self.test),
+        }
+
+
 @dataclass
 class DataSplit:
     """Train/validation/test split."""
@@ -83,7 +264,8 @@ class TrainingDataLoader:
         self,
         graph_engine: Any,
         feature_engineer: Any,
-        label_source: Optional[Any] = None
+        label_source: Optional[Any] = None,
+        max_concurrency: int = 64
     ):
         """
         Initialize data loader.
@@ -92,10 +274,12 @@ class TrainingDataLoader:
             graph_engine: Neo4j graph engine
             feature_engineer: Feature extraction engine
             label_source: Optional source for ground truth labels
+            max_concurrency: Cap on feature extractions in flight at once
         """
         self.graph_engine = graph_engine
         self.feature_engineer = feature_engineer
         self.label_source = label_source
+        self.max_concurrency = max_concurrency
     
     async def load_training_data(
         self,
@@ -107,6 +291,9 @@ class TrainingDataLoader:
         """
         Load training data from graph database.
         
+        List-of-examples form of load_dataset(); timestamps come back as
+        UTC datetimes.
+        
         Args:
             start_date: Start of training period
             end_date: End of training period
@@ -116,8 +303,28 @@ class TrainingDataLoader:
         Returns:
             List of training examples
         """
-        examples = []
+        dataset = await self.load_dataset(start_date, end_date, node_types, include_labels)
+        return dataset.to_examples()
+    
+    async def load_dataset(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        node_types: Optional[List[str]] = None,
+        include_labels: bool = True
+    ) -> TrainingDataset:
+        """
+        Load training data from graph database as a TrainingDataset.
+        
+        Args:
+            start_date: Start of training period
+            end_date: End of training period
+            node_types: Optional filter by node types
+            include_labels: Whether to include labels (for supervised learning)
         
+        Returns:
+            TrainingDataset with one row per (node, sample time)
+        """
         # Get all nodes from graph
         nodes = await self._get_nodes(node_types)
         
@@ -125,41 +332,83 @@ class TrainingDataLoader:
         # (for time-series based training)
         sample_times = self._generate_sample_times(start_date, end_date)
         
-        for node in nodes:
-            node_id = node.get("id", node.get("node_id"))
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def load_one(node_id: str, timestamp: datetime) -> Tuple[Any, Any]:
+            async with semaphore:
+                # Extract features
+                feature_vector = await self.feature_engineer.extract_features(
+                    node_id, timestamp
+                )
+                
+                # Get label if available
+                label = None
+                if include_labels and self.label_source:
+                    label = await self._get_label(node_id, timestamp)
             
-            for timestamp in sample_times:
-                try:
-                    # Extract features
-                    feature_vector = await self.feature_engineer.extract_features(
-                        node_id, timestamp
-                    )
-                    
-                    # Get label if available
-                    label = None
-                    if include_labels and self.label_source:
-                        label = await self._get_label(node_id, timestamp)
-                    
-                    if label is None and include_labels:
-                        # Generate synthetic label based on risk score
-                        # In production, labels come from incident database
-                        label = self._generate_synthetic_label(feature_vector)
-                    
-                    examples.append(TrainingExample(
-                        features=feature_vector.to_numpy(),
-                        label=label,
-                        node_id=node_id,
-                        timestamp=timestamp,
-                        metadata={
-                            "node_type": node.get("node_type", "unknown"),
-                            "feature_names": feature_vector.feature_names,
-                        },
-                    ))
-                except Exception as e:
-                    # Log and continue
-                    print(f"Error loading data for {node_id} at {timestamp}: {e}")
-        
-        return examples
+            if label is None and include_labels:
+                # Generate synthetic label based on risk score
+                # In production, labels come from incident database
+                label = self._generate_synthetic_label(feature_vector)
+            
+            return feature_vector, label
+        
+        samples = [
+            (node, node.get("id", node.get("node_id")), timestamp)
+            for node in nodes
+            for timestamp in sample_times
+        ]
+        results = await asyncio.gather(
+            *(load_one(node_id, timestamp) for _, node_id, timestamp in samples),
+            return_exceptions=True,
+        )
+        
+        # At most one row per (node, sample time): the feature matrix is
+        # allocated once at that size and trimmed to the rows that loaded
+        capacity = len(samples)
+        features: Optional[np.ndarray] = None
+        labels: List[Any] = []
+        node_ids: List[str] = []
+        timestamps: List[datetime] = []
+        metadata: List[Dict[str, Any]] = []
+        
+        for (node, node_id, timestamp), result in zip(samples, results):
+            try:
+                if isinstance(result, BaseException):
+                    raise result
+                feature_vector, label = result
+                
+                values = feature_vector.to_numpy()
+                if features is None:
+                    features = np.empty((capacity,) + values.shape, dtype=values.dtype)
+                features[len(node_ids)] = values
+                
+                labels.append(label)
+                node_ids.append(node_id)
+                timestamps.append(timestamp)
+                metadata.append({
+                    "node_type": node.get("node_type", "unknown"),
+                    "feature_names": feature_vector.feature_names,
+                })
+            except Exception as e:
+                # Log and continue
+                logger.warning(
+                    "Error loading data for %s at %s: %s", node_id, timestamp, e
+                )
+        
+        if features is None:
+            features = np.empty((0, 0))
+        elif len(node_ids) < capacity:
+            features = features[:len(node_ids)].copy()
+        
+        return TrainingDataset(
+            features=features,
+            labels=_label_array(labels),
+            node_ids=node_ids,
+            timestamps=_to_datetime64(timestamps),
+            metadata=metadata,
+            tz=_common_tzinfo(timestamps),
+        )
     
     async def _get_nodes(
         self,
@@ -183,12 +432,28 @@ class TrainingDataLoader:
         interval_hours: int = 24
     ) -> List[datetime]:
         """Generate sample timestamps."""
+        return list(self._compute_sample_times(start, end, interval_hours, start.tzinfo))
+    
+    @staticmethod
+    @lru_cache(maxsize=32)
+    def _compute_sample_times(
+        start: datetime,
+        end: datetime,
+        interval_hours: int,
+        tzinfo: Any
+    ) -> Tuple[datetime, ...]:
+        """
+        Sample timestamps from start to end, memoized across calls.
+        
+        Equal instants in different zones hash alike, so start's tzinfo is
+        part of the key to keep the cached datetimes in the caller's zone.
+        """
         times = []
         current = start
         while current <= end:
             times.append(current)
             current += timedelta(hours=interval_hours)
-        return times
+        return tuple(times)
     
     async def _get_label(
         self,
@@ -208,7 +473,7 @@ class TrainingDataLoader:
     
     def split_data(
         self,
-        examples: List[TrainingExample],
+        examples: Union[List[TrainingExample], TrainingDataset],
         train_ratio: float = 0.7,
         val_ratio: float = 0.15,
         test_ratio: float = 0.15,
@@ -216,12 +481,12 @@ class TrainingDataLoader:
         time_based: bool = False,
         shuffle: bool = True,
         seed: int = 42
-    ) -> DataSplit:
+    ) -> Union[DataSplit, DatasetSplit]:
         """
         Split data into train/validation/test sets.
         
         Args:
-            examples: All training examples
+            examples: All training examples, as a list or a TrainingDataset
             train_ratio: Proportion for training
             val_ratio: Proportion for validation
             test_ratio: Proportion for testing
@@ -231,202 +496,336 @@ class TrainingDataLoader:
             seed: Random seed for reproducibility
         
         Returns:
-            DataSplit with train/val/test sets
+            DataSplit with train/val/test lists for a list of examples, or
+            DatasetSplit with train/val/test row indices for a dataset
         """
         assert abs(train_ratio + val_ratio + test_ratio - 1.0) < 0.001
         
+        if isinstance(examples, TrainingDataset):
+            labels = examples.labels
+            timestamps = examples.timestamps if time_based else None
+        else:
+            labels = _label_array([ex.label for ex in examples])
+            timestamps = _to_datetime64(ex.timestamp for ex in examples) if time_based else None
+        
+        train, val, test = self._split_indices(
+            labels, timestamps, train_ratio, val_ratio, stratify, time_based, shuffle, seed
+        )
+        
+        if isinstance(examples, TrainingDataset):
+            return DatasetSplit(dataset=examples, train=train, validation=val, test=test)
+        return DataSplit(
+            train=[examples[i] for i in train.tolist()],
+            validation=[examples[i] for i in val.tolist()],
+            test=[examples[i] for i in test.tolist()],
+        )
+    
+    def _split_indices(
+        self,
+        labels: np.ndarray,
+        timestamps: Optional[np.ndarray],
+        train_ratio: float,
+        val_ratio: float,
+        stratify: bool,
+        time_based: bool,
+        shuffle: bool,
+        seed: int
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Row indices of the train/validation/test sets."""
         if time_based:
-            return self._time_based_split(examples, train_ratio, val_ratio)
+            return self._time_based_split(timestamps, train_ratio, val_ratio)
         
-        if shuffle:
-            random.seed(seed)
-            examples = examples.copy()
-            random.shuffle(examples)
+        rng = np.random.default_rng(seed)
+        n = len(labels)
+        order = rng.permutation(n) if shuffle else np.arange(n)
         
         if stratify:
-            return self._stratified_split(examples, train_ratio, val_ratio, test_ratio, seed)
+            return self._stratified_split(order, labels, train_ratio, val_ratio, rng)
         
         # Simple random split
-        n = len(examples)
         train_end = int(n * train_ratio)
         val_end = train_end + int(n * val_ratio)
         
-        return DataSplit(
-            train=examples[:train_end],
-            validation=examples[train_end:val_end],
-            test=examples[val_end:],
-        )
+        return order[:train_end], order[train_end:val_end], order[val_end:]
     
     def _time_based_split(
         self,
-        examples: List[TrainingExample],
+        timestamps: np.ndarray,
         train_ratio: float,
         val_ratio: float
-    ) -> DataSplit:
-        """Split by timestamp (temporal split)."""
-        # Sort by timestamp
-        sorted_examples = sorted(examples, key=lambda x: x.timestamp)
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Split by timestamp (temporal split).
         
-        n = len(sorted_examples)
+        Train gets the earliest rows, test the latest. Only the split
+        points are located, so rows within each set keep dataset order
+        rather than being sorted by time.
+        """
+        n = len(timestamps)
         train_end = int(n * train_ratio)
         val_end = train_end + int(n * val_ratio)
         
-        return DataSplit(
-            train=sorted_examples[:train_end],
-            validation=sorted_examples[train_end:val_end],
-            test=sorted_examples[val_end:],
+        in_train, in_head = _earliest_masks(timestamps, (train_end, val_end))
+        
+        return (
+            np.flatnonzero(in_train),
+            np.flatnonzero(in_head & ~in_train),
+            np.flatnonzero(~in_head),
         )
     
     def _stratified_split(
         self,
-        examples: List[TrainingExample],
+        order: np.ndarray,
+        labels: np.ndarray,
         train_ratio: float,
         val_ratio: float,
-        test_ratio: float,
-        seed: int
-    ) -> DataSplit:
+        rng: np.random.Generator
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """Split with stratification by label."""
-        random.seed(seed)
-        
-        # Group by label
-        by_label: Dict[Any, List[TrainingExample]] = {}
-        for ex in examples:
-            label = ex.label
-            if label not in by_label:
-                by_label[label] = []
-            by_label[label].append(ex)
-        
         train, val, test = [], [], []
         
-        for label_examples in by_label.values():
-            random.shuffle(label_examples)
-            n = len(label_examples)
+        for label_indices in _group_by_label(labels, order):
+            rng.shuffle(label_indices)
+            n = len(label_indices)
             train_end = int(n * train_ratio)
             val_end = train_end + int(n * val_ratio)
             
-            train.extend(label_examples[:train_end])
-            val.extend(label_examples[train_end:val_end])
-            test.extend(label_examples[val_end:])
+            train.append(label_indices[:train_end])
+            val.append(label_indices[train_end:val_end])
+            test.append(label_indices[val_end:])
         
         # Shuffle each set
-        random.shuffle(train)
-        random.shuffle(val)
-        random.shuffle(test)
-        
-        return DataSplit(train=train, validation=val, test=test)
+        return tuple(
+            rng.permutation(np.concatenate(parts)) if parts else np.empty(0, dtype=np.intp)
+            for parts in (train, val, test)
+        )
     
     def batch_iterator(
         self,
-        examples: List[TrainingExample],
+        examples: Union[List[TrainingExample], TrainingDataset],
         batch_size: int = 32,
         shuffle: bool = True,
-        drop_last: bool = False
+        drop_last: bool = False,
+        reuse_buffers: bool = False,
+        indices: Optional[np.ndarray] = None
     ) -> Iterator[TrainingBatch]:
         """
         Iterate over examples in batches.
         
         Args:
-            examples: List of training examples
+            examples: List of training examples, or a TrainingDataset
             batch_size: Number of examples per batch
             shuffle: Whether to shuffle before iterating
             drop_last: Whether to drop the last incomplete batch
+            reuse_buffers: Fill one preallocated features/labels buffer for
+                every batch instead of allocating new arrays. Each batch's
+                arrays are then views that the next batch overwrites, so
+                only use this when every batch is consumed (e.g. one
+                training step) before the next is requested. For a list
+                of examples only the features buffer is reused.
+            indices: For a dataset, the rows to iterate over (e.g. the
+                train indices of a DatasetSplit); all rows by default
         
         Yields:
             TrainingBatch objects
         """
+        if isinstance(examples, TrainingDataset):
+            yield from self._dataset_batches(
+                examples, batch_size, shuffle, drop_last, reuse_buffers, indices
+            )
+            return
+        
         if shuffle:
             examples = examples.copy()
             random.shuffle(examples)
         
         n = len(examples)
+        if n == 0:
+            return
+        
+        if reuse_buffers:
+            feature_buffer = np.empty(
+                (min(batch_size, n),) + examples[0].features.shape,
+                dtype=np.result_type(*{ex.features.dtype for ex in examples}),
+            )
         
         for i in range(0, n, batch_size):
             batch_examples = examples[i:i + batch_size]
+            size = len(batch_examples)
             
-            if drop_last and len(batch_examples) < batch_size:
+            if drop_last and size < batch_size:
                 break
             
+            if reuse_buffers:
+                features = feature_buffer[:size]
+                for j, ex in enumerate(batch_examples):
+                    features[j] = ex.features
+            else:
+                features = np.stack([ex.features for ex in batch_examples])
+            
+            # Converted per batch, so a batch's dtype depends only on its
+            # own labels (one str label elsewhere must not turn ints into
+            # strings here)
+            labels = np.array([ex.label for ex in batch_examples])
+            
             yield TrainingBatch(
-                features=np.stack([ex.features for ex in batch_examples]),
-                labels=np.array([ex.label for ex in batch_examples]),
+                features=features,
+                labels=labels,
                 node_ids=[ex.node_id for ex in batch_examples],
                 timestamps=[ex.timestamp for ex in batch_examples],
             )
     
+    def _dataset_batches(
+        self,
+        dataset: TrainingDataset,
+        batch_size: int,
+        shuffle: bool,
+        drop_last: bool,
+        reuse_buffers: bool,
+        indices: Optional[np.ndarray]
+    ) -> Iterator[TrainingBatch]:
+        """Batches of a TrainingDataset, sliced or gathered from its arrays."""
+        rows = np.arange(len(dataset)) if indices is None else np.asarray(indices, dtype=np.intp)
+        if len(rows) and (rows.min() < 0 or rows.max() >= len(dataset)):
+            raise IndexError("Batch indices out of range for the dataset")
+        if shuffle:
+            rows = np.random.permutation(rows)
+        # In-order iteration over the whole dataset needs no gathering at all
+        contiguous = indices is None and not shuffle
+        
+        n = len(rows)
+        if reuse_buffers and not contiguous and n:
+            feature_buffer = np.empty(
+                (min(batch_size, n),) + dataset.features.shape[1:], dtype=dataset.features.dtype
+            )
+            label_buffer = np.empty(
+                (min(batch_size, n),) + dataset.labels.shape[1:], dtype=dataset.labels.dtype
+            )
+        
+        for start in range(0, n, batch_size):
+            size = min(batch_size, n - start)
+            if drop_last and size < batch_size:
+                break
+            
+            if contiguous:
+                batch = slice(start, start + size)
+                node_ids = dataset.node_ids[batch]
+            else:
+                batch = rows[start:start + size]
+                node_ids = [dataset.node_ids[i] for i in batch.tolist()]
+            
+            if reuse_buffers and not contiguous:
+                # Indices were checked above, so "clip" never clips; it
+                # lets take() write straight into the buffer
+                features = np.take(dataset.features, batch, axis=0, out=feature_buffer[:size], mode="clip")
+                labels = np.take(dataset.labels, batch, axis=0, out=label_buffer[:size], mode="clip")
+            else:
+                features = dataset.features[batch]
+                labels = dataset.labels[batch]
+            
+            yield TrainingBatch(
+                features=features,
+                labels=labels,
+                node_ids=node_ids,
+                timestamps=_from_datetime64(dataset.timestamps[batch], dataset.tz),
+            )
+    
     def augment_data(
         self,
         examples: List[TrainingExample],
         noise_std: float = 0.01,
-        num_augmented: int = 1
+        num_augmented: int = 1,
+        seed: Optional[int] = None
     ) -> List[TrainingExample]:
         """
         Augment training data with noise.
         
+        Noise for all copies of all examples is drawn in one call, so the
+        examples must share one feature shape.
+        
         Args:
             examples: Original examples
             noise_std: Standard deviation of Gaussian noise
             num_augmented: Number of augmented copies per example
+            seed: Optional seed for the noise; without one, noise comes
+                from the global numpy random state (np.random.seed)
         
         Returns:
             Original + augmented examples
         """
         augmented = list(examples)
+        if not examples or num_augmented <= 0:
+            return augmented
         
-        for ex in examples:
-            for _ in range(num_augmented):
-                noise = np.random.normal(0, noise_std, ex.features.shape)
-                new_features = ex.features + noise
-                
+        base = np.stack([ex.features for ex in examples])
+        shape = (len(examples), num_augmented) + base.shape[1:]
+        if seed is None:
+            noise = np.random.normal(0, noise_std, shape)
+        else:
+            noise = np.random.default_rng(seed).normal(0, noise_std, shape)
+        noised = base[:, np.newaxis] + noise
+        
+        for ex, copies in zip(examples, noised):
+            # One metadata dict shared by all copies of an example
+            metadata = {**ex.metadata, "augmented": True}
+            for new_features in copies:
                 augmented.append(TrainingExample(
                     features=new_features,
                     label=ex.label,
                     node_id=ex.node_id,
                     timestamp=ex.timestamp,
-                    metadata={**ex.metadata, "augmented": True},
+                    metadata=metadata,
                 ))
         
         return augmented
     
     def balance_classes(
         self,
-        examples: List[TrainingExample],
-        strategy: str = "oversample"  # "oversample" or "undersample"
-    ) -> List[TrainingExample]:
+        examples: Union[List[TrainingExample], TrainingDataset],
+        strategy: str = "oversample",  # "oversample" or "undersample"
+        seed: Optional[int] = None
+    ) -> Union[List[TrainingExample], TrainingDataset]:
         """
         Balance class distribution.
         
         Args:
-            examples: Training examples
+            examples: Training examples, as a list or a TrainingDataset
             strategy: "oversample" minority or "undersample" majority
+            seed: Optional random seed for reproducibility
         
         Returns:
-            Balanced examples
+            Balanced examples, in the same form as given
         """
-        # Group by label
-        by_label: Dict[Any, List[TrainingExample]] = {}
-        for ex in examples:
-            if ex.label not in by_label:
-                by_label[ex.label] = []
-            by_label[ex.label].append(ex)
+        if isinstance(examples, TrainingDataset):
+            labels = examples.labels
+        else:
+            labels = _label_array([ex.label for ex in examples])
+        if not len(labels):
+            return examples if isinstance(examples, TrainingDataset) else []
+        
+        rng = np.random.default_rng(seed)
         
-        counts = {label: len(exs) for label, exs in by_label.items()}
+        # Group by label
+        groups = _group_by_label(labels, np.arange(len(labels)))
+        counts = [len(group) for group in groups]
         
         if strategy == "oversample":
-            target_count = max(counts.values())
+            target_count = max(counts)
         else:
-            target_count = min(counts.values())
+            target_count = min(counts)
         
         balanced = []
-        for label, label_examples in by_label.items():
-            if strategy == "oversample" and len(label_examples) < target_count:
+        for label_indices in groups:
+            if strategy == "oversample" and len(label_indices) < target_count:
                 # Repeat with replacement
-                balanced.extend(
-                    random.choices(label_examples, k=target_count)
-                )
-            elif strategy == "undersample" and len(label_examples) > target_count:
-                balanced.extend(random.sample(label_examples, target_count))
+                picks = rng.integers(0, len(label_indices), size=target_count)
+                balanced.append(label_indices[picks])
+            elif strategy == "undersample" and len(label_indices) > target_count:
+                balanced.append(rng.choice(label_indices, target_count, replace=False))
             else:
-                balanced.extend(label_examples)
+                balanced.append(label_indices)
         
-        random.shuffle(balanced)
-        return balanced
+        balanced = rng.permutation(np.concatenate(balanced))
+        if isinstance(examples, TrainingDataset):
+            return examples.subset(balanced)
+        return [examples[i] for i in balanced.tolist()]
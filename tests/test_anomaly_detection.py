@@ -0,0 +1,181 @@
+"""
+Tests for anomaly detection.
+
+Covers the compiled z-score/IQR scan and Isolation Forest traversal
+against their NumPy and scikit-learn counterparts and a per-value scalar
+reference, including missing features.
+
+Author: PDRI Team
+Version: 1.0.0
+"""
+
+import random
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict
+
+import numpy as np
+import pytest
+
+from pdri.ml.jit import HAS_NUMBA
+from pdri.ml.signatures import anomaly_detection
+from pdri.ml.signatures.anomaly_detection import AnomalyDetector, AnomalyType
+
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+MONITORED = AnomalyDetector.MONITORED_FEATURES
+
+requires_numba = pytest.mark.skipif(not HAS_NUMBA, reason="numba is not installed")
+
+
+@dataclass
+class Vector:
+    """Feature vector stand-in with a plain features dict."""
+    node_id: str
+    timestamp: Any
+    features: Dict[str, float]
+
+
+def make_vectors(count, seed, outliers=0.0, drop_every=0):
+    """Gaussian features, some rows pushed far out, some missing sensitivity_score."""
+    rng = random.Random(seed)
+    vectors = []
+    for i in range(count):
+        features = {name: rng.gauss(50, 10) for name in MONITORED}
+        if rng.random() < outliers:
+            features["current_risk_score"] = 300 + rng.random() * 50
+            features["access_frequency_24h"] = -200.0
+        if drop_every and i % drop_every == 0:
+            del features["sensitivity_score"]
+        vectors.append(Vector(f"node-{i}", T0, features))
+    return vectors
+
+
+def anomaly_keys(anomalies):
+    """Comparable view of detected anomalies."""
+    return [
+        (a.node_id, a.anomaly_type, a.score, round(a.raw_score, 6), tuple(a.features_flagged))
+        for a in anomalies
+    ]
+
+
+@pytest.fixture
+def history():
+    return make_vectors(400, seed=1, drop_every=9)
+
+
+@pytest.fixture
+def current():
+    return make_vectors(200, seed=2, outliers=0.1, drop_every=7)
+
+
+# =============================================================================
+# z-score / IQR scan
+# =============================================================================
+
+class TestScan:
+    """The compiled scan flags exactly what the NumPy path flags."""
+
+    @requires_numba
+    def test_kernel_matches_numpy(self, history, current):
+        detector = AnomalyDetector(use_isolation_forest=False).fit(history)
+        X = detector._feature_matrix(current)
+
+        z_flags, iqr_flags, z_rows, z_sums, iqr_rows = anomaly_detection._scan_flags(
+            X,
+            detector._means_arr,
+            detector._inv_stds_arr,
+            detector._iqr_lower_arr,
+            detector._iqr_upper_arr,
+            np.float32(detector.z_threshold),
+        )
+        np_z_flags, np_z_sums = detector._zscore_flags(X)
+        np_iqr_flags = detector._iqr_flags(X)
+
+        assert np.array_equal(z_flags, np_z_flags)
+        assert np.array_equal(iqr_flags, np_iqr_flags)
+        assert np.array_equal(z_rows, np_z_flags.sum(axis=1))
+        assert np.array_equal(iqr_rows, np_iqr_flags.sum(axis=1))
+        np.testing.assert_allclose(z_sums, np_z_sums, rtol=1e-6)
+
+    @pytest.mark.parametrize("path", ["numba", "numpy"])
+    def test_flags_match_scalar_reference(self, history, current, path, monkeypatch):
+        if path == "numba" and not HAS_NUMBA:
+            pytest.skip("numba is not installed")
+        monkeypatch.setattr(anomaly_detection, "HAS_NUMBA", path == "numba")
+        monkeypatch.setattr(AnomalyDetector, "JIT_SCAN_MIN_ROWS", 0)
+        detector = AnomalyDetector(use_isolation_forest=False).fit(history)
+        stats = detector.baseline_statistics
+
+        flagged = {
+            a.node_id: set(a.features_flagged)
+            for a in detector.detect(current)
+            if a.anomaly_type == AnomalyType.STATISTICAL_OUTLIER
+        }
+
+        for vector in current:
+            expected = {
+                name for name, value in vector.features.items()
+                if stats[name]["std"] > 0
+                and abs(value - stats[name]["mean"]) / stats[name]["std"] >= detector.z_threshold
+            }
+            assert flagged.get(vector.node_id, set()) == expected
+
+    @requires_numba
+    def test_detect_paths_agree(self, history, current, monkeypatch):
+        detector = AnomalyDetector(use_isolation_forest=False).fit(history)
+
+        monkeypatch.setattr(AnomalyDetector, "JIT_SCAN_MIN_ROWS", 0)
+        compiled = anomaly_keys(detector.detect(current))
+        monkeypatch.setattr(anomaly_detection, "HAS_NUMBA", False)
+        fallback = anomaly_keys(detector.detect(current))
+
+        assert compiled == fallback
+        assert compiled
+
+    @pytest.mark.parametrize("path", ["numba", "numpy"])
+    def test_missing_feature_never_flags(self, history, path, monkeypatch):
+        if path == "numba" and not HAS_NUMBA:
+            pytest.skip("numba is not installed")
+        monkeypatch.setattr(anomaly_detection, "HAS_NUMBA", path == "numba")
+        monkeypatch.setattr(AnomalyDetector, "JIT_SCAN_MIN_ROWS", 0)
+        detector = AnomalyDetector(use_isolation_forest=False).fit(history)
+        features = {name: 1e6 for name in MONITORED if name != "sensitivity_score"}
+
+        anomalies = detector.detect([Vector("node-x", T0, features)])
+
+        assert anomalies
+        for anomaly in anomalies:
+            assert "sensitivity_score" not in anomaly.features_flagged
+            assert len(anomaly.features_flagged) == len(MONITORED) - 1
+
+
+# =============================================================================
+# Isolation Forest
+# =============================================================================
+
+class TestIsolationForest:
+    """Cached path lengths reproduce IsolationForest.score_samples."""
+
+    @pytest.fixture
+    def detector(self, history):
+        pytest.importorskip("sklearn")
+        return AnomalyDetector().fit(history)
+
+    def test_cached_traversal_matches_sklearn(self, detector, current):
+        X = detector._isolation_forest_input(detector._feature_matrix(current))
+
+        expected = detector._isolation_forest.score_samples(X)
+
+        np.testing.assert_allclose(detector._isolation_forest_score_samples(X), expected, rtol=1e-12)
+
+    @requires_numba
+    def test_compiled_and_per_tree_paths_agree(self, detector, current, monkeypatch):
+        X = detector._isolation_forest_input(detector._feature_matrix(current))
+        assert detector._if_packed is not None
+
+        compiled = detector._isolation_forest_score_samples(X)
+        monkeypatch.setattr(AnomalyDetector, "JIT_FOREST_MAX_ROWS", -1)
+        per_tree = detector._isolation_forest_score_samples(X)
+
+        np.testing.assert_allclose(compiled, per_tree, rtol=1e-12)
@@ -0,0 +1,264 @@
+"""
+Tests for batch risk prediction.
+
+Covers RiskPredictor.predict_batch against per-node predict(), the
+one-by-one fallback, inference pool invalidation, and BatchScorer result
+order, columns and exports.
+
+Author: PDRI Team
+Version: 1.0.0
+"""
+
+import asyncio
+import csv
+import json
+
+import numpy as np
+import pytest
+
+from pdri.ml.inference.batch_scorer import BatchScorer
+from pdri.ml.inference.predictor import RiskPredictor
+from pdri.ml.signatures.feature_engineering import FeatureEngineer
+
+
+class ThresholdModel:
+    """Picklable classifier scoring on one column."""
+
+    def __init__(self, column, scale=100.0):
+        self.column = column
+        self.scale = scale
+
+    def predict_proba(self, X):
+        p = np.clip(np.asarray(X, dtype=np.float64)[:, self.column] / self.scale, 0.0, 1.0)
+        return np.column_stack([1.0 - p, p])
+
+    def predict(self, X):
+        return (self.predict_proba(X)[:, 1] >= 0.5).astype(np.int64)
+
+
+class Graph:
+    """Graph engine stub: risk score derived from the node ID, 'bad' fails."""
+
+    async def get_node(self, node_id):
+        if node_id == "bad":
+            raise RuntimeError("node not found")
+        return {
+            "risk_score": (int(node_id.split("-")[1]) * 13) % 100,
+            "exposure": 0.3,
+            "node_type": "ai_tool",
+        }
+
+
+class Version:
+    version_id = "clf-v1"
+
+    def __init__(self, feature_names):
+        self.feature_names = feature_names
+
+
+class Registry:
+    """Model registry stub with one production model."""
+
+    def __init__(self, model, feature_names):
+        self.model = model
+        self.feature_names = feature_names
+
+    def get_production_model(self, model_type):
+        return self.model
+
+    def list_models(self, model_type):
+        class Registered:
+            production_version = Version(self.feature_names)
+        return [Registered()]
+
+
+class OnlyPredict:
+    """Predictor exposing nothing but predict()."""
+
+    def __init__(self, predictor):
+        self.predictor = predictor
+
+    async def predict(self, node_id):
+        return await self.predictor.predict(node_id)
+
+
+class NoExecutor(OnlyPredict):
+    """Predictor with a predict_batch() that takes no executor."""
+
+    async def predict_batch(self, node_ids):
+        return await self.predictor.predict_batch(node_ids)
+
+
+NODE_IDS = [f"node-{i}" for i in range(23)]
+
+
+@pytest.fixture
+def engineer():
+    return FeatureEngineer(Graph(), vector_cache_size=0)
+
+
+@pytest.fixture
+def registry(engineer):
+    column = engineer.feature_names.index("current_risk_score")
+    return Registry(ThresholdModel(column), engineer.feature_names)
+
+
+@pytest.fixture
+def predictor(registry, engineer):
+    return RiskPredictor(registry, engineer)
+
+
+def comparable(prediction):
+    """Prediction fields that do not depend on when it was made."""
+    row = prediction.to_dict()
+    row.pop("timestamp")
+    return row
+
+
+# =============================================================================
+# RiskPredictor
+# =============================================================================
+
+class TestPredictBatch:
+    """Batch predictions equal one predict() call per node."""
+
+    def test_batch_matches_single(self, predictor):
+        ids = NODE_IDS[:6] + ["bad"]
+
+        batch = asyncio.run(predictor.predict_batch(ids))
+        singles = [asyncio.run(predictor.predict(node_id)) for node_id in ids[:6]]
+
+        assert [comparable(p) for p in batch] == [comparable(p) for p in singles]
+
+    def test_explanation_uses_exact_values(self, predictor):
+        (prediction,) = asyncio.run(predictor.predict_batch(["node-10"]))
+
+        # exposure 0.3 and risk score 30 from the graph stub
+        assert prediction.explanation["exposure_score"] == 0.3 - 0.5
+        assert prediction.explanation["current_risk_score"] == (30 - 50) / 50
+        assert prediction.features_used["exposure_score"] == 0.3
+
+    def test_falls_back_to_one_by_one(self, predictor, engineer):
+        asyncio.run(predictor.load_model())
+        poisoned = asyncio.run(engineer.extract_features("node-3")).values
+        score = predictor._score_fn
+
+        def flaky(model, X):
+            if len(X) > 1 or np.array_equal(X[0], poisoned):
+                raise ValueError("cannot score")
+            return score(model, X)
+
+        expected = asyncio.run(predictor.predict_batch(NODE_IDS[:5]))
+        predictor._score_fn = flaky
+        got = asyncio.run(predictor.predict_batch(NODE_IDS[:5]))
+
+        assert [p.node_id for p in got] == ["node-0", "node-1", "node-2", "node-4"]
+        assert [comparable(p) for p in got] == [
+            comparable(p) for p in expected if p.node_id != "node-3"
+        ]
+
+    def test_stale_pool_is_not_used(self, predictor, registry):
+        async def run():
+            pool = await predictor.create_inference_executor(1)
+            try:
+                before = await predictor.predict_batch(["node-7"], executor=pool)
+                registry.model = ThresholdModel(registry.model.column, scale=1000.0)
+                await predictor.load_model()
+                after = await predictor.predict_batch(["node-7"], executor=pool)
+                direct = await predictor.predict_batch(["node-7"])
+            finally:
+                pool.shutdown()
+            return before, after, direct
+
+        before, after, direct = asyncio.run(run())
+
+        assert after[0].risk_probability == direct[0].risk_probability
+        assert after[0].risk_probability != before[0].risk_probability
+
+
+# =============================================================================
+# BatchScorer
+# =============================================================================
+
+def score(scorer, node_ids):
+    """Submit a job and wait for its result."""
+    async def run():
+        job = await scorer.submit_job(node_ids)
+        return await scorer.wait_for_completion(job.job_id)
+    return asyncio.run(run())
+
+
+class TestBatchScorer:
+    """Results keep input order, live in columns and export unchanged."""
+
+    @pytest.fixture
+    def scorer(self, predictor):
+        scorer = BatchScorer(predictor, chunk_size=4, max_workers=2, retry_count=1)
+        yield scorer
+        scorer.close()
+
+    def test_results_keep_input_order(self, scorer, predictor):
+        ids = NODE_IDS[::-1] + ["bad"]
+
+        result = score(scorer, ids)
+
+        expected = asyncio.run(predictor.predict_batch(NODE_IDS[::-1]))
+        assert len(result) == len(NODE_IDS)
+        assert [comparable(p) for p in result.predictions] == [comparable(p) for p in expected]
+        assert result.columns["node_id"].tolist() == NODE_IDS[::-1]
+        assert all(column.dtype != object for column in result.columns.values())
+
+    def test_exports_match_predictions(self, scorer, tmp_path):
+        result = score(scorer, NODE_IDS)
+        rows = [p.to_dict() for p in result.predictions]
+        job_id = result.job_id
+
+        json_path = asyncio.run(scorer.export_results(job_id, "json", str(tmp_path / "r.json")))
+        ndjson_path = asyncio.run(scorer.export_results(job_id, "ndjson", str(tmp_path / "r.ndjson")))
+        csv_path = asyncio.run(scorer.export_results(job_id, "csv", str(tmp_path / "r.csv")))
+
+        with open(json_path) as f:
+            assert json.load(f)["predictions"] == rows
+        with open(ndjson_path) as f:
+            header, *lines = f.read().splitlines()
+        assert json.loads(header)["summary"] == result.summary
+        assert [json.loads(line) for line in lines] == rows
+        with open(csv_path, newline="") as f:
+            exported = list(csv.DictReader(f))
+        assert [row["node_id"] for row in exported] == NODE_IDS
+        assert [float(row["risk_probability"]) for row in exported] == [
+            row["risk_probability"] for row in rows
+        ]
+
+    def test_pool_is_rebuilt_after_model_reload(self, scorer, predictor, registry):
+        score(scorer, NODE_IDS[:2])
+        pool = scorer._executor
+
+        registry.model = ThresholdModel(registry.model.column, scale=1000.0)
+        asyncio.run(predictor.load_model())
+        result = score(scorer, NODE_IDS[:2])
+
+        assert scorer._executor is not pool
+        expected = asyncio.run(predictor.predict_batch(NODE_IDS[:2]))
+        assert [p.risk_probability for p in result.predictions] == [
+            p.risk_probability for p in expected
+        ]
+
+    def test_context_manager_closes_pool(self, predictor):
+        async def run():
+            async with BatchScorer(predictor, chunk_size=4) as scorer:
+                job = await scorer.submit_job(NODE_IDS[:3])
+                await scorer.wait_for_completion(job.job_id)
+                assert scorer._executor is not None
+            return scorer
+
+        assert asyncio.run(run())._executor is None
+
+    @pytest.mark.parametrize("wrapper", [OnlyPredict, NoExecutor])
+    def test_predictors_without_pool_support(self, predictor, wrapper):
+        scorer = BatchScorer(wrapper(predictor), chunk_size=3, retry_count=0)
+
+        result = score(scorer, NODE_IDS[:5] + ["bad"])
+
+        assert [p.node_id for p in result.predictions] == NODE_IDS[:5]
+        assert scorer._executor is None
@@ -0,0 +1,287 @@
+"""
+Tests for the model registry's on-disk storage.
+
+Covers per-model files, the status journal and its compaction,
+quarantine of unreadable files, migration from the single-file
+registry.json layout, and artifact round trips.
+
+Author: PDRI Team
+Version: 1.0.0
+"""
+
+import json
+import pytest
+
+from pdri.ml.signatures import model_registry
+from pdri.ml.signatures.model_registry import (
+    ModelMetrics,
+    ModelRegistry,
+    ModelStatus,
+    ModelType,
+)
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+
+@pytest.fixture
+def storage(tmp_path):
+    """Empty registry storage directory."""
+    return tmp_path / "registry"
+
+
+@pytest.fixture
+def populated(storage):
+    """Registry with one classifier holding three versions."""
+    registry = ModelRegistry(str(storage))
+    model_id = registry.register_model(
+        "Risk Classifier", ModelType.RISK_CLASSIFIER,
+        description="test model", tags={"team": "risk"},
+    )
+    for i in range(3):
+        registry.log_version(
+            model_id,
+            {"weights": [i, i + 1]},
+            ModelMetrics(accuracy=0.8 + i / 100, custom_metrics={"lift": 1.5}),
+            hyperparameters={"depth": i + 2},
+            feature_names=["a", "b"],
+            description=f"version {i + 1}",
+            training_data=b"rows" * (i + 1),
+        )
+    return registry, model_id
+
+
+def snapshot(registry):
+    """Comparable view of every model, versions included."""
+    return sorted(
+        (json.dumps(m.to_dict(), sort_keys=True) for m in registry.list_models())
+    )
+
+
+# =============================================================================
+# Round trips
+# =============================================================================
+
+class TestRoundTrip:
+    """Models written by one registry are read back unchanged by the next."""
+
+    def test_log_version_then_reload(self, storage, populated):
+        registry, model_id = populated
+        reloaded = ModelRegistry(str(storage))
+
+        assert snapshot(reloaded) == snapshot(registry)
+        model = reloaded.get_model(model_id)
+        assert [v.version_number for v in model.versions] == ["v1", "v2", "v3"]
+        assert model.latest_version.metrics.custom_metrics == {"lift": 1.5}
+        assert model.latest_version.hyperparameters == {"depth": 4}
+        assert (storage / "models" / f"{model_id}.json").exists()
+
+    def test_versions_are_stored_as_rows(self, storage, populated):
+        _, model_id = populated
+        data = json.loads((storage / "models" / f"{model_id}.json").read_text())
+
+        assert data["versions"]["__schema"][0] == "version_id"
+        assert len(data["versions"]["rows"]) == 3
+
+    def test_stdlib_json_fallback(self, storage, populated, monkeypatch):
+        registry, _ = populated
+        monkeypatch.setattr(model_registry, "HAS_ORJSON", False)
+
+        registry.promote_to_staging(registry.list_models()[0].versions[0].version_id)
+        registry.flush()
+        reloaded = ModelRegistry(str(storage))
+
+        assert snapshot(reloaded) == snapshot(registry)
+
+    def test_batch_defers_writes_until_exit(self, storage, populated):
+        registry, model_id = populated
+        model_file = storage / "models" / f"{model_id}.json"
+        before = model_file.read_bytes()
+
+        with registry.batch():
+            registry.log_version(model_id, {"weights": []}, ModelMetrics())
+            assert model_file.read_bytes() == before
+
+        assert len(ModelRegistry(str(storage)).get_model(model_id).versions) == 4
+
+    def test_artifact_round_trip_from_disk(self, storage, populated):
+        _, model_id = populated
+        reloaded = ModelRegistry(str(storage), artifact_cache_size=0)
+
+        assert reloaded.load_artifact(f"{model_id}-v2") == {"weights": [1, 2]}
+
+    def test_unpicklable_artifact_uses_cloudpickle(self, storage, populated):
+        pytest.importorskip("cloudpickle")
+        registry, model_id = populated
+        version_id = registry.log_version(model_id, lambda x: x * 2, ModelMetrics())
+
+        loaded = ModelRegistry(str(storage), artifact_cache_size=0).load_artifact(version_id)
+
+        assert loaded(21) == 42
+
+
+# =============================================================================
+# Status journal
+# =============================================================================
+
+class TestJournal:
+    """Status changes go to registry.log and are replayed on load."""
+
+    def test_status_changes_are_replayed(self, storage, populated):
+        registry, model_id = populated
+        registry.promote_to_staging(f"{model_id}-v2")
+        registry.promote_to_production(f"{model_id}-v3")
+
+        reloaded = ModelRegistry(str(storage))
+        model = reloaded.get_model(model_id)
+
+        assert model.production_version.version_id == f"{model_id}-v3"
+        assert model.versions[1].status == ModelStatus.STAGING
+        assert (storage / "registry.log").stat().st_size > 0
+
+    def test_replay_after_compaction(self, storage, populated, monkeypatch):
+        registry, model_id = populated
+        registry.promote_to_production(f"{model_id}-v1")
+        registry.promote_to_production(f"{model_id}-v2")
+
+        monkeypatch.setattr(ModelRegistry, "JOURNAL_COMPACT_EVENTS", 1)
+        compacted = ModelRegistry(str(storage))
+        assert (storage / "registry.log").stat().st_size == 0
+
+        # Events after compaction are journaled on top of the model files
+        compacted.promote_to_staging(f"{model_id}-v3")
+        monkeypatch.setattr(ModelRegistry, "JOURNAL_COMPACT_EVENTS", 1000)
+        reloaded = ModelRegistry(str(storage))
+        model = reloaded.get_model(model_id)
+
+        assert [v.status for v in model.versions] == [
+            ModelStatus.DEPRECATED, ModelStatus.PRODUCTION, ModelStatus.STAGING,
+        ]
+        assert reloaded.get_production_model(ModelType.RISK_CLASSIFIER) == {"weights": [1, 2]}
+
+    def test_production_choice_survives_restart(self, storage):
+        registry = ModelRegistry(str(storage))
+        # Registered first, but its file name sorts last
+        first = registry.register_model("Zeta", ModelType.RISK_CLASSIFIER)
+        second = registry.register_model("Alpha", ModelType.RISK_CLASSIFIER)
+        for model_id in (first, second):
+            version_id = registry.log_version(model_id, {"model": model_id}, ModelMetrics())
+            registry.promote_to_production(version_id)
+
+        reloaded = ModelRegistry(str(storage))
+
+        assert registry.get_production_model(ModelType.RISK_CLASSIFIER) == {"model": first}
+        assert reloaded.get_production_model(ModelType.RISK_CLASSIFIER) == {"model": first}
+        assert [m.model_id for m in reloaded.list_models()] == [first, second]
+
+    def test_torn_journal_line_is_skipped(self, storage, populated):
+        registry, model_id = populated
+        registry.promote_to_production(f"{model_id}-v2")
+        with open(storage / "registry.log", "ab") as f:
+            f.write(b'{"op": "status", "version_id": ')
+
+        model = ModelRegistry(str(storage)).get_model(model_id)
+
+        assert model.production_version.version_id == f"{model_id}-v2"
+
+
+# =============================================================================
+# Corrupt files and legacy layout
+# =============================================================================
+
+class TestRecovery:
+    """Unreadable files are set aside; old layouts are migrated."""
+
+    def test_corrupt_model_file_is_quarantined(self, storage, populated):
+        registry, model_id = populated
+        other_id = registry.register_model("Other", ModelType.ANOMALY_DETECTOR)
+        model_file = storage / "models" / f"{model_id}.json"
+        model_file.write_bytes(b"{not json")
+
+        reloaded = ModelRegistry(str(storage))
+
+        assert reloaded.get_model(model_id) is None
+        assert reloaded.get_model(other_id) is not None
+        assert not model_file.exists()
+        assert (storage / "models" / f"{model_id}.json.corrupt").read_bytes() == b"{not json"
+
+    def test_msgpack_file_skipped_without_msgpack(self, storage, populated, monkeypatch):
+        _, model_id = populated
+        monkeypatch.setattr(model_registry, "HAS_MSGPACK", False)
+        msgpack_file = storage / "models" / "other-model.msgpack"
+        msgpack_file.write_bytes(b"\x80")
+
+        reloaded = ModelRegistry(str(storage))
+
+        # Not quarantined: the file is fine, only the reader is missing
+        assert msgpack_file.exists()
+        assert reloaded.get_model(model_id) is not None
+
+    def test_msgpack_format_requires_msgpack(self, storage, monkeypatch):
+        monkeypatch.setattr(model_registry, "HAS_MSGPACK", False)
+
+        with pytest.raises(ImportError):
+            ModelRegistry(str(storage), storage_format="msgpack")
+
+    def test_msgpack_round_trip(self, storage, populated):
+        pytest.importorskip("msgpack")
+        registry, model_id = populated
+
+        converted = ModelRegistry(str(storage), storage_format="msgpack")
+
+        assert snapshot(converted) == snapshot(registry)
+        assert (storage / "models" / f"{model_id}.msgpack").exists()
+        assert not (storage / "models" / f"{model_id}.json").exists()
+        assert snapshot(ModelRegistry(str(storage), storage_format="msgpack")) == snapshot(registry)
+
+    def test_legacy_registry_is_migrated(self, storage):
+        storage.mkdir()
+        legacy = {
+            "models": [{
+                "model_id": "legacy-clf",
+                "name": "Legacy",
+                "model_type": "risk_classifier",
+                "description": "",
+                "created_at": "2026-01-01T00:00:00+00:00",
+                "updated_at": "2026-01-02T00:00:00+00:00",
+                "tags": {},
+                "versions": [
+                    {
+                        "version_id": f"legacy-clf-v{n}",
+                        "model_id": "legacy-clf",
+                        "version_number": f"v{n}",
+                        "created_at": f"2026-01-0{n}T00:00:00+00:00",
+                        "model_type": "risk_classifier",
+                        "status": status,
+                        "metrics": {"accuracy": 0.9},
+                        "hyperparameters": {},
+                        "feature_names": ["a"],
+                        "description": "",
+                        "artifact_path": None,
+                        "training_data_hash": None,
+                    }
+                    for n, status in ((1, "deprecated"), (2, "production"))
+                ],
+            }],
+            "last_updated": "2026-01-02T00:00:00+00:00",
+        }
+        (storage / "registry.json").write_text(json.dumps(legacy))
+
+        migrated = ModelRegistry(str(storage))
+        model = migrated.get_model("legacy-clf")
+
+        assert not (storage / "registry.json").exists()
+        assert (storage / "models" / "legacy-clf.json").exists()
+        assert model.production_version.version_id == "legacy-clf-v2"
+        assert model.versions[0].metrics.accuracy == 0.9
+        assert snapshot(ModelRegistry(str(storage))) == snapshot(migrated)
+
+    def test_corrupt_legacy_registry_is_quarantined(self, storage):
+        storage.mkdir()
+        (storage / "registry.json").write_bytes(b"[truncated")
+
+        registry = ModelRegistry(str(storage))
+
+        assert registry.list_models() == []
+        assert (storage / "registry.json.corrupt").exists()
@@ -0,0 +1,358 @@
+"""
+Tests for risk pattern detection.
+
+Covers the compiled signature sweep and its NumPy fallback against each
+other and against a per-feature scalar reference: NaN and missing
+features, confidences, and the order patterns come out in.
+
+Author: PDRI Team
+Version: 1.0.0
+"""
+
+import asyncio
+import math
+import random
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from pdri.ml.jit import HAS_NUMBA
+from pdri.ml.signatures import risk_patterns
+from pdri.ml.signatures.feature_engineering import FeatureVector
+from pdri.ml.signatures.risk_patterns import (
+    PatternSeverity,
+    PatternSignature,
+    PatternType,
+    RiskPatternDetector,
+)
+
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+# Features read by the default signatures, with a scale that puts values
+# on both sides of their thresholds
+SCALES = {
+    "is_ai_tool": 1.0,
+    "sensitivity_score": 1.0,
+    "external_connection_count": 3.0,
+    "exposure_path_count": 20.0,
+    "access_frequency_24h": 1000.0,
+    "is_external_service": 1.0,
+    "risk_score_trend": 1.0,
+    "current_risk_score": 100.0,
+    "inbound_connection_count": 100.0,
+    "changes_last_30d": 40.0,
+    "risk_score_7d_std": 20.0,
+    "betweenness_centrality": 1.0,
+    "unique_accessor_count": 20.0,
+    "volatility_score": 1.0,
+}
+NAMES = tuple(SCALES)
+
+EXTRA_SIGNATURE = PatternSignature(
+    signature_id="sig-test",
+    pattern_type=PatternType.INSIDER_THREAT,
+    name="Bounded both ways",
+    description="Test signature with min, max and unknown features",
+    feature_thresholds={
+        "sensitivity_score": (0.2, 0.6),
+        "volatility_score": (None, 0.5),
+        "not_a_feature": (1.0, None),
+    },
+    required_features=["sensitivity_score"],
+    severity=PatternSeverity.LOW,
+    recommended_actions=["Review"],
+)
+
+
+class PlainVector:
+    """Vector whose features are a plain dict, as older callers pass."""
+
+    def __init__(self, node_id, features):
+        self.node_id = node_id
+        self.features = features
+        self.timestamp = T0
+
+
+def feature_value(rng, name):
+    """Random value for a feature; about 3% are NaN."""
+    if rng.random() < 0.03:
+        return float("nan")
+    if name.startswith("is_"):
+        return float(rng.random() < 0.6)
+    return rng.random() * SCALES[name] * 1.3
+
+
+def make_vectors(seed, count):
+    """Full FeatureVectors, FeatureVectors with half the features, and dict vectors."""
+    rng = random.Random(seed)
+    half = NAMES[::2]
+    vectors = []
+    for i in range(count):
+        kind = rng.random()
+        if kind < 0.6:
+            values = np.array([feature_value(rng, name) for name in NAMES])
+            vectors.append(FeatureVector(f"node-{i}", T0, values, NAMES))
+        elif kind < 0.8:
+            values = np.array([feature_value(rng, name) for name in half])
+            vectors.append(FeatureVector(f"node-{i}", T0, values, half))
+        else:
+            names = [name for name in NAMES if rng.random() < 0.7]
+            vectors.append(PlainVector(
+                f"node-{i % 7}", {name: feature_value(rng, name) for name in names}
+            ))
+    return vectors
+
+
+# =============================================================================
+# Scalar reference (the per-vector, per-feature implementation)
+# =============================================================================
+
+def reference_match(features, signature):
+    """Whether features satisfy a signature; NaN never fails a bound."""
+    if any(required not in features for required in signature.required_features):
+        return False
+    for name, (min_val, max_val) in signature.feature_thresholds.items():
+        if name not in features:
+            continue
+        value = features[name]
+        if min_val is not None and value < min_val:
+            return False
+        if max_val is not None and value > max_val:
+            return False
+    return True
+
+
+def reference_confidence(features, signature):
+    """Mean per-bound score, 0.5 when no bound applies."""
+    scores = []
+    for name, (min_val, max_val) in signature.feature_thresholds.items():
+        if name not in features:
+            continue
+        value = features[name]
+        if min_val is not None:
+            scores.append(min(1.0, 0.5 + (value - min_val) * 0.5) if value >= min_val else 0.0)
+        if max_val is not None:
+            scores.append(min(1.0, 0.5 + (max_val - value) * 0.5) if value <= max_val else 0.0)
+    return float(np.mean(scores)) if scores else 0.5
+
+
+def reference_patterns(vectors, signatures):
+    """(node, type, confidence) of deduplicated signature patterns, in output order."""
+    unique = {}
+    for vector in vectors:
+        features = dict(vector.features)
+        for signature in signatures:
+            if not reference_match(features, signature):
+                continue
+            confidence = reference_confidence(features, signature)
+            key = (signature.pattern_type, (vector.node_id,))
+            if key not in unique or confidence > unique[key][2]:
+                unique[key] = (vector.node_id, signature.pattern_type, confidence)
+    return list(unique.values())
+
+
+def same(a, b):
+    """Equality that treats NaN as equal to NaN."""
+    return a == b or (math.isnan(a) and math.isnan(b))
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+
+@pytest.fixture
+def detector():
+    """Detector with the default signatures plus one bounded both ways."""
+    return RiskPatternDetector(signatures=[EXTRA_SIGNATURE])
+
+
+@pytest.fixture
+def extra_only():
+    """Detector with only the test signature."""
+    detector = RiskPatternDetector()
+    detector.signatures = [EXTRA_SIGNATURE]
+    detector._index_signatures()
+    return detector
+
+
+@pytest.fixture(params=[True, False], ids=["numba", "numpy"])
+def use_numba(request, monkeypatch):
+    """Run a test on the compiled path and again on the NumPy fallback."""
+    if request.param and not HAS_NUMBA:
+        pytest.skip("numba is not installed")
+    monkeypatch.setattr(risk_patterns, "HAS_NUMBA", request.param)
+    return request.param
+
+
+def sweep(detector, vectors, compiled):
+    """Run one signature sweep, compiled or NumPy, returning (matched, confidence)."""
+    X, present = detector._build_feature_matrix(vectors)
+    matched = np.zeros((len(vectors), len(detector.signatures)), dtype=bool)
+    confidence = np.zeros(matched.shape)
+    if compiled:
+        risk_patterns._sweep_all(X, present, *detector._sweep_arrays, matched, confidence)
+    else:
+        detector._sweep_signatures(X, present, matched, confidence)
+    return matched, confidence
+
+
+# =============================================================================
+# Signature sweep
+# =============================================================================
+
+class TestSweep:
+    """Both sweeps give the scalar reference's matches and confidences."""
+
+    @pytest.mark.skipif(not HAS_NUMBA, reason="numba is not installed")
+    @pytest.mark.parametrize("seed", range(4))
+    def test_compiled_and_numpy_sweeps_agree(self, detector, seed):
+        vectors = make_vectors(seed, 150)
+
+        compiled = sweep(detector, vectors, compiled=True)
+        fallback = sweep(detector, vectors, compiled=False)
+
+        assert np.array_equal(compiled[0], fallback[0])
+        assert np.array_equal(compiled[1], fallback[1])
+
+    @pytest.mark.parametrize("compiled", [True, False], ids=["numba", "numpy"])
+    @pytest.mark.parametrize("seed", range(4))
+    def test_sweep_matches_reference(self, detector, seed, compiled):
+        if compiled and not HAS_NUMBA:
+            pytest.skip("numba is not installed")
+        vectors = make_vectors(seed, 150)
+
+        matched, confidence = sweep(detector, vectors, compiled)
+
+        for row, vector in enumerate(vectors):
+            features = dict(vector.features)
+            for s, signature in enumerate(detector.signatures):
+                assert matched[row, s] == reference_match(features, signature)
+                if matched[row, s]:
+                    assert same(confidence[row, s], reference_confidence(features, signature))
+
+    def test_check_and_score_matches_reference(self, detector, use_numba):
+        for vector in make_vectors(7, 100):
+            features = dict(vector.features)
+            for signature in detector.signatures:
+                compiled = detector._compiled_for(signature)
+                _, confidence = detector._check_and_score(features, compiled)
+
+                assert detector._matches_signature(vector, signature) == reference_match(
+                    features, signature
+                )
+                assert same(confidence, reference_confidence(features, signature))
+
+
+# =============================================================================
+# NaN and missing features
+# =============================================================================
+
+class TestMissingValues:
+    """NaN never fails a bound but scores zero; absent features are skipped."""
+
+    def test_nan_matches_and_scores_zero(self, extra_only, use_numba):
+        features = {"sensitivity_score": float("nan"), "volatility_score": 0.3}
+        vector = PlainVector("node-1", features)
+
+        patterns = asyncio.run(extra_only.detect_patterns([vector], use_ml=False))
+
+        # Two bounds on sensitivity_score score 0, volatility_score scores 0.6
+        assert [p.affected_nodes for p in patterns] == [["node-1"]]
+        assert patterns[0].confidence == pytest.approx(0.2)
+        assert patterns[0].confidence == reference_confidence(features, EXTRA_SIGNATURE)
+
+    def test_missing_required_feature_never_matches(self, extra_only, use_numba):
+        vector = PlainVector("node-1", {"volatility_score": 0.1})
+
+        assert asyncio.run(extra_only.detect_patterns([vector], use_ml=False)) == []
+
+    def test_only_present_bounds_are_scored(self, extra_only, use_numba):
+        vector = PlainVector("node-1", {"sensitivity_score": 0.4})
+
+        (pattern,) = asyncio.run(extra_only.detect_patterns([vector], use_ml=False))
+
+        assert pattern.confidence == pytest.approx((0.6 + 0.6) / 2)
+        assert pattern.features_matched == {"sensitivity_score": 0.4}
+
+
+# =============================================================================
+# detect_patterns
+# =============================================================================
+
+class TestDetectPatterns:
+    """Pattern order, IDs and confidences match the scalar reference."""
+
+    @pytest.mark.parametrize("seed", range(3))
+    def test_patterns_match_reference(self, detector, use_numba, seed):
+        vectors = make_vectors(seed, 200)
+
+        patterns = asyncio.run(detector.detect_patterns(vectors, use_ml=False))
+
+        expected = reference_patterns(vectors, detector.signatures)
+        got = [(p.affected_nodes[0], p.pattern_type, p.confidence) for p in patterns]
+        assert len(got) == len(expected)
+        for (node, kind, confidence), (ref_node, ref_kind, ref_confidence) in zip(got, expected):
+            assert (node, kind) == (ref_node, ref_kind)
+            assert same(confidence, ref_confidence)
+
+    def test_both_paths_number_patterns_alike(self, detector):
+        if not HAS_NUMBA:
+            pytest.skip("numba is not installed")
+        vectors = make_vectors(11, 200)
+
+        def detect(compiled):
+            with pytest.MonkeyPatch.context() as mp:
+                mp.setattr(risk_patterns, "HAS_NUMBA", compiled)
+                patterns = asyncio.run(
+                    RiskPatternDetector(signatures=[EXTRA_SIGNATURE]).detect_patterns(vectors)
+                )
+            return [p.to_dict() for p in patterns]
+
+        compiled, fallback = detect(True), detect(False)
+
+        for p in compiled + fallback:
+            p["features_matched"] = {
+                k: None if v != v else v for k, v in p["features_matched"].items()
+            }
+            p["confidence"] = None if p["confidence"] != p["confidence"] else p["confidence"]
+        assert compiled == fallback
+
+
+# =============================================================================
+# ML predictions
+# =============================================================================
+
+class TestPatternTypes:
+    """Model predictions map to pattern types the same way for every dtype."""
+
+    @staticmethod
+    def reference(predictions):
+        return [
+            None if pred == 0
+            else PatternType(pred) if isinstance(pred, str)
+            else PatternType.ATTACK_CHAIN
+            for pred in predictions
+        ]
+
+    @pytest.mark.parametrize("predictions", [
+        np.array([0, 1, 2, 0, 5]),
+        np.array([0.0, 0.5, 1.0]),
+        np.array([False, True]),
+        np.array(["shadow_it", "insider_threat", "shadow_it"]),
+        np.array([0, "data_exfiltration", 3], dtype=object),
+        [0, "shadow_it", 1],
+    ])
+    def test_matches_per_row_mapping(self, predictions):
+        assert RiskPatternDetector._pattern_types_for(predictions) == self.reference(
+            list(predictions)
+        )
+
+    def test_severity_batch_matches_scalar(self):
+        detector = RiskPatternDetector()
+        confidences = np.array([0.0, 0.49, 0.5, 0.69, 0.7, 0.89, 0.9, 1.0, np.nan])
+
+        batch = detector._infer_severity_batch(confidences).tolist()
+
+        assert batch == [detector._infer_severity(c) for c in confidences.tolist()]
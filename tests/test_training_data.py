@@ -0,0 +1,191 @@
+"""
+Tests for the array-backed training dataset.
+
+Covers TrainingDataset conversion to and from TrainingExample lists,
+timestamp time zones, and DatasetSplit index splits.
+
+Author: PDRI Team
+Version: 1.0.0
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from pdri.ml.training.data_loader import (
+    DatasetSplit,
+    TrainingDataLoader,
+    TrainingDataset,
+    TrainingExample,
+)
+
+
+T0 = datetime(2026, 1, 1, 12, 30)
+
+
+def make_examples(count, tz=None, labels=(0, 1, 1, 2)):
+    """Examples with distinct features, cycling labels and hourly timestamps."""
+    start = T0.replace(tzinfo=tz)
+    return [
+        TrainingExample(
+            features=np.arange(3, dtype=np.float32) + i,
+            label=labels[i % len(labels)],
+            node_id=f"node-{i}",
+            timestamp=start + timedelta(hours=(i * 7) % count),
+            metadata={"node_type": "data_store", "row": i},
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def loader():
+    """Loader without graph access; only the in-memory helpers are used."""
+    return TrainingDataLoader(graph_engine=None, feature_engineer=None)
+
+
+# =============================================================================
+# TrainingDataset
+# =============================================================================
+
+class TestTrainingDataset:
+    """Examples survive a round trip through the array layout."""
+
+    def test_round_trip(self):
+        examples = make_examples(10, tz=timezone.utc)
+        dataset = TrainingDataset.from_examples(examples)
+
+        assert len(dataset) == 10
+        assert dataset.features.shape == (10, 3)
+        assert dataset.timestamps.dtype == np.dtype("datetime64[us]")
+        for original, restored in zip(examples, dataset.to_examples()):
+            assert np.array_equal(original.features, restored.features)
+            assert original.label == restored.label
+            assert original.node_id == restored.node_id
+            assert original.timestamp == restored.timestamp
+            assert original.metadata == restored.metadata
+
+    def test_naive_timestamps_stay_naive(self):
+        examples = make_examples(5)
+        restored = TrainingDataset.from_examples(examples).to_examples()
+
+        assert [ex.timestamp for ex in restored] == [ex.timestamp for ex in examples]
+        assert all(ex.timestamp.tzinfo is None for ex in restored)
+
+    def test_time_zone_is_kept(self):
+        tz = timezone(timedelta(hours=2))
+        examples = make_examples(5, tz=tz)
+        restored = TrainingDataset.from_examples(examples).to_examples()
+
+        assert [ex.timestamp for ex in restored] == [ex.timestamp for ex in examples]
+        assert all(ex.timestamp.utcoffset() == timedelta(hours=2) for ex in restored)
+
+    def test_mixed_labels_are_not_coerced(self):
+        examples = make_examples(4, labels=("high", 0))
+        dataset = TrainingDataset.from_examples(examples)
+
+        assert [ex.label for ex in dataset.to_examples()] == ["high", 0, "high", 0]
+
+    def test_subset(self):
+        examples = make_examples(8)
+        subset = TrainingDataset.from_examples(examples).subset(np.array([6, 1]))
+
+        assert subset.node_ids == ["node-6", "node-1"]
+        assert subset.features[0].tolist() == [6.0, 7.0, 8.0]
+        assert [ex.timestamp for ex in subset.to_examples()] == [
+            examples[6].timestamp, examples[1].timestamp,
+        ]
+
+    def test_empty(self):
+        dataset = TrainingDataset.from_examples([])
+
+        assert len(dataset) == 0
+        assert dataset.to_examples() == []
+
+
+# =============================================================================
+# DatasetSplit
+# =============================================================================
+
+class TestDatasetSplit:
+    """Dataset splits are index arrays matching the list-based splits."""
+
+    @pytest.mark.parametrize("stratify", [True, False])
+    @pytest.mark.parametrize("time_based", [True, False])
+    def test_matches_list_split(self, loader, stratify, time_based):
+        examples = make_examples(50)
+        dataset = TrainingDataset.from_examples(examples)
+        options = dict(stratify=stratify, time_based=time_based, seed=3)
+
+        by_index = loader.split_data(dataset, 0.6, 0.2, 0.2, **options)
+        by_list = loader.split_data(examples, 0.6, 0.2, 0.2, **options)
+
+        assert isinstance(by_index, DatasetSplit)
+        assert by_index.sizes == by_list.sizes
+        for rows, part in zip(
+            (by_index.train, by_index.validation, by_index.test),
+            (by_list.train, by_list.validation, by_list.test),
+        ):
+            assert [dataset.node_ids[i] for i in rows] == [ex.node_id for ex in part]
+
+    def test_partitions_all_rows(self, loader):
+        dataset = TrainingDataset.from_examples(make_examples(37))
+        split = loader.split_data(dataset, 0.7, 0.15, 0.15)
+
+        rows = np.concatenate([split.train, split.validation, split.test])
+        assert sorted(rows.tolist()) == list(range(37))
+        assert sum(split.sizes.values()) == 37
+
+    def test_time_based_split_orders_sets_by_time(self, loader):
+        dataset = TrainingDataset.from_examples(make_examples(40))
+        split = loader.split_data(dataset, 0.5, 0.25, 0.25, time_based=True)
+
+        train, val, test = (
+            dataset.timestamps[rows] for rows in (split.train, split.validation, split.test)
+        )
+        assert train.max() <= val.min()
+        assert val.max() <= test.min()
+
+    def test_stratified_split_keeps_label_shares(self, loader):
+        dataset = TrainingDataset.from_examples(make_examples(80))
+        split = loader.split_data(dataset, 0.5, 0.25, 0.25, stratify=True)
+
+        labels, counts = np.unique(dataset.labels[split.train], return_counts=True)
+        assert labels.tolist() == [0, 1, 2]
+        assert counts.tolist() == [10, 20, 10]
+
+    def test_batches_follow_split_rows(self, loader):
+        examples = make_examples(20)
+        dataset = TrainingDataset.from_examples(examples)
+        split = loader.split_data(dataset, 0.5, 0.25, 0.25)
+
+        batches = list(loader.batch_iterator(
+            dataset, batch_size=4, shuffle=False, indices=split.train,
+        ))
+
+        assert [len(b) for b in batches[:-1]] == [4] * (len(batches) - 1)
+        assert sum(len(b) for b in batches) == len(split.train)
+        node_ids = [node_id for b in batches for node_id in b.node_ids]
+        assert node_ids == [dataset.node_ids[i] for i in split.train]
+        assert batches[0].timestamps[0] == examples[split.train[0]].timestamp
+
+
+# =============================================================================
+# Batches from example lists
+# =============================================================================
+
+class TestListBatches:
+    """Batches built from a list of examples."""
+
+    @pytest.mark.parametrize("reuse_buffers", [True, False])
+    def test_label_dtype_is_per_batch(self, loader, reuse_buffers):
+        examples = make_examples(4, labels=(0, 1, "x", 1))
+
+        batches = list(loader.batch_iterator(
+            examples, batch_size=2, shuffle=False, reuse_buffers=reuse_buffers,
+        ))
+
+        assert batches[0].labels.dtype.kind == "i"
+        assert batches[0].labels.tolist() == [0, 1]
+        assert batches[1].labels.tolist() == ["x", "1"]